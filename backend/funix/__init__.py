@@ -3,9 +3,21 @@ from importlib import import_module
 from inspect import isfunction
 from ipaddress import ip_address
 from os import chdir, getcwd, listdir
-from os.path import abspath, dirname, exists, isdir, join, normpath, sep
+from os.path import (
+    abspath,
+    basename,
+    dirname,
+    exists,
+    isdir,
+    join,
+    normpath,
+    relpath,
+    sep,
+)
 from sys import exit, path
-from typing import Any, Generator, Optional
+from threading import Lock
+from traceback import format_exc
+from typing import Any, Callable, Generator, Optional
 from urllib.parse import quote
 
 from flask import Flask
@@ -13,17 +25,22 @@ from gitignore_parser import parse_gitignore
 
 import funix.decorator as decorator
 import funix.hint as hint
-from funix.app import app, enable_funix_host_checker
+from funix.app import app, enable_funix_host_checker, mark_ready
+from funix.decorator.lazy import scan_funix_functions
 from funix.frontend import OpenFrontend, run_open_frontend, start
-from funix.prep.global_to_session import get_new_python_file
+from funix.prep.global_to_session import (
+    get_new_python_file,
+    set_transform_cache_config,
+)
 from funix.util.file import create_safe_tempdir
-from funix.util.module import import_module_from_file
+from funix.util.module import import_module_from_file, preload_modules
 from funix.util.network import (
     get_compressed_ip_address_as_str,
     get_unused_port_from,
     is_ip_on_localhost,
     is_port_used,
 )
+from funix.util.watcher import FileWatcher
 
 # ---- Exports ----
 # ---- Decorators ----
@@ -44,6 +61,12 @@ import_theme = decorator.import_theme
 new_funix_type_with_config_func = hint.new_funix_type_with_config_func
 new_funix_type = hint.new_funix_type
 set_app_secret = decorator.set_app_secret
+set_figure_config = decorator.set_figure_config
+set_media_config = decorator.set_media_config
+set_upload_config = decorator.set_upload_config
+set_table_config = decorator.set_table_config
+set_reactive_config = decorator.set_reactive_config
+set_schema_cache_config = decorator.set_schema_cache_config
 # ---- Util ----
 # ---- Exports ----
 
@@ -57,6 +80,27 @@ __now_path = getcwd()
 The current path. For switching the path.
 """
 
+__watched_files: dict[str, tuple[dict[str, Any], set[tuple[str | None, str]]]] = {}
+"""
+A dict, key is a Python file watched for the incremental reload, value is the arguments of `__prep` for it and the
+keys of its functions.
+"""
+
+__new_file_prep_args: dict[str, Any] | None = None
+"""
+The arguments of `__prep` for the new files found by the watcher (without `module_or_file`).
+"""
+
+__watcher: FileWatcher | None = None
+"""
+The running file watcher.
+"""
+
+__reload_lock = Lock()
+"""
+The lock for reloading files.
+"""
+
 try:
     from git import Repo
 
@@ -88,6 +132,7 @@ def __prep(
     need_name: bool,
     base_dir: Optional[str] = None,
     default: Optional[str] = None,
+    change_dir: bool = True,
 ) -> None:
     """
     Prepare the module or file. Import and wrap the functions if needed.
@@ -101,6 +146,8 @@ def __prep(
         need_name (bool): For the module, if the name is needed.
         base_dir (str): The base director, only for dir mode.
         default (str): Default function name
+        change_dir (bool): Import a file from its folder. The working directory is for the whole process, so it is
+            only changed before the server starts, the paths of funix are absolute anyway.
     """
     decorator.enable_wrapper()
     path_difference: str | None = None
@@ -117,7 +164,7 @@ def __prep(
             module = import_module(module_or_file)
         else:
             folder = sep.join(module_or_file.split(sep)[0:-1])
-            if folder:
+            if folder and change_dir:
                 chdir(folder)
             if base_dir and not lazy:
                 decorator.set_now_module(path_difference)
@@ -134,7 +181,8 @@ def __prep(
             )
             if base_dir and not lazy:
                 decorator.clear_now_module()
-            chdir(__now_path)
+            if change_dir:
+                chdir(__now_path)
         if lazy:
             members = reversed(dir(module))
             for member in members:
@@ -157,6 +205,144 @@ def __prep(
         exit(1)
 
 
+def register_lazy_file(
+    file: str, functions: list[dict], base_dir: str, default: Optional[str] = None
+) -> None:
+    """
+    List the functions of a file in dir mode, and import it on the first request to one of them.
+
+    Parameters:
+        file (str): The Python file.
+        functions (list[dict]): The functions found by `funix.decorator.lazy.scan_funix_functions`.
+        base_dir (str): The base directory.
+        default (str): Default function name, in the format of `file:func`.
+    """
+    decorator.enable_wrapper()
+    default_name = None
+    if default:
+        python_file, function_name = default.strip().split(":")
+        if abspath(join(__now_path, file)) == abspath(
+            join(__now_path, base_dir, python_file)
+        ):
+            default_name = function_name
+
+    def loader() -> None:
+        # On the first request, so the working directory stays
+        __prep(
+            module_or_file=file,
+            lazy=False,
+            need_path=True,
+            is_module=False,
+            need_name=True,
+            base_dir=base_dir,
+            default=default,
+            change_dir=False,
+        )
+
+    decorator.register_lazy_functions(
+        functions, get_path_difference(base_dir, file[:-3]), loader, default_name
+    )
+
+
+def __prep_watched_file(prep_args: dict[str, Any]) -> None:
+    """
+    Prepare a file and record its functions, so it can be reloaded.
+
+    Parameters:
+        prep_args (dict[str, Any]): The arguments of `__prep`.
+    """
+    before = decorator.get_function_keys()
+    __prep(**prep_args)
+    __watched_files[prep_args["module_or_file"]] = (
+        prep_args,
+        decorator.get_function_keys() - before,
+    )
+
+
+def reload_files(changed: list[str], removed: list[str]) -> None:
+    """
+    Reload the changed files and unload the removed files, only their functions are decorated again. The function ids
+    stay the same, so the open pages and the sessions keep working.
+
+    Parameters:
+        changed (list[str]): The changed or new files.
+        removed (list[str]): The removed files.
+    """
+    with __reload_lock:
+        for file in removed:
+            _, keys = __watched_files.pop(file, (None, set()))
+            decorator.prepare_reload(keys)
+            decorator.finish_reload(keys, True)
+            print(f"Unloaded {file}")
+        for file in changed:
+            if file in __watched_files:
+                prep_args, keys = __watched_files[file]
+            elif __new_file_prep_args is not None:
+                prep_args = {**__new_file_prep_args, "module_or_file": file}
+                keys = set()
+            else:
+                continue
+            decorator.prepare_reload(keys)
+            before = decorator.get_function_keys()
+            try:
+                # From the watcher thread while requests are served, so the working directory stays
+                __prep(**prep_args, change_dir=False)
+            except:
+                print(f"Failed to reload {file}, keeping the old functions:")
+                print(format_exc())
+                decorator.clear_now_module()
+                decorator.finish_reload(keys, False)
+                __watched_files[file] = (
+                    prep_args,
+                    keys | (decorator.get_function_keys() - before),
+                )
+                continue
+            removed_keys = decorator.finish_reload(keys, True)
+            __watched_files[file] = (
+                prep_args,
+                (keys - removed_keys) | (decorator.get_function_keys() - before),
+            )
+            print(f"Reloaded {file}")
+
+
+def start_reloader(
+    list_files: Callable[[], list[str]], new_file_prep_args: dict[str, Any] | None
+) -> None:
+    """
+    Start watching the files for the incremental reload.
+
+    Parameters:
+        list_files (Callable[[], list[str]]): Lists the files to watch.
+        new_file_prep_args (dict[str, Any] | None): The arguments of `__prep` for new files (without
+            `module_or_file`), `None` if new files are not loaded.
+    """
+    global __watcher, __new_file_prep_args
+    __new_file_prep_args = new_file_prep_args
+    if __watcher is not None:
+        __watcher.stop()
+    __watcher = FileWatcher(list_files, reload_files)
+    __watcher.start()
+
+
+def get_local_module_names(base_dir: str, files: list[str]) -> set[str]:
+    """
+    Get the names that the files can import as local modules, they must not be preloaded.
+
+    Parameters:
+        base_dir (str): The base directory.
+        files (list[str]): The Python files in the directory.
+
+    Returns:
+        set[str]: The local module names.
+    """
+    names = {basename(abspath(base_dir))}
+    for file in files:
+        parts = normpath(relpath(file, base_dir)).split(sep)
+        names.update(parts[:-1])
+        names.add(parts[-1][:-3])
+    return names
+
+
 def get_python_files_in_dir(
     base_dir: str,
     add_to_sys_path: bool,
@@ -206,6 +392,8 @@ def import_from_config(
     transform: Optional[bool] = False,
     app_secret: Optional[str | bool] = False,
     default: Optional[str] = None,
+    lazy_import: Optional[bool] = False,
+    reload: Optional[bool] = False,
 ) -> None:
     """
     Import files, git repos and modules from the config argument.
@@ -220,6 +408,9 @@ def import_from_config(
         transform (bool): If you want to enable transform mode, default is False
         app_secret (str | bool): If you want to set an app secret, default is False
         default (str): Default function name, default is None
+        lazy_import (bool): If you want to import the files of dir mode on their first use, default is False
+        reload (bool): If you want to reload the changed files of dir mode and file mode (not transform mode) without
+            restarting, default is False
 
     Returns:
         None
@@ -266,21 +457,73 @@ def import_from_config(
         matches = None
         if exists(ignore_file):
             matches = parse_gitignore(abspath(ignore_file), base_dir=abspath(base_dir))
-        for single_file in get_python_files_in_dir(
-            base_dir=base_dir,
-            add_to_sys_path=False,
-            need_full_path=True,
-            is_dir=True,
-            matches=matches,
-        ):
-            __prep(
-                module_or_file=single_file,
-                lazy=lazy,
-                need_path=True,
-                is_module=False,
-                need_name=True,
+        files = sorted(
+            get_python_files_in_dir(
                 base_dir=base_dir,
-                default=default,
+                add_to_sys_path=False,
+                need_full_path=True,
+                is_dir=True,
+                matches=matches,
+            )
+        )
+        lazy_functions: dict[str, list[dict]] = {}
+        if lazy_import and not lazy and not app_secret and not reload:
+            # Secrets need the files imported at startup, the lazy mode wraps what it finds at runtime, and reloading
+            # needs the functions of every file
+            for single_file in files:
+                functions = scan_funix_functions(single_file)
+                if functions is not None:
+                    lazy_functions[single_file] = functions
+        preload_modules(
+            [single_file for single_file in files if single_file not in lazy_functions],
+            get_local_module_names(base_dir, files),
+        )
+        for single_file in files:
+            if single_file in lazy_functions:
+                register_lazy_file(
+                    single_file, lazy_functions[single_file], base_dir, default
+                )
+            elif reload:
+                __prep_watched_file(
+                    {
+                        "module_or_file": single_file,
+                        "lazy": lazy,
+                        "need_path": True,
+                        "is_module": False,
+                        "need_name": True,
+                        "base_dir": base_dir,
+                        "default": default,
+                    }
+                )
+            else:
+                __prep(
+                    module_or_file=single_file,
+                    lazy=lazy,
+                    need_path=True,
+                    is_module=False,
+                    need_name=True,
+                    base_dir=base_dir,
+                    default=default,
+                )
+        if reload:
+            start_reloader(
+                lambda: list(
+                    get_python_files_in_dir(
+                        base_dir=base_dir,
+                        add_to_sys_path=False,
+                        need_full_path=True,
+                        is_dir=True,
+                        matches=matches,
+                    )
+                ),
+                {
+                    "lazy": lazy,
+                    "need_path": True,
+                    "is_module": False,
+                    "need_name": True,
+                    "base_dir": base_dir,
+                    "default": default,
+                },
             )
     elif package_mode:
         if default or transform:
@@ -293,15 +536,19 @@ def import_from_config(
             raise RuntimeError(
                 f"`__init__.py`  is not found inside module path: {module_path}!"
             )
-        for module in get_python_files_in_dir(
-            base_dir=dirname(module_path),
-            add_to_sys_path=True,
-            need_full_path=False,
-            is_dir=False,
-            matches=None,
-        ):
+        files = sorted(
+            get_python_files_in_dir(
+                base_dir=dirname(module_path),
+                add_to_sys_path=True,
+                need_full_path=True,
+                is_dir=False,
+                matches=None,
+            )
+        )
+        preload_modules(files, get_local_module_names(dirname(module_path), files))
+        for single_file in files:
             __prep(
-                module_or_file=module,
+                module_or_file=basename(single_file)[:-3],
                 lazy=lazy,
                 need_path=True,
                 is_module=True,
@@ -329,6 +576,17 @@ def import_from_config(
                     is_module=False,
                     need_name=False,
                 )
+            elif reload:
+                __prep_watched_file(
+                    {
+                        "module_or_file": file_or_module_name,
+                        "lazy": lazy,
+                        "need_path": False,
+                        "is_module": False,
+                        "need_name": False,
+                    }
+                )
+                start_reloader(lambda: [file_or_module_name], None)
             else:
                 __prep(
                     module_or_file=file_or_module_name,
@@ -353,6 +611,8 @@ def get_flask_application(
     __kumo_callback_url: Optional[str] = None,
     __kumo_callback_token: Optional[str] = None,
     __host_regex: Optional[str] = None,
+    lazy_import: Optional[bool] = False,
+    schema_cache: Optional[str] = None,
 ) -> Flask:
     """
     Get flask application for the funix app.
@@ -374,6 +634,8 @@ def get_flask_application(
         __kumo_callback_token (str): The Kumo callback token, default is None, do not set it if you don't know what
                                      it is.
         __host_regex (str): The host checker regex, default is None.
+        lazy_import (bool): If you want to import the files of dir mode on their first use, default is False
+        schema_cache (str): The directory to cache the function schemas in, default is None (no cache)
 
     Returns:
         flask.Flask: The flask application.
@@ -383,6 +645,7 @@ def get_flask_application(
         decorator.parse_limiter_args(global_rate_limit, "global_rate_limit")
     )
     decorator.set_ip_header(ip_headers)
+    set_schema_cache_config(schema_cache)
     if __host_regex:
         enable_funix_host_checker(__host_regex)
 
@@ -403,10 +666,12 @@ def get_flask_application(
         repo_dir=repo_dir,
         transform=transform,
         app_secret=app_secret,
+        lazy_import=lazy_import,
     )
 
     if not no_frontend:
         start()
+    mark_ready()
     return app
 
 
@@ -424,6 +689,8 @@ def run(
     transform: Optional[bool] = False,
     app_secret: Optional[str | bool] = False,
     default: Optional[str] = None,
+    lazy_import: Optional[bool] = False,
+    schema_cache: Optional[str] = None,
 ) -> None:
     """
     Run the funix app.
@@ -439,10 +706,13 @@ def run(
         package_mode (bool): If you want to enable package mode, default is False
         from_git (str): If you want to run the app from a git repo, default is None
         repo_dir (str): If you want to run the app from a git repo, you can specify the directory, default is None
-        dev (bool): If you want to enable development mode, default is True
+        dev (bool): If you want to enable development mode (changed files are reloaded without restarting), default
+            is True
         transform (bool): If you want to enable transform mode, default is False
         app_secret (str | bool): If you want to set an app secret, default is False
         default (str): Default function name, default is None
+        lazy_import (bool): If you want to import the files of dir mode on their first use, default is False
+        schema_cache (str): The directory to cache the function schemas in, default is None (no cache)
 
     Returns:
         None
@@ -455,6 +725,11 @@ def run(
         )
         sys.exit(1)
 
+    set_schema_cache_config(schema_cache)
+
+    # Reload the changed files only, instead of restarting the whole process
+    incremental_reload = bool(dev) and not transform and not package_mode
+
     import_from_config(
         file_or_module_name=file_or_module_name,
         lazy=lazy,
@@ -465,6 +740,8 @@ def run(
         transform=transform,
         app_secret=app_secret,
         default=default,
+        lazy_import=lazy_import,
+        reload=incremental_reload,
     )
 
     if decorator.is_empty_function_list():
@@ -495,4 +772,10 @@ def run(
         print(f"Starting Funix backend only at http://{host}:{parsed_port}")
     if not no_frontend and not no_browser:
         run_open_frontend(parsed_ip, parsed_port)
-    app.run(host=host, port=parsed_port, debug=dev)
+    mark_ready()
+    app.run(
+        host=host,
+        port=parsed_port,
+        debug=dev,
+        use_reloader=bool(dev) and not incremental_reload,
+    )
@@ -27,6 +27,8 @@ from funix import run
 @plac.opt("repo_dir", "The directories in the repo that need to be used", abbrev="r")
 @plac.opt("secret", "The secret key for the full app", abbrev="s")
 @plac.opt("default", "The default function to run", abbrev="D")
+@plac.flg("lazy_import", "Import the files of dir mode on their first use", abbrev="L")
+@plac.opt("schema_cache", "The directory to cache the function schemas in", abbrev="c")
 def main(
     file_folder_or_module_name=None,
     host="0.0.0.0",
@@ -41,6 +43,8 @@ def main(
     repo_dir=None,
     secret=None,
     default=None,
+    lazy_import=False,
+    schema_cache=None,
 ):
     """Funix: Building web apps without manually creating widgets
 
@@ -71,6 +75,8 @@ def main(
     parsed_transform: bool = os.getenv("FUNIX_TRANSFORM", transform)
     parsed_secret: bool | str = os.getenv("FUNIX_SECRET", secret)
     parsed_default: str = os.getenv("FUNIX_DEFAULT", default)
+    parsed_lazy_import: bool = os.getenv("FUNIX_LAZY_IMPORT", lazy_import)
+    parsed_schema_cache: str = os.getenv("FUNIX_SCHEMA_CACHE", schema_cache)
 
     if isinstance(parsed_secret, str):
         if parsed_secret.lower() == "true":
@@ -97,6 +103,8 @@ def main(
         transform=parsed_transform,
         app_secret=parsed_secret,
         default=parsed_default,
+        lazy_import=parsed_lazy_import,
+        schema_cache=parsed_schema_cache,
     )
 
 
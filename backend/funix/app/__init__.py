@@ -6,6 +6,7 @@ import os
 import re
 from datetime import datetime, timezone
 from secrets import token_hex
+from threading import Event
 
 from flask import Flask, Response, abort, request
 from flask_sock import Sock
@@ -20,6 +21,34 @@ app.config.update(
 )
 sock = Sock(app)
 
+ready = Event()
+"""
+Set when Funix has loaded the functions and is going to serve them.
+"""
+
+
+def mark_ready():
+    """
+    Mark Funix as ready, `/healthz` starts to answer 200 and the browser opener stops waiting.
+    """
+    ready.set()
+
+
+@app.get("/healthz")
+def funix_healthz():
+    """
+    The readiness signal for health checks.
+
+    Routes:
+        /healthz: The health check path.
+
+    Returns:
+        tuple[dict, int]: `{"status": "ok"}` with 200 if ready, `{"status": "starting"}` with 503 otherwise.
+    """
+    if ready.is_set():
+        return {"status": "ok"}, 200
+    return {"status": "starting"}, 503
+
 
 @app.after_request
 def funix_auto_cors(response: Response) -> Response:
@@ -31,6 +60,29 @@ def funix_auto_cors(response: Response) -> Response:
     return response
 
 
+def redact_data_urls(data):
+    """
+    Replace the data URLs (inline uploads) in the request data with a short placeholder, so the logs do not store the
+    uploaded files.
+
+    Parameters:
+        data (Any): The request data.
+
+    Returns:
+        Any: The redacted request data.
+    """
+    if isinstance(data, str):
+        if data.startswith("data:") and "," in data:
+            header, _, content = data.partition(",")
+            return f"{header},<{len(content)} chars>"
+        return data
+    if isinstance(data, list):
+        return [redact_data_urls(item) for item in data]
+    if isinstance(data, dict):
+        return {key: redact_data_urls(value) for key, value in data.items()}
+    return data
+
+
 if os.environ.get("DISABLE_FUNIX_TELEMETRY") is None:
     telemetry_db = os.environ.get("FUNIX_TELEMETRY_DB", default="sqlite:///logs.db")
     engine = create_engine(telemetry_db, poolclass=SingletonThreadPool)
@@ -74,7 +126,7 @@ if os.environ.get("DISABLE_FUNIX_TELEMETRY") is None:
             {
                 "url": request.url,
                 "headers": dict(request.headers),
-                "data": req_json,
+                "data": redact_data_urls(req_json),
             }
         )
 
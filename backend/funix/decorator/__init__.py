@@ -1,7 +1,6 @@
 """
 Funix decorator. The central logic of Funix.
 """
-import ast
 import dataclasses
 import inspect
 import pathlib
@@ -20,11 +19,9 @@ from secrets import token_hex
 from traceback import format_exc
 from types import ModuleType
 from typing import Any, Callable, Optional
-from urllib.request import urlopen
 from uuid import uuid4
 
 from flask import Response, request, session
-from requests import post
 from requests.structures import CaseInsensitiveDict
 
 from funix.app import app, sock
@@ -40,11 +37,19 @@ from funix.decorator.annnotation_analyzer import (
     register_ipywidgets,
     register_pandera,
 )
+from funix.decorator.columnar import (
+    encode_columnar,
+    get_columnar_item_type,
+    negotiate_columnar_mimetype,
+)
+from funix.decorator.coerce import CoercionError, compile_arguments_coercer
+from funix.decorator.figure import set_figure_config, warm_up_figure_renderer
 from funix.decorator.file import (
     enable_file_service,
     get_static_uri,
     handle_ipython_audio_image_video,
 )
+from funix.decorator.kumo import record_kumo_call, start_kumo_reporter
 from funix.decorator.magic import (
     anal_function_result,
     convert_row_item,
@@ -52,7 +57,35 @@ from funix.decorator.magic import (
     get_type_dict,
     get_type_widget_prop,
 )
-from funix.decorator.runtime import RuntimeClassVisitor
+from funix.decorator.media import set_media_config
+from funix.decorator.routes import (
+    add_lazy_routes,
+    enable_dispatch_routes,
+    remove_function_route,
+    set_function_route,
+)
+from funix.decorator.reactive import ReactiveUpdater, set_reactive_config
+from funix.decorator.runtime import InstancePool, register_class_methods
+from funix.decorator.schema_cache import (
+    get_schema_cache_key,
+    load_schema,
+    save_schema,
+    set_schema_cache_config,
+)
+from funix.decorator.table import (
+    enable_table_service,
+    is_dataframe,
+    set_table_config,
+)
+from funix.decorator.upload import (
+    check_upload_sizes,
+    enable_upload_service,
+    get_upload_mode,
+    load_upload,
+    load_uploads,
+    release_buffers,
+    set_upload_config,
+)
 from funix.hint import (
     ArgumentConfigType,
     ConditionalVisibleType,
@@ -98,6 +131,7 @@ A dict, key is the IPython type name, value is the Funix type name.
 __dataframe_convert_dict = {
     "pandera.typing.pandas.DataFrame": "Dataframe",
     "pandas.core.frame.DataFrame": "Dataframe",
+    "pandas.DataFrame": "Dataframe",
 }
 """
 A dict, key is the dataframe type name, value is the Funix type name.
@@ -207,6 +241,20 @@ module_functions_counter: dict[str, int] = {}
 A dict, key is module name, value is the number of functions in the module.
 """
 
+__lazy_functions: dict[tuple[str, str], DecoratedFunctionListItem] = {}
+"""
+A dict, key is (module or menu, function name), value is the function list item of a function that is listed but not
+decorated yet: its file is lazy and not imported yet, or it is being reloaded.
+"""
+
+__function_registry: dict[
+    tuple[str | None, str], tuple[DecoratedFunctionListItem, str]
+] = {}
+"""
+A dict, key is (module or menu, function name), value is the function list item and the name in
+`__decorated_functions_names_list`.
+"""
+
 default_function: str | None = None
 """
 Default function id.
@@ -487,6 +535,8 @@ def set_kumo_info(url: str, token: str) -> None:
     global kumo_callback_url, kumo_callback_token
     kumo_callback_url = url
     kumo_callback_token = token
+    if url and token:
+        start_kumo_reporter(url, token)
 
 
 def set_rate_limiters(limiters: list[Limiter]):
@@ -565,6 +615,8 @@ def make_decorated_functions_happy() -> list[dict]:
     for i in __decorated_functions_list:
         if i["module"] in module_functions_counter:
             if module_functions_counter[i["module"]] == 1:
+                # Copy it, the items keep the full module names for lazy and reloaded functions
+                i = dict(i)
                 if "." in i["module"]:
                     i["module"] = ".".join(i["module"].split(".")[0:-1])
                 else:
@@ -574,6 +626,155 @@ def make_decorated_functions_happy() -> list[dict]:
     return new_decorated_functions_list
 
 
+def register_lazy_functions(
+    functions: list[dict],
+    module: str,
+    loader: Callable[[], None],
+    default_name: str | None = None,
+) -> None:
+    """
+    List and route the functions of a file before importing it, the file is imported by `loader` on the first request.
+
+    Parameters:
+        functions (list[dict]): The functions found by `funix.decorator.lazy.scan_funix_functions`.
+        module (str): The module name of the file, like `now_module`.
+        loader (Callable[[], None]): Imports the file.
+        default_name (str | None): The default function name in the file.
+
+    Raises:
+        ValueError: If a function name is not allowed or already exists.
+        Exception: If a path is not allowed.
+    """
+    global default_function
+    for function in functions:
+        function_name = function["name"]
+        replace_module = function["menu"] or module
+        module_functions_counter[replace_module] = (
+            module_functions_counter.get(replace_module, 0) + 1
+        )
+        function_id = str(uuid4())
+        unique_function_name = module.replace(".", "/") + "/" + function_name
+
+        if function_name in banned_function_name_and_path:
+            raise ValueError(
+                f"{function_name} is not allowed, banned names: {banned_function_name_and_path}"
+            )
+
+        path = function["path"]
+        if not path:
+            endpoint = unique_function_name
+        else:
+            if path in banned_function_name_and_path:
+                raise Exception(f"{function_name}'s path: {path} is not allowed")
+            endpoint = path.strip("/")
+
+        if unique_function_name in __decorated_functions_names_list:
+            raise ValueError(
+                f"Function with name {function_name} already exists, you better check other files, they may "
+                f"have the same function name"
+            )
+        __decorated_functions_names_list.append(unique_function_name)
+
+        if function_name == default_name:
+            default_function = function_id
+
+        function_item: DecoratedFunctionListItem = {
+            "name": function["title"] or function_name,
+            "path": endpoint,
+            "module": replace_module,
+            "secret": None,
+            "id": function_id,
+            "websocket": function["websocket"],
+            "reactive": function["reactive"],
+        }
+        __decorated_functions_list.append(function_item)
+        __lazy_functions[(replace_module, function_name)] = function_item
+        __function_registry[(replace_module, function_name)] = (
+            function_item,
+            unique_function_name,
+        )
+
+        rules = [(f"/param/{function_id}", "GET"), (f"/param/{endpoint}", "GET")]
+        if function["websocket"]:
+            rules.append((f"/call/{function_id}", "WS"))
+        else:
+            rules.append((f"/call/{endpoint}", "POST"))
+            rules.append((f"/call/{function_id}", "POST"))
+        if function["reactive"]:
+            rules.append((f"/update/{function_id}", "POST"))
+            rules.append((f"/update/{endpoint}", "POST"))
+        add_lazy_routes(rules, loader)
+
+
+def get_function_keys() -> set[tuple[str | None, str]]:
+    """
+    Get the keys of the decorated and listed functions.
+
+    Returns:
+        set[tuple[str | None, str]]: The keys, (module or menu, function name).
+    """
+    return set(__function_registry.keys())
+
+
+def __disable_function_routes(names: list[str]) -> None:
+    """
+    Make the routes of a function return 404, names are its id and/or path.
+    """
+    for prefix in ["param", "call", "update", "verify"]:
+        for name in names:
+            remove_function_route(f"/{prefix}/{name}")
+
+
+def prepare_reload(keys: set[tuple[str | None, str]]) -> None:
+    """
+    Prepare the functions of a file to be decorated again, they keep their ids and places in the function list.
+
+    Parameters:
+        keys (set[tuple[str | None, str]]): The keys of the functions in the file.
+    """
+    for key in keys:
+        __lazy_functions[key] = __function_registry[key][0]
+
+
+def finish_reload(
+    keys: set[tuple[str | None, str]], remove: bool
+) -> set[tuple[str | None, str]]:
+    """
+    Finish reloading a file, the functions that are not decorated again are removed.
+
+    Parameters:
+        keys (set[tuple[str | None, str]]): The keys passed to `prepare_reload`.
+        remove (bool): Remove the functions that are not decorated again, `False` keeps them as they were (if the
+            file failed to import).
+
+    Returns:
+        set[tuple[str | None, str]]: The keys of the removed functions.
+    """
+    global cached_list_functions, default_function
+    removed = set()
+    for key in keys:
+        function_item = __lazy_functions.pop(key, None)
+        if function_item is None:
+            continue
+        if not remove:
+            continue
+        __disable_function_routes([function_item["id"], function_item["path"]])
+        registered_name = __function_registry.pop(key)[1]
+        __decorated_functions_list.remove(function_item)
+        __decorated_functions_names_list.remove(registered_name)
+        counter_key = key[0] if key[0] else "$Funix_Main"
+        module_functions_counter[counter_key] -= 1
+        if module_functions_counter[counter_key] == 0:
+            module_functions_counter.pop(counter_key)
+        __decorated_secret_functions_dict.pop(function_item["id"], None)
+        __decorated_id_to_function_dict.pop(function_item["id"], None)
+        if default_function == function_item["id"]:
+            default_function = None
+        removed.add(key)
+    cached_list_functions = []
+    return removed
+
+
 def enable_wrapper() -> None:
     """
     Enable the wrapper, this will add the list and file path to the app.
@@ -599,7 +800,10 @@ def enable_wrapper() -> None:
                 "default_function": default_function,
             }
 
+        enable_dispatch_routes()
         enable_file_service()
+        enable_table_service()
+        enable_upload_service()
 
 
 def set_default_theme(theme: str) -> None:
@@ -675,20 +879,9 @@ def export_secrets():
 
 def kumo_callback():
     """
-    Kumo callback.
+    Kumo callback. Only counts the call, the counts are sent in the background.
     """
-    global kumo_callback_url, kumo_callback_token
-    if kumo_callback_url and kumo_callback_token:
-        try:
-            post(
-                kumo_callback_url,
-                json={
-                    "token": kumo_callback_token,
-                },
-                timeout=1,
-            )
-        except:
-            pass
+    record_kumo_call()
 
 
 def funix(
@@ -774,9 +967,16 @@ def funix(
         Raises:
             Check code for details
         """
-        global default_function
+        global default_function, cached_list_functions
         if __wrapper_enabled:
-            if menu:
+            # Listed before the file is imported or reloaded, keep its id and the counters
+            lazy_function = __lazy_functions.pop(
+                (menu or now_module, getattr(function, "__name__")), None
+            )
+
+            if lazy_function is not None:
+                pass
+            elif menu:
                 module_functions_counter[menu] = (
                     module_functions_counter.get(menu, 0) + 1
                 )
@@ -789,7 +989,10 @@ def funix(
                     module_functions_counter.get("$Funix_Main", 0) + 1
                 )
 
-            function_id = str(uuid4())
+            if lazy_function is not None:
+                function_id = lazy_function["id"]
+            else:
+                function_id = str(uuid4())
 
             if default:
                 default_function = function_id
@@ -867,7 +1070,9 @@ def funix(
                     raise Exception(f"{function_name}'s path: {path} is not allowed")
                 endpoint = path.strip("/")
 
-            if unique_function_name:
+            if lazy_function is not None:
+                pass
+            elif unique_function_name:
                 if unique_function_name in __decorated_functions_names_list:
                     raise ValueError(
                         f"Function with name {function_name} already exists, you better check other files, they may "
@@ -897,10 +1102,19 @@ def funix(
             if menu:
                 replace_module = menu
 
-            if unique_function_name:
-                __decorated_functions_names_list.append(unique_function_name)
+            registered_name = (
+                unique_function_name if unique_function_name else function_title
+            )
+            function_key = (menu or now_module, function_name)
+
+            if lazy_function is not None:
+                old_registered_name = __function_registry[function_key][1]
+                if old_registered_name != registered_name:
+                    __decorated_functions_names_list[
+                        __decorated_functions_names_list.index(old_registered_name)
+                    ] = registered_name
             else:
-                __decorated_functions_names_list.append(function_title)
+                __decorated_functions_names_list.append(registered_name)
 
             need_websocket = isgeneratorfunction(function)
 
@@ -963,35 +1177,21 @@ def funix(
                                     )
                                 reactive_config[reactive_param][1][key] = key
 
-                def function_reactive_update():
-                    reactive_param_value = {}
+                reactive_updater = ReactiveUpdater(function_id, reactive_config)
 
+                def function_reactive_update():
+                    if not session.get("__funix_id"):
+                        session["__funix_id"] = uuid4().hex
                     form_data = request.get_json()
-
-                    for key_, item_ in reactive_config.items():
-                        argument_key: str = key_
-                        callable_function: Callable = item_[0]
-                        callable_config: dict[str, str] = item_[1]
-
-                        try:
-                            if callable_config == {}:
-                                reactive_param_value[argument_key] = callable_function(
-                                    **form_data
-                                )
-                            else:
-                                new_form_data = {}
-                                for key__, value in callable_config.items():
-                                    new_form_data[key__] = form_data[value]
-                                reactive_param_value[argument_key] = callable_function(
-                                    **new_form_data
-                                )
-                        except:
-                            pass
-
-                    if reactive_param_value == {}:
-                        return {"result": None}
-
-                    return {"result": reactive_param_value}
+                    # Sent by the frontend since it knows which fields changed, older ones send the form only
+                    changed = form_data.pop("__funix_changed", None)
+                    return {
+                        "result": reactive_updater.update(
+                            session["__funix_id"],
+                            form_data,
+                            changed if isinstance(changed, list) else None,
+                        )
+                    }
 
                 function_reactive_update.__name__ = function_name + "_reactive_update"
 
@@ -1000,11 +1200,29 @@ def funix(
                         f"{safe_module_now}_{function_reactive_update.__name__}"
                     )
 
-                app.post(f"/update/{function_id}")(function_reactive_update)
-                app.post(f"/update/{endpoint}")(function_reactive_update)
+                set_function_route(
+                    f"/update/{function_id}", function_reactive_update, "POST"
+                )
+                set_function_route(
+                    f"/update/{endpoint}", function_reactive_update, "POST"
+                )
 
-            __decorated_functions_list.append(
-                {
+            if lazy_function is not None:
+                if lazy_function["path"] != endpoint:
+                    __disable_function_routes([lazy_function["path"]])
+                lazy_function.update(
+                    {
+                        "name": function_title,
+                        "path": endpoint,
+                        "secret": secret_key,
+                        "websocket": need_websocket,
+                        "reactive": has_reactive_params,
+                    }
+                )
+                cached_list_functions = []
+                function_item = lazy_function
+            else:
+                function_item = {
                     "name": function_title,
                     "path": endpoint,
                     "module": replace_module,
@@ -1013,212 +1231,13 @@ def funix(
                     "websocket": need_websocket,
                     "reactive": has_reactive_params,
                 }
-            )
-
-            if show_source:
-                source_code = getsource(function)
-            else:
-                source_code = ""
+                __decorated_functions_list.append(function_item)
+            __function_registry[function_key] = (function_item, registered_name)
 
-            decorated_params = {}
-            json_schema_props = {}
-
-            cast_to_list_flag = False
-
-            if function_signature.return_annotation is not Signature.empty:
-                # TODO: Magic code, I've forgotten what it does, but it works, refactor it if you can
-                # return type dict enforcement for yodas only
-                try:
-                    if (
-                        cast_to_list_flag := function_signature.return_annotation.__class__.__name__
-                        == "tuple"
-                        or function_signature.return_annotation.__name__ == "Tuple"
-                    ):
-                        parsed_return_annotation_list = []
-                        return_annotation = list(
-                            function_signature.return_annotation
-                            if function_signature.return_annotation.__class__.__name__
-                            == "tuple"
-                            else function_signature.return_annotation.__args__
-                        )
-                        for return_annotation_type in return_annotation:
-                            return_annotation_type_name = getattr(
-                                return_annotation_type, "__name__"
-                            )
-                            full_type_name = (
-                                getattr(return_annotation_type, "__module__")
-                                + "."
-                                + return_annotation_type_name
-                            )
-                            if return_annotation_type_name in supported_basic_types:
-                                return_annotation_type_name = (
-                                    supported_basic_types_dict[
-                                        return_annotation_type_name
-                                    ]
-                                )
-                            elif return_annotation_type_name == "List":
-                                list_type_name = getattr(
-                                    getattr(return_annotation_type, "__args__")[0],
-                                    "__name__",
-                                )
-                                if list_type_name in supported_basic_file_types:
-                                    return_annotation_type_name = list_type_name
-                            if full_type_name in __ipython_type_convert_dict:
-                                return_annotation_type_name = (
-                                    __ipython_type_convert_dict[full_type_name]
-                                )
-                            elif full_type_name in __dataframe_convert_dict:
-                                return_annotation_type_name = __dataframe_convert_dict[
-                                    full_type_name
-                                ]
-                            parsed_return_annotation_list.append(
-                                return_annotation_type_name
-                            )
-                        return_type_parsed = parsed_return_annotation_list
-                    else:
-                        if hasattr(
-                            function_signature.return_annotation, "__annotations__"
-                        ):
-                            return_type_raw = getattr(
-                                function_signature.return_annotation, "__annotations__"
-                            )
-                            if getattr(type(return_type_raw), "__name__") == "dict":
-                                if (
-                                    function_signature.return_annotation.__name__
-                                    == "Figure"
-                                ):
-                                    return_type_parsed = "Figure"
-                                else:
-                                    if hasattr(
-                                        function_signature.return_annotation,
-                                        "__module__",
-                                    ):
-                                        full_name = (
-                                            getattr(
-                                                function_signature.return_annotation,
-                                                "__module__",
-                                            )
-                                            + "."
-                                            + getattr(
-                                                function_signature.return_annotation,
-                                                "__name__",
-                                            )
-                                        )
-                                        if full_name in __ipython_type_convert_dict:
-                                            return_type_parsed = (
-                                                __ipython_type_convert_dict[full_name]
-                                            )
-                                        elif full_name in __dataframe_convert_dict:
-                                            return_type_parsed = (
-                                                __dataframe_convert_dict[full_name]
-                                            )
-                                        else:
-                                            # TODO: DO MORE
-                                            return_type_parsed = None
-                                    else:
-                                        return_type_parsed = {}
-                                        for (
-                                            return_type_key,
-                                            return_type_value,
-                                        ) in return_type_raw.items():
-                                            return_type_parsed[return_type_key] = str(
-                                                return_type_value
-                                            )
-                            else:
-                                return_type_parsed = str(return_type_raw)
-                        else:
-                            return_type_parsed = getattr(
-                                function_signature.return_annotation, "__name__"
-                            )
-                            if return_type_parsed in supported_basic_types:
-                                return_type_parsed = supported_basic_types_dict[
-                                    return_type_parsed
-                                ]
-                            elif return_type_parsed == "List":
-                                list_type_name = getattr(
-                                    getattr(
-                                        function_signature.return_annotation, "__args__"
-                                    )[0],
-                                    "__name__",
-                                )
-                                if list_type_name in supported_basic_file_types:
-                                    return_type_parsed = list_type_name
-                except:
-                    return_type_parsed = get_type_dict(
-                        function_signature.return_annotation
-                    )
-                    if return_type_parsed is not None:
-                        return_type_parsed = return_type_parsed["type"]
-            else:
-                return_type_parsed = None
-
-            return_input_layout = []
-
-            safe_input_layout = [] if not input_layout else input_layout
-
-            for row in safe_input_layout:
-                row_layout = []
-                for row_item in row:
-                    row_item_done = row_item
-                    for common_row_item_key in ["markdown", "html"]:
-                        if common_row_item_key in row_item:
-                            row_item_done = convert_row_item(
-                                row_item, common_row_item_key
-                            )
-                    if "argument" in row_item:
-                        if row_item["argument"] not in decorated_params:
-                            decorated_params[row_item["argument"]] = {}
-                        decorated_params[row_item["argument"]]["customLayout"] = True
-                        row_item_done["type"] = "argument"
-                    elif "divider" in row_item:
-                        row_item_done["type"] = "divider"
-                        if isinstance(row_item["divider"], str):
-                            row_item_done["content"] = row_item_done["divider"]
-                        row_item_done.pop("divider")
-                    row_layout.append(row_item_done)
-                return_input_layout.append(row_layout)
-
-            return_output_layout = []
-            return_output_indexes = []
-
-            safe_output_layout = [] if not output_layout else output_layout
-
-            for row in safe_output_layout:
-                row_layout = []
-                for row_item in row:
-                    row_item_done = row_item
-                    for common_row_item_key in [
-                        "markdown",
-                        "html",
-                        "images",
-                        "videos",
-                        "audios",
-                        "files",
-                    ]:
-                        if common_row_item_key in row_item:
-                            row_item_done = convert_row_item(
-                                row_item, common_row_item_key
-                            )
-                    if "divider" in row_item:
-                        row_item_done["type"] = "divider"
-                        if isinstance(row_item["divider"], str):
-                            row_item_done["content"] = row_item_done["divider"]
-                        row_item_done.pop("divider")
-                    elif "code" in row_item:
-                        row_item_done = row_item
-                        row_item_done["type"] = "code"
-                        row_item_done["content"] = row_item_done["code"]
-                        row_item_done.pop("code")
-                    elif "return_index" in row_item:
-                        row_item_done["type"] = "return_index"
-                        row_item_done["index"] = row_item_done["return_index"]
-                        row_item_done.pop("return_index")
-                        if isinstance(row_item_done["index"], int):
-                            return_output_indexes.append(row_item_done["index"])
-                        elif isinstance(row_item_done["index"], list):
-                            return_output_indexes.extend(row_item_done["index"])
-                    row_layout.append(row_item_done)
-                return_output_layout.append(row_layout)
+            upload_modes = {
+                param_name: get_upload_mode(param.annotation)
+                for param_name, param in function_signature.parameters.items()
+            }
 
             if pre_fill:
                 for _, from_arg_function_info in pre_fill.items():
@@ -1244,464 +1263,776 @@ def funix(
                                 PreFillEmpty
                             ]
 
-            def create_decorated_params(arg_name: str) -> None:
-                """
-                Creates a decorated_params entry for the given arg_name if it doesn't exist
+            columnar_item_type = get_columnar_item_type(
+                function_signature.return_annotation
+            )
 
-                Parameters:
-                    arg_name (str): The name of the argument
-                """
-                if arg_name not in decorated_params:
-                    decorated_params[arg_name] = {}
+            schema_cache_key = get_schema_cache_key(
+                function,
+                function_signature,
+                {
+                    "title": function_title,
+                    "description": description,
+                    "destination": destination,
+                    "direction": function_direction,
+                    "show_source": show_source,
+                    "widgets": widgets,
+                    "treat_as": treat_as,
+                    "whitelist": whitelist,
+                    "examples": examples,
+                    "argument_labels": argument_labels,
+                    "input_layout": input_layout,
+                    "output_layout": output_layout,
+                    "conditional_visible": conditional_visible,
+                    "argument_config": argument_config,
+                    "theme": parsed_theme,
+                },
+            )
+            cached_schema = load_schema(schema_cache_key)
+
+            if cached_schema is not None:
+                decorated_function = cached_schema["function"]
+                decorated_function["id"] = function_id
+                json_schema_props = decorated_function["schema"]["properties"]
+                return_type_parsed = decorated_function["return_type"]
+                cast_to_list_flag = cached_schema["cast_to_list"]
+                columnar_return = cached_schema["columnar_return"]
+                for typed_param in cached_schema["typed_params"]:
+                    parse_type_metadata[function_id][typed_param] = function_params[
+                        typed_param
+                    ].annotation
+                if cached_schema["dataframe"] is not None:
+                    dataframe_parse_metadata[function_id] = cached_schema["dataframe"]
+                if cached_schema["figure"]:
+                    warm_up_figure_renderer()
+            else:
+                if show_source:
+                    source_code = getsource(function)
+                else:
+                    source_code = ""
 
-            def put_props_in_params(
-                arg_name: str, prop_name: str, prop_value: Any
-            ) -> None:
-                """
-                Puts the given prop_name and prop_value in the decorated_params entry for the given arg_name
+                decorated_params = {}
+                json_schema_props = {}
 
-                Parameters:
-                    arg_name (str): The name of the argument
-                    prop_name (str): The name of the prop
-                    prop_value (Any): The value of the prop
-                """
-                create_decorated_params(arg_name)
-                decorated_params[arg_name][prop_name] = prop_value
+                cast_to_list_flag = False
 
-            def check_example_whitelist(arg_name: str) -> None:
-                """
-                Checks if the given arg_name has both an example and a whitelist
+                if function_signature.return_annotation is not Signature.empty:
+                    # TODO: Magic code, I've forgotten what it does, but it works, refactor it if you can
+                    # return type dict enforcement for yodas only
+                    try:
+                        if (
+                            cast_to_list_flag := function_signature.return_annotation.__class__.__name__
+                            == "tuple"
+                            or function_signature.return_annotation.__name__ == "Tuple"
+                        ):
+                            parsed_return_annotation_list = []
+                            return_annotation = list(
+                                function_signature.return_annotation
+                                if function_signature.return_annotation.__class__.__name__
+                                == "tuple"
+                                else function_signature.return_annotation.__args__
+                            )
+                            for return_annotation_type in return_annotation:
+                                return_annotation_type_name = getattr(
+                                    return_annotation_type, "__name__"
+                                )
+                                full_type_name = (
+                                    getattr(return_annotation_type, "__module__")
+                                    + "."
+                                    + return_annotation_type_name
+                                )
+                                if return_annotation_type_name in supported_basic_types:
+                                    return_annotation_type_name = (
+                                        supported_basic_types_dict[
+                                            return_annotation_type_name
+                                        ]
+                                    )
+                                elif return_annotation_type_name == "List":
+                                    list_type_name = getattr(
+                                        getattr(return_annotation_type, "__args__")[0],
+                                        "__name__",
+                                    )
+                                    if list_type_name in supported_basic_file_types:
+                                        return_annotation_type_name = list_type_name
+                                if full_type_name in __ipython_type_convert_dict:
+                                    return_annotation_type_name = (
+                                        __ipython_type_convert_dict[full_type_name]
+                                    )
+                                elif full_type_name in __dataframe_convert_dict:
+                                    return_annotation_type_name = (
+                                        __dataframe_convert_dict[full_type_name]
+                                    )
+                                parsed_return_annotation_list.append(
+                                    return_annotation_type_name
+                                )
+                            return_type_parsed = parsed_return_annotation_list
+                        else:
+                            if hasattr(
+                                function_signature.return_annotation, "__annotations__"
+                            ):
+                                return_type_raw = getattr(
+                                    function_signature.return_annotation,
+                                    "__annotations__",
+                                )
+                                if getattr(type(return_type_raw), "__name__") == "dict":
+                                    if (
+                                        function_signature.return_annotation.__name__
+                                        == "Figure"
+                                    ):
+                                        return_type_parsed = "Figure"
+                                    else:
+                                        if hasattr(
+                                            function_signature.return_annotation,
+                                            "__module__",
+                                        ):
+                                            full_name = (
+                                                getattr(
+                                                    function_signature.return_annotation,
+                                                    "__module__",
+                                                )
+                                                + "."
+                                                + getattr(
+                                                    function_signature.return_annotation,
+                                                    "__name__",
+                                                )
+                                            )
+                                            if full_name in __ipython_type_convert_dict:
+                                                return_type_parsed = (
+                                                    __ipython_type_convert_dict[
+                                                        full_name
+                                                    ]
+                                                )
+                                            elif full_name in __dataframe_convert_dict:
+                                                return_type_parsed = (
+                                                    __dataframe_convert_dict[full_name]
+                                                )
+                                            else:
+                                                # TODO: DO MORE
+                                                return_type_parsed = None
+                                        else:
+                                            return_type_parsed = {}
+                                            for (
+                                                return_type_key,
+                                                return_type_value,
+                                            ) in return_type_raw.items():
+                                                return_type_parsed[return_type_key] = (
+                                                    str(return_type_value)
+                                                )
+                                else:
+                                    return_type_parsed = str(return_type_raw)
+                            else:
+                                return_type_parsed = getattr(
+                                    function_signature.return_annotation, "__name__"
+                                )
+                                if return_type_parsed in supported_basic_types:
+                                    return_type_parsed = supported_basic_types_dict[
+                                        return_type_parsed
+                                    ]
+                                elif return_type_parsed == "List":
+                                    list_type_name = getattr(
+                                        getattr(
+                                            function_signature.return_annotation,
+                                            "__args__",
+                                        )[0],
+                                        "__name__",
+                                    )
+                                    if list_type_name in supported_basic_file_types:
+                                        return_type_parsed = list_type_name
+                    except:
+                        return_type_parsed = get_type_dict(
+                            function_signature.return_annotation
+                        )
+                        if return_type_parsed is not None:
+                            return_type_parsed = return_type_parsed["type"]
+                else:
+                    return_type_parsed = None
+
+                figure_return = return_type_parsed == "Figure" or (
+                    isinstance(return_type_parsed, list)
+                    and "Figure" in return_type_parsed
+                )
+                if figure_return:
+                    warm_up_figure_renderer()
 
-                Parameters:
-                    arg_name (str): The name of the argument
+                columnar_return = (
+                    return_type_parsed == "Dataframe" or columnar_item_type is not None
+                )
 
-                Raises:
-                    ValueError: If the given arg_name has both an example and a whitelist
-                """
-                if arg_name in decorated_params:
-                    if (
-                        "example" in decorated_params[arg_name]
-                        and "whitelist" in decorated_params[arg_name]
-                    ):
-                        raise ValueError(
-                            f"{function_name}: {arg_name} has both an example and a whitelist"
-                        )
+                return_input_layout = []
 
-            def parse_widget(widget_info: str | tuple | list) -> list[str] | str:
-                """
-                Parses the given widget_info
+                safe_input_layout = [] if not input_layout else input_layout
+
+                for row in safe_input_layout:
+                    row_layout = []
+                    for row_item in row:
+                        row_item_done = row_item
+                        for common_row_item_key in ["markdown", "html"]:
+                            if common_row_item_key in row_item:
+                                row_item_done = convert_row_item(
+                                    row_item, common_row_item_key
+                                )
+                        if "argument" in row_item:
+                            if row_item["argument"] not in decorated_params:
+                                decorated_params[row_item["argument"]] = {}
+                            decorated_params[row_item["argument"]][
+                                "customLayout"
+                            ] = True
+                            row_item_done["type"] = "argument"
+                        elif "divider" in row_item:
+                            row_item_done["type"] = "divider"
+                            if isinstance(row_item["divider"], str):
+                                row_item_done["content"] = row_item_done["divider"]
+                            row_item_done.pop("divider")
+                        row_layout.append(row_item_done)
+                    return_input_layout.append(row_layout)
+
+                return_output_layout = []
+                return_output_indexes = []
+
+                safe_output_layout = [] if not output_layout else output_layout
+
+                for row in safe_output_layout:
+                    row_layout = []
+                    for row_item in row:
+                        row_item_done = row_item
+                        for common_row_item_key in [
+                            "markdown",
+                            "html",
+                            "images",
+                            "videos",
+                            "audios",
+                            "files",
+                        ]:
+                            if common_row_item_key in row_item:
+                                row_item_done = convert_row_item(
+                                    row_item, common_row_item_key
+                                )
+                        if "divider" in row_item:
+                            row_item_done["type"] = "divider"
+                            if isinstance(row_item["divider"], str):
+                                row_item_done["content"] = row_item_done["divider"]
+                            row_item_done.pop("divider")
+                        elif "code" in row_item:
+                            row_item_done = row_item
+                            row_item_done["type"] = "code"
+                            row_item_done["content"] = row_item_done["code"]
+                            row_item_done.pop("code")
+                        elif "return_index" in row_item:
+                            row_item_done["type"] = "return_index"
+                            row_item_done["index"] = row_item_done["return_index"]
+                            row_item_done.pop("return_index")
+                            if isinstance(row_item_done["index"], int):
+                                return_output_indexes.append(row_item_done["index"])
+                            elif isinstance(row_item_done["index"], list):
+                                return_output_indexes.extend(row_item_done["index"])
+                        row_layout.append(row_item_done)
+                    return_output_layout.append(row_layout)
+
+                def create_decorated_params(arg_name: str) -> None:
+                    """
+                    Creates a decorated_params entry for the given arg_name if it doesn't exist
 
-                Parameters:
-                    widget_info (str | tuple | list): The widget_info to parse
+                    Parameters:
+                        arg_name (str): The name of the argument
+                    """
+                    if arg_name not in decorated_params:
+                        decorated_params[arg_name] = {}
 
-                Returns:
-                    list[str] | str: The widget
-                """
-                if isinstance(widget_info, str):
-                    return widget_info
-                elif isinstance(widget_info, tuple):
-                    return generate_frontend_widget_config(widget_info)
-                elif isinstance(widget_info, list):
-                    widget_result = []
-                    for widget_item in widget_info:
-                        if isinstance(widget_item, tuple):
-                            widget_result.append(
-                                generate_frontend_widget_config(widget_item)
-                            )
-                        elif isinstance(widget_item, list):
-                            widget_result.append(parse_widget(widget_item))
-                        elif isinstance(widget_item, str):
-                            widget_result.append(widget_item)
-                    return widget_result
-
-            def iter_over_prop(
-                argument_type: str,
-                argument: dict[str | tuple, Any] | None,
-                callback,
-            ):
-                """
-                callback: pass in (argument_type, key, key_idx, value)
-                """
-                if argument is None:
-                    return
-
-                for arg_idx, arg_key in enumerate(argument):
-                    if isinstance(arg_key, str):
-                        callback(argument_type, arg_key, 0, argument[arg_key])
-                    elif isinstance(arg_key, tuple):
-                        for key_idx, single_key in enumerate(arg_key):
-                            callback(
-                                argument_type, single_key, key_idx, argument[arg_key]
+                def put_props_in_params(
+                    arg_name: str, prop_name: str, prop_value: Any
+                ) -> None:
+                    """
+                    Puts the given prop_name and prop_value in the decorated_params entry for the given arg_name
+
+                    Parameters:
+                        arg_name (str): The name of the argument
+                        prop_name (str): The name of the prop
+                        prop_value (Any): The value of the prop
+                    """
+                    create_decorated_params(arg_name)
+                    decorated_params[arg_name][prop_name] = prop_value
+
+                def check_example_whitelist(arg_name: str) -> None:
+                    """
+                    Checks if the given arg_name has both an example and a whitelist
+
+                    Parameters:
+                        arg_name (str): The name of the argument
+
+                    Raises:
+                        ValueError: If the given arg_name has both an example and a whitelist
+                    """
+                    if arg_name in decorated_params:
+                        if (
+                            "example" in decorated_params[arg_name]
+                            and "whitelist" in decorated_params[arg_name]
+                        ):
+                            raise ValueError(
+                                f"{function_name}: {arg_name} has both an example and a whitelist"
                             )
-                    else:
-                        raise TypeError(
-                            f"Argument `{argument_type}` has invalid key type {type(argument)}"
-                        )
 
-            function_params_name: list[str] = list(function_params.keys())
-
-            def expand_wildcards(origin_key: str, search_list: list[str]) -> list[str]:
-                keys = []
-                if "*" in origin_key or "?" in origin_key:
-                    for param_name in search_list:
-                        if pathlib.PurePath(param_name).match(origin_key):
-                            keys.append(param_name)
-                elif origin_key.startswith("regex:"):
-                    regex = re.compile(origin_key[6:])
-                    for param_name in search_list:
-                        if regex.search(param_name) is not None:
-                            keys.append(param_name)
-                else:
-                    keys.append(origin_key)
-                return keys
+                def parse_widget(widget_info: str | tuple | list) -> list[str] | str:
+                    """
+                    Parses the given widget_info
 
-            def process_widgets(arg_type: str, arg_key: str, key_idx: int, value: any):
-                parsed_widget = parse_widget(value)
-                for expanded_key in expand_wildcards(arg_key, function_params_name):
-                    put_props_in_params(expanded_key, arg_type, parsed_widget)
+                    Parameters:
+                        widget_info (str | tuple | list): The widget_info to parse
 
-            iter_over_prop("widget", widgets, process_widgets)
+                    Returns:
+                        list[str] | str: The widget
+                    """
+                    if isinstance(widget_info, str):
+                        return widget_info
+                    elif isinstance(widget_info, tuple):
+                        return generate_frontend_widget_config(widget_info)
+                    elif isinstance(widget_info, list):
+                        widget_result = []
+                        for widget_item in widget_info:
+                            if isinstance(widget_item, tuple):
+                                widget_result.append(
+                                    generate_frontend_widget_config(widget_item)
+                                )
+                            elif isinstance(widget_item, list):
+                                widget_result.append(parse_widget(widget_item))
+                            elif isinstance(widget_item, str):
+                                widget_result.append(widget_item)
+                        return widget_result
+
+                def iter_over_prop(
+                    argument_type: str,
+                    argument: dict[str | tuple, Any] | None,
+                    callback,
+                ):
+                    """
+                    callback: pass in (argument_type, key, key_idx, value)
+                    """
+                    if argument is None:
+                        return
+
+                    for arg_idx, arg_key in enumerate(argument):
+                        if isinstance(arg_key, str):
+                            callback(argument_type, arg_key, 0, argument[arg_key])
+                        elif isinstance(arg_key, tuple):
+                            for key_idx, single_key in enumerate(arg_key):
+                                callback(
+                                    argument_type,
+                                    single_key,
+                                    key_idx,
+                                    argument[arg_key],
+                                )
+                        else:
+                            raise TypeError(
+                                f"Argument `{argument_type}` has invalid key type {type(argument)}"
+                            )
 
-            def process_title(arg_type: str, arg_key: str, key_idx: int, value: any):
-                for expanded_key in expand_wildcards(arg_key, function_params_name):
-                    put_props_in_params(expanded_key, arg_type, value)
+                function_params_name: list[str] = list(function_params.keys())
+
+                def expand_wildcards(
+                    origin_key: str, search_list: list[str]
+                ) -> list[str]:
+                    keys = []
+                    if "*" in origin_key or "?" in origin_key:
+                        for param_name in search_list:
+                            if pathlib.PurePath(param_name).match(origin_key):
+                                keys.append(param_name)
+                    elif origin_key.startswith("regex:"):
+                        regex = re.compile(origin_key[6:])
+                        for param_name in search_list:
+                            if regex.search(param_name) is not None:
+                                keys.append(param_name)
+                    else:
+                        keys.append(origin_key)
+                    return keys
 
-            iter_over_prop("title", argument_labels, process_title)
+                def process_widgets(
+                    arg_type: str, arg_key: str, key_idx: int, value: any
+                ):
+                    parsed_widget = parse_widget(value)
+                    for expanded_key in expand_wildcards(arg_key, function_params_name):
+                        put_props_in_params(expanded_key, arg_type, parsed_widget)
 
-            def process_treat_as(arg_type: str, arg_key: str, key_idx: int, value: any):
-                put_props_in_params(arg_key, arg_type, value)
+                iter_over_prop("widget", widgets, process_widgets)
 
-            iter_over_prop("treat_as", treat_as, process_treat_as)
+                def process_title(
+                    arg_type: str, arg_key: str, key_idx: int, value: any
+                ):
+                    for expanded_key in expand_wildcards(arg_key, function_params_name):
+                        put_props_in_params(expanded_key, arg_type, value)
 
-            def process_examples_and_whitelist(
-                arg_type: str, arg_key: str, key_idx: int, value: any
-            ):
-                put_props_in_params(arg_key, arg_type, value[key_idx])
-                check_example_whitelist(arg_key)
+                iter_over_prop("title", argument_labels, process_title)
 
-            iter_over_prop("example", examples, process_examples_and_whitelist)
-            iter_over_prop("whitelist", whitelist, process_examples_and_whitelist)
+                def process_treat_as(
+                    arg_type: str, arg_key: str, key_idx: int, value: any
+                ):
+                    put_props_in_params(arg_key, arg_type, value)
 
-            input_attr = ""
+                iter_over_prop("treat_as", treat_as, process_treat_as)
 
-            safe_argument_config = {} if argument_config is None else argument_config
+                def process_examples_and_whitelist(
+                    arg_type: str, arg_key: str, key_idx: int, value: any
+                ):
+                    put_props_in_params(arg_key, arg_type, value[key_idx])
+                    check_example_whitelist(arg_key)
 
-            for decorator_arg_name, decorator_arg_dict in safe_argument_config.items():
-                if isinstance(decorator_arg_name, str):
-                    decorator_arg_names = [decorator_arg_name]
-                else:
-                    decorator_arg_names = list(decorator_arg_name)
-                for single_decorator_arg_name in decorator_arg_names:
-                    if single_decorator_arg_name not in decorated_params:
-                        decorated_params[single_decorator_arg_name] = {}
-
-                    treat_as_config = decorator_arg_dict.get("treat_as", "config")
-                    decorated_params[single_decorator_arg_name][
-                        "treat_as"
-                    ] = treat_as_config
-                    if treat_as_config != "config":
-                        input_attr = (
-                            decorator_arg_dict["treat_as"]
-                            if input_attr == ""
-                            else input_attr
-                        )
-                        if input_attr != decorator_arg_dict["treat_as"]:
-                            raise Exception(f"{function_name} input type doesn't match")
-
-                    for prop_key in ["widget", "label", "whitelist", "example"]:
-                        if prop_key in decorator_arg_dict:
-                            if prop_key == "label":
-                                decorated_params[single_decorator_arg_name][
-                                    "title"
-                                ] = decorator_arg_dict[prop_key]
-                            elif prop_key == "widget":
-                                decorated_params[single_decorator_arg_name][
-                                    prop_key
-                                ] = parse_widget(decorator_arg_dict[prop_key])
-                            else:
-                                decorated_params[single_decorator_arg_name][
-                                    prop_key
-                                ] = decorator_arg_dict[prop_key]
+                iter_over_prop("example", examples, process_examples_and_whitelist)
+                iter_over_prop("whitelist", whitelist, process_examples_and_whitelist)
 
-                    if (
-                        "whitelist" in decorated_params[single_decorator_arg_name]
-                        and "example" in decorated_params[single_decorator_arg_name]
-                    ):
-                        raise Exception(
-                            f"{function_name}: {single_decorator_arg_name} has both an example and a whitelist"
-                        )
+                input_attr = ""
 
-            for _, function_param in function_params.items():
-                if __pandas_use:
-                    anno = function_param.annotation
-                    default_values = (
-                        {}
-                        if function_param.default is Parameter.empty
-                        else function_param.default
-                    )
+                safe_argument_config = (
+                    {} if argument_config is None else argument_config
+                )
 
-                    def analyze_columns_and_default_value(pandas_like_anno):
-                        column_names = []
-                        dataframe_parse_metadata[
-                            function_id
-                        ] = dataframe_parse_metadata.get(function_id, {})
-                        columns = {}
-                        if isinstance(pandas_like_anno.columns, dict):
-                            columns = pandas_like_anno.columns
-                        else:
-                            # Should be Index here
-                            for column_name in pandas_like_anno.columns.to_list():
-                                columns[column_name] = {"don't": "check"}
-                        for name, column in columns.items():
-                            if name in default_values:
-                                column_default = list(default_values[name])
-                            else:
-                                column_default = None
-                            if hasattr(column, "dtype"):
-                                d_type = column.dtype
-                                items = analyze(type(d_type))
-                                items["widget"] = "sheet"
-                            else:
-                                if column_default is None:
-                                    items = {"type": "string", "widget": "sheet"}
+                for (
+                    decorator_arg_name,
+                    decorator_arg_dict,
+                ) in safe_argument_config.items():
+                    if isinstance(decorator_arg_name, str):
+                        decorator_arg_names = [decorator_arg_name]
+                    else:
+                        decorator_arg_names = list(decorator_arg_name)
+                    for single_decorator_arg_name in decorator_arg_names:
+                        if single_decorator_arg_name not in decorated_params:
+                            decorated_params[single_decorator_arg_name] = {}
+
+                        treat_as_config = decorator_arg_dict.get("treat_as", "config")
+                        decorated_params[single_decorator_arg_name][
+                            "treat_as"
+                        ] = treat_as_config
+                        if treat_as_config != "config":
+                            input_attr = (
+                                decorator_arg_dict["treat_as"]
+                                if input_attr == ""
+                                else input_attr
+                            )
+                            if input_attr != decorator_arg_dict["treat_as"]:
+                                raise Exception(
+                                    f"{function_name} input type doesn't match"
+                                )
+
+                        for prop_key in ["widget", "label", "whitelist", "example"]:
+                            if prop_key in decorator_arg_dict:
+                                if prop_key == "label":
+                                    decorated_params[single_decorator_arg_name][
+                                        "title"
+                                    ] = decorator_arg_dict[prop_key]
+                                elif prop_key == "widget":
+                                    decorated_params[single_decorator_arg_name][
+                                        prop_key
+                                    ] = parse_widget(decorator_arg_dict[prop_key])
                                 else:
-                                    items = get_type_widget_prop(
-                                        get_type_dict(type(column_default[0]))["type"],
-                                        0,
-                                        [],
-                                        {},
-                                        None,
-                                    )
-                                    items = {
-                                        "type": items["type"],
-                                        "widget": "sheet",
-                                    }
-                            column_names.append(name)
-                            anal = {
-                                "type": "array",
-                                "widget": "sheet",
-                                "items": items,
-                                "customLayout": False,
-                                "treat_as": "config",
-                            }
-                            dec_param = {
-                                "widget": "sheet",
-                                "treat_as": "config",
-                                "type": f"<mock>list[{items['type']}]</mock>",
-                            }
-                            if column_default:
-                                anal["default"] = column_default
-                                dec_param["default"] = column_default
-                            json_schema_props[name] = anal
-                            decorated_params[name] = dec_param
-                        dataframe_parse_metadata[function_id][
-                            function_param.name
-                        ] = column_names
-
-                    if isinstance(anno, __pandas_module.DataFrame):
-                        if anno.columns.size == 0:
+                                    decorated_params[single_decorator_arg_name][
+                                        prop_key
+                                    ] = decorator_arg_dict[prop_key]
+
+                        if (
+                            "whitelist" in decorated_params[single_decorator_arg_name]
+                            and "example" in decorated_params[single_decorator_arg_name]
+                        ):
                             raise Exception(
-                                f"{function_name}: pandas.DataFrame() is not supported, "
-                                f"but you can add columns to it, if you mean DataFrame with no columns, "
-                                f"please use `pandas.DataFrame` instead."
+                                f"{function_name}: {single_decorator_arg_name} has both an example and a whitelist"
                             )
-                        else:
-                            analyze_columns_and_default_value(anno)
-                            continue
 
-                    if anno is __pandas_module.core.frame.DataFrame:
-                        if function_param.default is not Parameter.empty:
-                            analyze_columns_and_default_value(default_values)
-                        else:
-                            # Be sheet later
-                            json_schema_props[function_param.name] = {
-                                "type": "object",
-                                "widget": "json",
-                                "treat_as": "config",
-                                "customLayout": False,
-                            }
-                            decorated_params[function_param.name] = {
-                                "widget": "json",
-                                "treat_as": "config",
-                            }
-                        continue
-                    if (
-                        hasattr(anno, "__origin__")
-                        and getattr(anno, "__origin__")
-                        is __pandera_module.typing.pandas.DataFrame
-                    ):
-                        if hasattr(anno, "__args__"):
-                            model_class = getattr(anno, "__args__")[0]
-                            analyze_columns_and_default_value(model_class.to_schema())
-                        else:
-                            raise Exception(
-                                "Please give a schema with pandera.DataFrameModel for DataFrame"
+                for _, function_param in function_params.items():
+                    if __pandas_use:
+                        anno = function_param.annotation
+                        default_values = (
+                            {}
+                            if function_param.default is Parameter.empty
+                            else function_param.default
+                        )
+
+                        def analyze_columns_and_default_value(pandas_like_anno):
+                            column_names = []
+                            dataframe_parse_metadata[function_id] = (
+                                dataframe_parse_metadata.get(function_id, {})
                             )
-                        continue
-                parse_type_metadata[function_id][
-                    function_param.name
-                ] = function_param.annotation
-                function_arg_name = function_param.name
-                decorated_params[function_arg_name] = decorated_params.get(
-                    function_arg_name, {}
-                )
-                decorated_params[function_arg_name]["treat_as"] = decorated_params[
-                    function_arg_name
-                ].get("treat_as", "config")
+                            columns = {}
+                            if isinstance(pandas_like_anno.columns, dict):
+                                columns = pandas_like_anno.columns
+                            else:
+                                # Should be Index here
+                                for column_name in pandas_like_anno.columns.to_list():
+                                    columns[column_name] = {"don't": "check"}
+                            for name, column in columns.items():
+                                if name in default_values:
+                                    column_default = list(default_values[name])
+                                else:
+                                    column_default = None
+                                if hasattr(column, "dtype"):
+                                    d_type = column.dtype
+                                    items = analyze(type(d_type))
+                                    items["widget"] = "sheet"
+                                else:
+                                    if column_default is None:
+                                        items = {"type": "string", "widget": "sheet"}
+                                    else:
+                                        items = get_type_widget_prop(
+                                            get_type_dict(type(column_default[0]))[
+                                                "type"
+                                            ],
+                                            0,
+                                            [],
+                                            {},
+                                            None,
+                                        )
+                                        items = {
+                                            "type": items["type"],
+                                            "widget": "sheet",
+                                        }
+                                column_names.append(name)
+                                anal = {
+                                    "type": "array",
+                                    "widget": "sheet",
+                                    "items": items,
+                                    "customLayout": False,
+                                    "treat_as": "config",
+                                }
+                                dec_param = {
+                                    "widget": "sheet",
+                                    "treat_as": "config",
+                                    "type": f"<mock>list[{items['type']}]</mock>",
+                                }
+                                if column_default:
+                                    anal["default"] = column_default
+                                    dec_param["default"] = column_default
+                                json_schema_props[name] = anal
+                                decorated_params[name] = dec_param
+                            dataframe_parse_metadata[function_id][
+                                function_param.name
+                            ] = column_names
+
+                        if isinstance(anno, __pandas_module.DataFrame):
+                            if anno.columns.size == 0:
+                                raise Exception(
+                                    f"{function_name}: pandas.DataFrame() is not supported, "
+                                    f"but you can add columns to it, if you mean DataFrame with no columns, "
+                                    f"please use `pandas.DataFrame` instead."
+                                )
+                            else:
+                                analyze_columns_and_default_value(anno)
+                                continue
 
-                if "_" in function_arg_name:
-                    decorated_params[function_arg_name]["title"] = decorated_params[
+                        if anno is __pandas_module.core.frame.DataFrame:
+                            if function_param.default is not Parameter.empty:
+                                analyze_columns_and_default_value(default_values)
+                            else:
+                                # Be sheet later
+                                json_schema_props[function_param.name] = {
+                                    "type": "object",
+                                    "widget": "json",
+                                    "treat_as": "config",
+                                    "customLayout": False,
+                                }
+                                decorated_params[function_param.name] = {
+                                    "widget": "json",
+                                    "treat_as": "config",
+                                }
+                            continue
+                        if (
+                            hasattr(anno, "__origin__")
+                            and getattr(anno, "__origin__")
+                            is __pandera_module.typing.pandas.DataFrame
+                        ):
+                            if hasattr(anno, "__args__"):
+                                model_class = getattr(anno, "__args__")[0]
+                                analyze_columns_and_default_value(
+                                    model_class.to_schema()
+                                )
+                            else:
+                                raise Exception(
+                                    "Please give a schema with pandera.DataFrameModel for DataFrame"
+                                )
+                            continue
+                    parse_type_metadata[function_id][
+                        function_param.name
+                    ] = function_param.annotation
+                    function_arg_name = function_param.name
+                    decorated_params[function_arg_name] = decorated_params.get(
+                        function_arg_name, {}
+                    )
+                    decorated_params[function_arg_name]["treat_as"] = decorated_params[
                         function_arg_name
-                    ].get("title", function_arg_name.replace("_", " "))
-
-                function_arg_type_dict = get_type_dict(function_param.annotation)
-                decorated_params[function_arg_name].update(function_arg_type_dict)
-                default_example = function_param.default
-                if default_example is not Parameter.empty:
-                    decorated_params[function_arg_name]["default"] = default_example
-                elif decorated_params[function_arg_name]["type"] == "bool":
-                    decorated_params[function_arg_name]["default"] = False
-                elif (
-                    "optional" in decorated_params[function_arg_name]
-                    and decorated_params[function_arg_name]["optional"]
-                ):
-                    decorated_params[function_arg_name]["default"] = None
-                if function_arg_name not in json_schema_props:
-                    json_schema_props[function_arg_name] = {}
-                if "widget" in decorated_params[function_arg_name]:
-                    widget = decorated_params[function_arg_name]["widget"]
-                else:
-                    if function_arg_type_dict is None:
-                        widget = "json"
+                    ].get("treat_as", "config")
+
+                    if "_" in function_arg_name:
+                        decorated_params[function_arg_name]["title"] = decorated_params[
+                            function_arg_name
+                        ].get("title", function_arg_name.replace("_", " "))
+
+                    function_arg_type_dict = get_type_dict(function_param.annotation)
+                    decorated_params[function_arg_name].update(function_arg_type_dict)
+                    default_example = function_param.default
+                    if default_example is not Parameter.empty:
+                        decorated_params[function_arg_name]["default"] = default_example
+                    elif decorated_params[function_arg_name]["type"] == "bool":
+                        decorated_params[function_arg_name]["default"] = False
+                    elif (
+                        "optional" in decorated_params[function_arg_name]
+                        and decorated_params[function_arg_name]["optional"]
+                    ):
+                        decorated_params[function_arg_name]["default"] = None
+                    if function_arg_name not in json_schema_props:
+                        json_schema_props[function_arg_name] = {}
+                    if "widget" in decorated_params[function_arg_name]:
+                        widget = decorated_params[function_arg_name]["widget"]
                     else:
-                        if function_arg_type_dict["type"] in [
-                            "list",
-                            "dict",
-                            "typing.Dict",
-                        ]:
+                        if function_arg_type_dict is None:
                             widget = "json"
                         else:
-                            widget = ""
+                            if function_arg_type_dict["type"] in [
+                                "list",
+                                "dict",
+                                "typing.Dict",
+                            ]:
+                                widget = "json"
+                            else:
+                                widget = ""
 
-                widget = function_param_to_widget(function_param.annotation, widget)
-                param_type = (
-                    "object"
-                    if function_arg_type_dict is None
-                    else function_arg_type_dict["type"]
-                )
-                if hasattr(function_param.annotation, "__funix__"):
-                    if hasattr(function_param.annotation, "__funix_bool__"):
-                        new_function_arg_type_dict = get_type_dict(bool)
-                    else:
-                        if hasattr(function_param.annotation, "__funix_base__"):
-                            new_function_arg_type_dict = get_type_dict(
-                                function_param.annotation.__funix_base__
-                            )
+                    widget = function_param_to_widget(function_param.annotation, widget)
+                    param_type = (
+                        "object"
+                        if function_arg_type_dict is None
+                        else function_arg_type_dict["type"]
+                    )
+                    if hasattr(function_param.annotation, "__funix__"):
+                        if hasattr(function_param.annotation, "__funix_bool__"):
+                            new_function_arg_type_dict = get_type_dict(bool)
                         else:
-                            new_function_arg_type_dict = get_type_dict(
-                                function_param.annotation.__base__
+                            if hasattr(function_param.annotation, "__funix_base__"):
+                                new_function_arg_type_dict = get_type_dict(
+                                    function_param.annotation.__funix_base__
+                                )
+                            else:
+                                new_function_arg_type_dict = get_type_dict(
+                                    function_param.annotation.__base__
+                                )
+                        if new_function_arg_type_dict is not None:
+                            param_type = new_function_arg_type_dict["type"]
+                    json_schema_props[function_arg_name] = get_type_widget_prop(
+                        param_type,
+                        0,
+                        widget,
+                        (
+                            {}
+                            if "widget" in decorated_params[function_arg_name]
+                            else parsed_theme[1]
+                        ),
+                        function_param.annotation,
+                    )
+
+                    for prop_key in [
+                        "whitelist",
+                        "example",
+                        "keys",
+                        "default",
+                        "title",
+                    ]:
+                        if prop_key in decorated_params[function_arg_name].keys():
+                            json_schema_props[function_arg_name][prop_key] = (
+                                decorated_params[function_arg_name][prop_key]
                             )
-                    if new_function_arg_type_dict is not None:
-                        param_type = new_function_arg_type_dict["type"]
-                json_schema_props[function_arg_name] = get_type_widget_prop(
-                    param_type,
-                    0,
-                    widget,
-                    {}
-                    if "widget" in decorated_params[function_arg_name]
-                    else parsed_theme[1],
-                    function_param.annotation,
-                )
 
-                for prop_key in ["whitelist", "example", "keys", "default", "title"]:
-                    if prop_key in decorated_params[function_arg_name].keys():
-                        json_schema_props[function_arg_name][
-                            prop_key
-                        ] = decorated_params[function_arg_name][prop_key]
+                    if (
+                        "whitelist" in json_schema_props[function_arg_name]
+                        and "example" in json_schema_props[function_arg_name]
+                    ):
+                        raise Exception(
+                            f"{function_name}: {function_arg_name} has both an example and a whitelist"
+                        )
 
-                if (
-                    "whitelist" in json_schema_props[function_arg_name]
-                    and "example" in json_schema_props[function_arg_name]
-                ):
-                    raise Exception(
-                        f"{function_name}: {function_arg_name} has both an example and a whitelist"
+                    json_schema_props[function_arg_name]["customLayout"] = (
+                        decorated_params[function_arg_name].get("customLayout", False)
                     )
 
-                json_schema_props[function_arg_name]["customLayout"] = decorated_params[
-                    function_arg_name
-                ].get("customLayout", False)
-
-                if decorated_params[function_arg_name]["treat_as"]:
-                    json_schema_props[function_arg_name]["treat_as"] = decorated_params[
-                        function_arg_name
-                    ]["treat_as"]
+                    if decorated_params[function_arg_name]["treat_as"]:
+                        json_schema_props[function_arg_name]["treat_as"] = (
+                            decorated_params[function_arg_name]["treat_as"]
+                        )
 
-                if decorated_params[function_arg_name]["treat_as"] == "cell":
-                    return_type_parsed = "array"
-                    json_schema_props[function_arg_name][
-                        "items"
-                    ] = get_type_widget_prop(
-                        param_type,
-                        0,
-                        widget[1:],
-                        {}
-                        if "widget" in decorated_params[function_arg_name]
-                        else parsed_theme[1],
-                        function_param.annotation,
-                    )
-                    json_schema_props[function_arg_name]["type"] = "array"
+                    if decorated_params[function_arg_name]["treat_as"] == "cell":
+                        return_type_parsed = "array"
+                        json_schema_props[function_arg_name]["items"] = (
+                            get_type_widget_prop(
+                                param_type,
+                                0,
+                                widget[1:],
+                                (
+                                    {}
+                                    if "widget" in decorated_params[function_arg_name]
+                                    else parsed_theme[1]
+                                ),
+                                function_param.annotation,
+                            )
+                        )
+                        json_schema_props[function_arg_name]["type"] = "array"
 
-            all_of = []
-            delete_keys = set()
-            safe_conditional_visible = (
-                {} if conditional_visible is None else conditional_visible
-            )
+                all_of = []
+                delete_keys = set()
+                safe_conditional_visible = (
+                    {} if conditional_visible is None else conditional_visible
+                )
 
-            for conditional_visible_item in safe_conditional_visible:
-                config = {
-                    "if": {"properties": {}},
-                    "then": {"properties": {}},
-                    "required": [],
-                }
-                if_items: Any = conditional_visible_item["when"]
-                then_items = conditional_visible_item["show"]
-                for if_item in if_items.keys():
-                    config["if"]["properties"][if_item] = {"const": if_items[if_item]}
-                for then_item in then_items:
-                    config["then"]["properties"][then_item] = json_schema_props[
-                        then_item
-                    ]
-                    config["required"].append(then_item)
-                    delete_keys.add(then_item)
-                all_of.append(config)
-
-            for key in delete_keys:
-                json_schema_props.pop(key)
-
-            decorated_function = {
-                "id": function_id,
-                "name": function_name,
-                "params": decorated_params,
-                "theme": parsed_theme[4],
-                "return_type": return_type_parsed,
-                "description": function_description,
-                "direction": function_direction,
-                "schema": {
-                    "title": function_title,
+                for conditional_visible_item in safe_conditional_visible:
+                    config = {
+                        "if": {"properties": {}},
+                        "then": {"properties": {}},
+                        "required": [],
+                    }
+                    if_items: Any = conditional_visible_item["when"]
+                    then_items = conditional_visible_item["show"]
+                    for if_item in if_items.keys():
+                        config["if"]["properties"][if_item] = {
+                            "const": if_items[if_item]
+                        }
+                    for then_item in then_items:
+                        config["then"]["properties"][then_item] = json_schema_props[
+                            then_item
+                        ]
+                        config["required"].append(then_item)
+                        delete_keys.add(then_item)
+                    all_of.append(config)
+
+                for key in delete_keys:
+                    json_schema_props.pop(key)
+
+                decorated_function = {
+                    "id": function_id,
+                    "name": function_name,
+                    "params": decorated_params,
+                    "theme": parsed_theme[4],
+                    "return_type": return_type_parsed,
                     "description": function_description,
-                    "type": "object",
-                    "properties": json_schema_props,
-                    "allOf": all_of,
-                    "input_layout": return_input_layout,
-                    "output_layout": return_output_layout,
-                    "output_indexes": return_output_indexes,
-                },
-                "destination": destination,
-                "source": source_code,
-            }
+                    "direction": function_direction,
+                    "schema": {
+                        "title": function_title,
+                        "description": function_description,
+                        "type": "object",
+                        "properties": json_schema_props,
+                        "allOf": all_of,
+                        "input_layout": return_input_layout,
+                        "output_layout": return_output_layout,
+                        "output_indexes": return_output_indexes,
+                    },
+                    "destination": destination,
+                    "source": source_code,
+                }
 
-            get_wrapper_id = app.get(f"/param/{function_id}")
-            get_wrapper_endpoint = app.get(f"/param/{endpoint}")
+                save_schema(
+                    schema_cache_key,
+                    {
+                        "function": {
+                            key: value
+                            for key, value in decorated_function.items()
+                            if key != "id"
+                        },
+                        "cast_to_list": cast_to_list_flag,
+                        "columnar_return": columnar_return,
+                        "typed_params": list(parse_type_metadata[function_id].keys()),
+                        "dataframe": dataframe_parse_metadata.get(function_id),
+                        "figure": figure_return,
+                    },
+                )
 
             def decorated_function_param_getter():
                 """
@@ -1749,13 +2080,14 @@ def funix(
                 "__name__", f"{decorated_function_param_getter_name}"
             )
 
-            get_wrapper_id(decorated_function_param_getter)
-            get_wrapper_endpoint(decorated_function_param_getter)
+            set_function_route(
+                f"/param/{function_id}", decorated_function_param_getter, "GET"
+            )
+            set_function_route(
+                f"/param/{endpoint}", decorated_function_param_getter, "GET"
+            )
 
             if secret_key:
-                verify_secret_id = app.post(f"/verify/{function_id}")
-                verify_secret_endpoint = app.post(f"/verify/{endpoint}")
-
                 def verify_secret():
                     """
                     Verifies the user's secret
@@ -1810,11 +2142,27 @@ def funix(
                     "__name__", decorated_function_verify_secret_name
                 )
 
-                verify_secret_endpoint(verify_secret)
-                verify_secret_id(verify_secret)
+                set_function_route(f"/verify/{endpoint}", verify_secret, "POST")
+                set_function_route(f"/verify/{function_id}", verify_secret, "POST")
 
             limiters = parse_limiter_args(rate_limit)
 
+            coerce_arguments = compile_arguments_coercer(
+                {
+                    name: function_params[name]
+                    for name in parse_type_metadata[function_id]
+                    if json_schema_props.get(name, {}).get("widget")
+                    not in supported_upload_widgets
+                    and json_schema_props.get(name, {}).get("items", {}).get("widget")
+                    not in supported_upload_widgets
+                },
+                [
+                    name
+                    for name, prop in json_schema_props.items()
+                    if prop.get("treat_as") == "cell"
+                ],
+            )
+
             @wraps(function)
             def wrapper(ws=None):
                 """
@@ -1841,6 +2189,11 @@ def funix(
                     else:
                         function_kwargs = request.get_json()
                     kumo_callback()
+                    columnar_mimetype: str | None = None
+                    if columnar_return and not need_websocket:
+                        columnar_mimetype = negotiate_columnar_mimetype(
+                            request.accept_mimetypes
+                        )
                     if __pandas_use:
                         if function_id in dataframe_parse_metadata:
                             for need_argument in dataframe_parse_metadata[function_id]:
@@ -1853,21 +2206,11 @@ def funix(
                                         function_kwargs[get_arg]
                                     )
                                     del function_kwargs[get_arg]
-                                function_kwargs[
-                                    need_argument
-                                ] = __pandas_module.DataFrame(big_dict)
-                    if function_id in parse_type_metadata:
-                        for func_arg, func_arg_type_class in parse_type_metadata[
-                            function_id
-                        ].items():
-                            if func_arg in function_kwargs:
-                                try:
-                                    function_kwargs[func_arg] = func_arg_type_class(
-                                        function_kwargs[func_arg]
-                                    )
-                                except:
-                                    # Oh, my `typing`
-                                    continue
+                                function_kwargs[need_argument] = (
+                                    __pandas_module.DataFrame(big_dict)
+                                )
+                    if function_kwargs is not None:
+                        coerce_arguments(function_kwargs)
 
                     def original_result_to_pre_fill_metadata(
                         function_id_int: int,
@@ -1919,6 +2262,32 @@ def funix(
                         # TODO: Best result handling, refactor it if possible
                         try:
                             function_call_result = function(**wrapped_function_kwargs)
+                            if (
+                                columnar_mimetype
+                                and not cell_names
+                                and (
+                                    columnar_item_type is not None
+                                    or is_dataframe(function_call_result)
+                                )
+                            ):
+                                try:
+                                    columnar_body = encode_columnar(
+                                        function_call_result,
+                                        columnar_item_type,
+                                        columnar_mimetype,
+                                    )
+                                except:
+                                    # Not a clean typed table, fall back to JSON
+                                    columnar_body = None
+                                if columnar_body is not None:
+                                    original_result_to_pre_fill_metadata(
+                                        id(function), function_call_result
+                                    )
+                                    return Response(
+                                        columnar_body,
+                                        mimetype=columnar_mimetype,
+                                        headers={"Vary": "Accept"},
+                                    )
                             return pre_anal_result(function_call_result)
                         except WrapperException as e:
                             return {
@@ -2072,35 +2441,69 @@ def funix(
                                 return [{"result": result}]
                     elif len(upload_base64_files) > 0:
                         new_args = function_kwargs
-                        for upload_base64_file_key in upload_base64_files.keys():
-                            if upload_base64_files[upload_base64_file_key] == "single":
-                                with urlopen(
-                                    function_kwargs[upload_base64_file_key]
-                                ) as rsp:
-                                    new_args[upload_base64_file_key] = rsp.read()
-                            elif (
-                                upload_base64_files[upload_base64_file_key]
-                                == "multiple"
-                            ):
-                                for pos, each in enumerate(
-                                    function_kwargs[upload_base64_file_key]
-                                ):
-                                    with urlopen(each) as rsp:
-                                        new_args[upload_base64_file_key][
-                                            pos
-                                        ] = rsp.read()
-                        if need_websocket:
-                            if print_to_web:
-                                output_to_web_function(**new_args)
-                            else:
-                                for temp_function_result in function(**new_args):
-                                    function_result = pre_anal_result(
-                                        temp_function_result
+                        upload_buffers = []
+                        try:
+                            try:
+                                check_upload_sizes(
+                                    [
+                                        each
+                                        for key, kind in upload_base64_files.items()
+                                        for each in (
+                                            function_kwargs[key]
+                                            if kind == "multiple"
+                                            else [function_kwargs[key]]
+                                        )
+                                    ]
+                                )
+                                for (
+                                    upload_base64_file_key
+                                ) in upload_base64_files.keys():
+                                    upload_mode = upload_modes.get(
+                                        upload_base64_file_key, "bytes"
                                     )
-                                    ws.send(dumps(function_result))
-                                ws.close()
-                        else:
-                            return wrapped_function(**new_args)
+                                    if (
+                                        upload_base64_files[upload_base64_file_key]
+                                        == "single"
+                                    ):
+                                        new_args[upload_base64_file_key] = load_upload(
+                                            function_kwargs[upload_base64_file_key],
+                                            upload_mode,
+                                            upload_buffers,
+                                        )
+                                    elif (
+                                        upload_base64_files[upload_base64_file_key]
+                                        == "multiple"
+                                    ):
+                                        new_args[upload_base64_file_key] = load_uploads(
+                                            function_kwargs[upload_base64_file_key],
+                                            upload_mode,
+                                            upload_buffers,
+                                        )
+                            except WrapperException as e:
+                                upload_error = {
+                                    "error_type": "wrapper",
+                                    "error_body": str(e),
+                                }
+                                if need_websocket:
+                                    ws.send(dumps(upload_error))
+                                    ws.close()
+                                    return
+                                return upload_error
+                            if need_websocket:
+                                if print_to_web:
+                                    output_to_web_function(**new_args)
+                                else:
+                                    for temp_function_result in function(**new_args):
+                                        function_result = pre_anal_result(
+                                            temp_function_result
+                                        )
+                                        ws.send(dumps(function_result))
+                                    ws.close()
+                            else:
+                                return wrapped_function(**new_args)
+                        finally:
+                            # Unmap the memory-mapped uploads, also if loading or the function fails
+                            release_buffers(upload_buffers)
                     else:
                         if need_websocket:
                             if print_to_web:
@@ -2114,6 +2517,13 @@ def funix(
                                 ws.close()
                         else:
                             return wrapped_function(**function_kwargs)
+                except CoercionError as e:
+                    error = {"error_type": "wrapper", "error_body": str(e)}
+                    if need_websocket:
+                        ws.send(dumps(error))
+                        ws.close()
+                    else:
+                        return error
                 except:
                     error = {"error_type": "wrapper", "error_body": format_exc()}
                     if need_websocket:
@@ -2128,30 +2538,56 @@ def funix(
                 wrapper.__setattr__("__name__", safe_module_now + "_" + function_name)
 
             if need_websocket:
-                sock.route(f"/call/{function_id}")(wrapper)
+                set_function_route(f"/call/{function_id}", wrapper, "WS")
             else:
-                app.post(f"/call/{endpoint}")(wrapper)
-                app.post(f"/call/{function_id}")(wrapper)
+                set_function_route(f"/call/{endpoint}", wrapper, "POST")
+                set_function_route(f"/call/{function_id}", wrapper, "POST")
         return function
 
     return decorator
 
 
-def funix_class():
-    return __funix_class
+def funix_class(
+    idle_timeout: float | None = None,
+    max_instances: int | None = None,
+    close: str | Callable[[Any], None] | None = None,
+    shared: bool = False,
+):
+    """
+    Decorator for classes, every public method becomes a function and `__init__` becomes the function that makes
+    the instance.
+
+    Parameters:
+        idle_timeout (float | None): The seconds an instance lives without being used, `None` for forever.
+        max_instances (int | None): The maximum live instances, the least recently used one is dropped first.
+        close (str | Callable[[Any], None] | None): Called when an instance is dropped (timeout, limit, initialized
+            again or the app exits), a method name like "close" or a function that gets the instance.
+        shared (bool): Share the instances between the sessions that initialize the class with the same arguments,
+            instead of one instance per session.
+
+    Returns:
+        function: the decorator
+    """
+    return lambda cls: __funix_class(cls, idle_timeout, max_instances, close, shared)
 
 
-def __funix_class(cls):
+def __funix_class(
+    cls,
+    idle_timeout: float | None = None,
+    max_instances: int | None = None,
+    close: str | Callable[[Any], None] | None = None,
+    shared: bool = False,
+):
     if inspect.isclass(cls):
         if not hasattr(cls, "__init__"):
             raise Exception("Class must have __init__ method!")
 
-        f = RuntimeClassVisitor(cls.__name__, funix, cls)
-
-        with open(inspect.getsourcefile(cls.__init__), "r") as file_:
-            class_source_code = file_.read()
-
-        f.visit(ast.parse(class_source_code))
+        register_class_methods(
+            cls,
+            funix,
+            class_method_ids_to_params,
+            InstancePool(cls.__name__, idle_timeout, max_instances, close, shared),
+        )
         return cls
     else:
         for class_function in dir(cls):
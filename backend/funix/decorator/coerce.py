@@ -0,0 +1,486 @@
+"""
+Coerce the arguments sent by the frontend to the annotated types.
+
+A coercer is compiled from every annotation when the function is decorated, so a call only runs plain checks: nested
+lists, dicts, tuples, `Optional`, `Union`, `Literal` and `TypedDict` are walked once, and exceptions are only raised
+for invalid values. Unknown classes keep the old behavior, they are called with the value and the value is kept as it
+is if that fails.
+"""
+
+from collections.abc import Mapping, Sequence
+from collections.abc import Set as AbstractSet
+from inspect import Parameter
+from types import NoneType, UnionType
+from typing import (
+    Any,
+    Callable,
+    Literal,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    is_typeddict,
+)
+
+from funix.hint import WrapperException
+
+Coercer = Callable[[Any], Any]
+"""
+A coercer gets the value and returns the coerced value, it raises CoercionError if the value does not match.
+"""
+
+
+class CoercionError(WrapperException):
+    """
+    An argument does not match its annotation. The containers add the index or key to the path while the error goes
+    up, so the path costs nothing for valid values.
+
+    Base Class:
+        WrapperException: Sent to the frontend as a wrapper error.
+
+    Attributes:
+        path (list[str]): The indexes and keys from the value up to the argument, like `[".name", "[0]", "users"]`.
+        reason (str): What is wrong with the value.
+        expected (str | None): The expected type, if the value has a wrong type.
+    """
+
+    def __init__(self, reason: str, expected: str | None = None):
+        """
+        Create a new CoercionError instance.
+
+        Parameters:
+            reason (str): What is wrong with the value.
+            expected (str | None): The expected type, if the value has a wrong type.
+        """
+        super(CoercionError, self).__init__(reason)
+        self.path: list[str] = []
+        self.reason = reason
+        self.expected = expected
+
+    def __str__(self) -> str:
+        return f"Argument {''.join(reversed(self.path))}: {self.reason}"
+
+
+__json_names = {
+    NoneType: "null",
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    str: "string",
+    list: "array",
+    dict: "object",
+}
+
+
+def __mismatch(expected: str, value: Any) -> CoercionError:
+    """
+    Make the error of a value that does not match its annotation.
+    """
+    got = __json_names.get(type(value), type(value).__name__)
+    return CoercionError(f"expected {expected}, got {got}", expected)
+
+
+def __find_error_index(coercer: Coercer, value: list | tuple) -> int:
+    """
+    Find the index of the first item the coercer rejects, only called after it rejected one.
+    """
+    for index, item in enumerate(value):
+        try:
+            coercer(item)
+        except CoercionError:
+            return index
+    return -1
+
+
+def __keep(value: Any) -> Any:
+    return value
+
+
+def __coerce_none(value: Any) -> Any:
+    if value is None:
+        return None
+    raise __mismatch("null", value)
+
+
+def __coerce_bool(value: Any) -> Any:
+    if value is True or value is False:
+        return value
+    raise __mismatch("boolean", value)
+
+
+def __compile_int(cls: type) -> Coercer:
+    """
+    Compile the coercer of `int` and its subclasses, like `IntSlider`.
+    """
+
+    def coerce_int(value: Any) -> Any:
+        value_type = type(value)
+        if value_type is int:
+            return value if cls is int else cls(value)
+        if value_type is float and value.is_integer():
+            return cls(value)
+        if value_type is str:
+            try:
+                return cls(value)
+            except ValueError:
+                pass
+        raise __mismatch("integer", value)
+
+    return coerce_int
+
+
+def __compile_float(cls: type) -> Coercer:
+    """
+    Compile the coercer of `float` and its subclasses, like `FloatSlider`.
+    """
+
+    def coerce_float(value: Any) -> Any:
+        value_type = type(value)
+        if value_type is float:
+            return value if cls is float else cls(value)
+        if value_type is int:
+            return cls(value)
+        if value_type is str:
+            try:
+                return cls(value)
+            except ValueError:
+                pass
+        raise __mismatch("number", value)
+
+    return coerce_float
+
+
+def __compile_str(cls: type) -> Coercer:
+    """
+    Compile the coercer of `str` and its subclasses, like `StrCode`.
+    """
+
+    def coerce_str(value: Any) -> Any:
+        value_type = type(value)
+        if value_type is str:
+            return value if cls is str else cls(value)
+        if value_type is int or value_type is float:
+            return cls(value)
+        raise __mismatch("string", value)
+
+    return coerce_str
+
+
+def __compile_class(cls: type) -> Coercer:
+    """
+    Compile the coercer of other classes, they are called with the value, like the wrapper always did.
+    """
+
+    def coerce_class(value: Any) -> Any:
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls(value)
+        except Exception:
+            # Not constructible from JSON, the function gets the value as it is
+            return value
+
+    return coerce_class
+
+
+def __compile_sequence(origin: type, arguments: tuple) -> Coercer:
+    """
+    Compile the coercer of lists, sets and tuples.
+    """
+    if origin is tuple and arguments and arguments[-1] is not Ellipsis:
+        if arguments == ((),):
+            arguments = ()
+        item_coercers = [compile_coercer(argument) for argument in arguments]
+        length = len(item_coercers)
+
+        def coerce_fixed_tuple(value: Any) -> Any:
+            if type(value) is not list and type(value) is not tuple:
+                raise __mismatch("array", value)
+            if len(value) != length:
+                raise CoercionError(f"expected {length} items, got {len(value)}")
+            index = 0
+            try:
+                result = []
+                for index, coercer in enumerate(item_coercers):
+                    result.append(coercer(value[index]))
+                return tuple(result)
+            except CoercionError as e:
+                e.path.append(f"[{index}]")
+                raise
+
+        return coerce_fixed_tuple
+
+    item_coercer = compile_coercer(arguments[0]) if arguments else __keep
+    if origin is list or origin is Sequence or not isinstance(origin, type):
+        result_type = list
+    elif issubclass(origin, AbstractSet):
+        result_type = frozenset if origin is frozenset else set
+    else:
+        result_type = tuple if origin is tuple else list
+
+    if item_coercer is __keep:
+
+        def coerce_plain_sequence(value: Any) -> Any:
+            if type(value) is list:
+                return value if result_type is list else result_type(value)
+            if type(value) is tuple or isinstance(value, (set, frozenset)):
+                return result_type(value)
+            raise __mismatch("array", value)
+
+        return coerce_plain_sequence
+
+    def coerce_sequence(value: Any) -> Any:
+        if type(value) is not list and type(value) is not tuple:
+            raise __mismatch("array", value)
+        try:
+            return result_type([item_coercer(item) for item in value])
+        except CoercionError as e:
+            e.path.append(f"[{__find_error_index(item_coercer, value)}]")
+            raise
+
+    return coerce_sequence
+
+
+def __compile_mapping(arguments: tuple) -> Coercer:
+    """
+    Compile the coercer of dicts, JSON keys are strings, so they are coerced too, like `dict[int, str]`.
+    """
+    key_coercer = compile_coercer(arguments[0]) if arguments else __keep
+    value_coercer = compile_coercer(arguments[1]) if len(arguments) > 1 else __keep
+    if key_coercer is __keep and value_coercer is __keep:
+
+        def coerce_plain_mapping(value: Any) -> Any:
+            if type(value) is dict:
+                return value
+            raise __mismatch("object", value)
+
+        return coerce_plain_mapping
+
+    def coerce_mapping(value: Any) -> Any:
+        if type(value) is not dict:
+            raise __mismatch("object", value)
+        key = None
+        try:
+            result = {}
+            for key, item in value.items():
+                result[key_coercer(key)] = value_coercer(item)
+            return result
+        except CoercionError as e:
+            e.path.append(f".{key}")
+            raise
+
+    return coerce_mapping
+
+
+def __compile_typeddict(annotation: type) -> Coercer:
+    """
+    Compile the coercer of a TypedDict, the keys it does not declare are kept.
+    """
+    hints = getattr(annotation, "__annotations__", {})
+    required_keys = frozenset(getattr(annotation, "__required_keys__", hints.keys()))
+    key_coercers = {key: compile_coercer(hint) for key, hint in hints.items()}
+
+    def coerce_typeddict(value: Any) -> Any:
+        if type(value) is not dict:
+            raise __mismatch("object", value)
+        missing = required_keys - value.keys()
+        if missing:
+            raise CoercionError(f"missing {', '.join(sorted(missing))}")
+        result = dict(value)
+        key = None
+        try:
+            for key, coercer in key_coercers.items():
+                if key in result:
+                    result[key] = coercer(result[key])
+        except CoercionError as e:
+            e.path.append(f".{key}")
+            raise
+        return result
+
+    return coerce_typeddict
+
+
+def __compile_literal(arguments: tuple) -> Coercer:
+    """
+    Compile the coercer of a Literal, `True` and `1` are different choices.
+    """
+    choices = {(type(choice), choice) for choice in arguments}
+    expected = " or ".join(repr(choice) for choice in arguments)
+
+    def coerce_literal(value: Any) -> Any:
+        try:
+            if (type(value), value) in choices:
+                return value
+        except TypeError:
+            # Unhashable, like a list
+            pass
+        raise CoercionError(f"expected {expected}, got {value!r}")
+
+    return coerce_literal
+
+
+def __get_kinds(annotation: Any) -> tuple | None:
+    """
+    Get the JSON types a coercer takes without converting them, `None` if unknown.
+    """
+    if annotation is None or annotation is NoneType:
+        return (NoneType,)
+    if isinstance(annotation, type):
+        if issubclass(annotation, bool):
+            return (bool,)
+        if issubclass(annotation, int):
+            return (int,)
+        if issubclass(annotation, float):
+            return (float, int)
+        if issubclass(annotation, str):
+            return (str,)
+        if is_typeddict(annotation) or issubclass(annotation, Mapping):
+            return (dict,)
+        if issubclass(annotation, (list, tuple, set, frozenset)):
+            return (list,)
+        return None
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return tuple({type(choice) for choice in get_args(annotation)})
+    if isinstance(origin, type):
+        return __get_kinds(origin)
+    return None
+
+
+def __compile_union(arguments: tuple) -> Coercer:
+    """
+    Compile the coercer of a Union (and Optional), the member is picked by the JSON type of the value, members are
+    only tried in order if none takes that type.
+    """
+    members = [
+        (compile_coercer(argument), __get_kinds(argument)) for argument in arguments
+    ]
+    by_kind: dict[type, Coercer] = {}
+    for coercer, kinds in members:
+        for kind in kinds or ():
+            by_kind.setdefault(kind, coercer)
+    fallbacks = [coercer for coercer, _ in members]
+
+    def coerce_union(value: Any) -> Any:
+        coercer = by_kind.get(type(value))
+        if coercer is not None:
+            return coercer(value)
+        errors = []
+        for fallback in fallbacks:
+            try:
+                return fallback(value)
+            except CoercionError as e:
+                errors.append(e)
+        if len(errors) == 1:
+            raise errors[0]
+        if all(e.expected and not e.path for e in errors):
+            raise __mismatch(" or ".join(e.expected for e in errors), value)
+        raise CoercionError(" or ".join(e.reason for e in errors))
+
+    return coerce_union
+
+
+def compile_coercer(annotation: Any) -> Coercer:
+    """
+    Compile the coercer of an annotation.
+
+    Parameters:
+        annotation (Any): The annotation.
+
+    Returns:
+        Coercer: The coercer, it returns the value itself for annotations it does not know, like `Any`.
+    """
+    if annotation is Parameter.empty or annotation is Any or annotation is object:
+        return __keep
+    if annotation is None or annotation is NoneType:
+        return __coerce_none
+    if isinstance(annotation, TypeVar) or hasattr(annotation, "__supertype__"):
+        # TypeVar and NewType (like `Markdown`), the value is used as it is
+        return __keep
+    if isinstance(annotation, type) and get_origin(annotation) is None:
+        if is_typeddict(annotation):
+            return __compile_typeddict(annotation)
+        if issubclass(annotation, bool):
+            return __coerce_bool
+        if issubclass(annotation, int):
+            return __compile_int(annotation)
+        if issubclass(annotation, float):
+            return __compile_float(annotation)
+        if issubclass(annotation, str):
+            return __compile_str(annotation)
+        if annotation in (list, tuple, set, frozenset):
+            return __compile_sequence(annotation, ())
+        if annotation is dict:
+            return __compile_mapping(())
+        return __compile_class(annotation)
+    origin = get_origin(annotation)
+    arguments = get_args(annotation)
+    if origin is Union or origin is UnionType:
+        return __compile_union(arguments)
+    if origin is Literal:
+        return __compile_literal(arguments)
+    if isinstance(origin, type):
+        if issubclass(origin, Mapping):
+            return __compile_mapping(arguments)
+        if issubclass(origin, (Sequence, AbstractSet)) and not issubclass(
+            origin, (str, bytes)
+        ):
+            return __compile_sequence(origin, arguments)
+    # Other generics (like `Callable` or a pandera DataFrame), the value is used as it is
+    return __keep
+
+
+def compile_arguments_coercer(
+    parameters: dict[str, Parameter], cell_names: list[str]
+) -> Callable[[dict[str, Any]], None]:
+    """
+    Compile the coercer of the arguments of a function.
+
+    Parameters:
+        parameters (dict[str, inspect.Parameter]): The parameters to coerce.
+        cell_names (list[str]): The parameters treated as cells, they get a list of values.
+
+    Returns:
+        Callable[[dict[str, Any]], None]: Coerces the arguments in place, raises WrapperException if one does not
+            match.
+    """
+    coercers = []
+    for name, parameter in parameters.items():
+        coercer = compile_coercer(parameter.annotation)
+        if coercer is __keep:
+            continue
+        if parameter.default is None and coercer is not __coerce_none:
+            # `x: int = None` takes null without saying `Optional`
+            coercer = __compile_union((parameter.annotation, None))
+        if name in cell_names:
+            coercer = __cells(coercer)
+        coercers.append((name, coercer))
+
+    def coerce_arguments(arguments: dict[str, Any]) -> None:
+        name = None
+        try:
+            for name, coercer in coercers:
+                if name in arguments:
+                    arguments[name] = coercer(arguments[name])
+        except CoercionError as e:
+            e.path.append(name)
+            raise
+
+    return coerce_arguments
+
+
+def __cells(coercer: Coercer) -> Coercer:
+    """
+    Wrap a coercer for a cell parameter, it gets one value per row.
+    """
+
+    def coerce_cells(value: Any) -> Any:
+        if type(value) is not list:
+            raise __mismatch("array", value)
+        try:
+            return [coercer(item) for item in value]
+        except CoercionError as e:
+            e.path.append(f"[{__find_error_index(coercer, value)}]")
+            raise
+
+    return coerce_cells
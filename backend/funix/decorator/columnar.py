@@ -0,0 +1,210 @@
+"""
+Binary columnar encoding for tabular results.
+
+Clients that send `Accept: application/vnd.apache.arrow.stream` (needs pyarrow) or
+`Accept: application/x-funix-columnar` to `/call` receive Dataframe and typed list results as binary columns instead
+of JSON records.
+
+The funix columnar format is:
+
+    uint32 (little-endian)  header length
+    header                  UTF-8 JSON, padded with spaces so the buffers start at a multiple of 8 bytes
+    buffers                 little-endian typed arrays, each one aligned to 8 bytes in the whole body
+
+The header is `{"rows": int, "columns": [column, ...]}`, a numeric column is
+`{"name": str, "dtype": "int64" | "float64" | ..., "offset": int, "length": int}` (offset and length in bytes,
+relative to the end of the header), other columns are `{"name": str, "dtype": "json", "values": list}`.
+"""
+
+from array import array
+from importlib import import_module
+from io import BytesIO
+from json import dumps, loads
+from struct import pack
+from sys import byteorder
+from types import ModuleType
+from typing import Any
+
+from werkzeug.datastructures import MIMEAccept
+
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
+"""
+The Arrow IPC stream MIME type.
+"""
+
+FUNIX_COLUMNAR_MIMETYPE = "application/x-funix-columnar"
+"""
+The funix columnar MIME type, no dependency needed.
+"""
+
+__pyarrow_use = False
+"""
+Whether Funix can encode Arrow IPC streams
+"""
+
+__pyarrow_module: None | ModuleType = None
+
+try:
+    __pyarrow_module = import_module("pyarrow")
+
+    __pyarrow_use = True
+except:
+    pass
+
+__array_typecodes = {
+    int: ("q", "int64"),
+    float: ("d", "float64"),
+    bool: ("B", "bool"),
+}
+"""
+A dict, key is the python type of typed list items, value is the array typecode and the dtype name.
+"""
+
+
+def get_columnar_item_type(annotation: Any) -> type | None:
+    """
+    Get the item type of typed list annotations, like `list[float]` or `typing.List[int]`.
+
+    Parameters:
+        annotation (Any): The return annotation.
+
+    Returns:
+        type | None: The item type, `None` if the annotation is not a typed list.
+    """
+    if getattr(annotation, "__origin__", None) is not list:
+        return None
+    args = getattr(annotation, "__args__", ())
+    if len(args) != 1 or args[0] not in __array_typecodes:
+        return None
+    return args[0]
+
+
+def negotiate_columnar_mimetype(accept: MIMEAccept) -> str | None:
+    """
+    Choose the binary format from the `Accept` header.
+    Only explicitly listed MIME types count, wildcards like `*/*` never select a binary format.
+
+    Parameters:
+        accept (MIMEAccept): The parsed `Accept` header, `request.accept_mimetypes`.
+
+    Returns:
+        str | None: The MIME type, `None` for JSON.
+    """
+    supported = [FUNIX_COLUMNAR_MIMETYPE]
+    if __pyarrow_use:
+        supported.append(ARROW_STREAM_MIMETYPE)
+    best: str | None = None
+    best_quality = 0
+    for mimetype, quality in accept:
+        if mimetype in supported and quality > best_quality:
+            best = mimetype
+            best_quality = quality
+    return best
+
+
+def __pad(data: bytes, padding: bytes) -> bytes:
+    return data + padding * (-len(data) % 8)
+
+
+def __to_little_endian(data: array) -> bytes:
+    if byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def encode_funix_columnar(result: Any, item_type: type | None) -> bytes:
+    """
+    Encode the result to the funix columnar format.
+
+    Parameters:
+        result (Any): A DataFrame, or a typed list if `item_type` is not None.
+        item_type (type | None): The item type of typed lists.
+
+    Returns:
+        bytes: The encoded result.
+    """
+    columns = []
+    buffers = BytesIO()
+
+    def add_buffer(name: str, dtype: str, data: bytes) -> None:
+        columns.append(
+            {
+                "name": name,
+                "dtype": dtype,
+                "offset": buffers.tell(),
+                "length": len(data),
+            }
+        )
+        buffers.write(__pad(data, b"\x00"))
+
+    if item_type is not None:
+        typecode, dtype = __array_typecodes[item_type]
+        add_buffer("result", dtype, __to_little_endian(array(typecode, result)))
+        rows = len(result)
+    else:
+        for name, column in result.items():
+            kind = column.dtype.kind
+            if kind in "iuf":
+                values = column.to_numpy()
+                add_buffer(
+                    str(name),
+                    values.dtype.name,
+                    values.astype(values.dtype.newbyteorder("<")).tobytes(),
+                )
+            elif kind == "b":
+                add_buffer(
+                    str(name), "bool", column.to_numpy().astype("uint8").tobytes()
+                )
+            else:
+                columns.append(
+                    {
+                        "name": str(name),
+                        "dtype": "json",
+                        "values": loads(column.to_json(orient="values")),
+                    }
+                )
+        rows = len(result)
+
+    header = dumps({"rows": rows, "columns": columns}).encode("utf-8")
+    # The length prefix is 4 bytes, so the buffers can be viewed as typed arrays without copying
+    header += b" " * (-(len(header) + 4) % 8)
+    return pack("<I", len(header)) + header + buffers.getvalue()
+
+
+def encode_arrow_stream(result: Any, item_type: type | None) -> bytes:
+    """
+    Encode the result to an Arrow IPC stream.
+
+    Parameters:
+        result (Any): A DataFrame, or a typed list if `item_type` is not None.
+        item_type (type | None): The item type of typed lists.
+
+    Returns:
+        bytes: The encoded result.
+    """
+    pa = __pyarrow_module
+    if item_type is not None:
+        table = pa.table({"result": pa.array(result)})
+    else:
+        table = pa.Table.from_pandas(result, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_columnar(result: Any, item_type: type | None, mimetype: str) -> bytes:
+    """
+    Encode the result to the negotiated binary format.
+
+    Parameters:
+        result (Any): A DataFrame, or a typed list if `item_type` is not None.
+        item_type (type | None): The item type of typed lists.
+        mimetype (str): The MIME type from `negotiate_columnar_mimetype`.
+
+    Returns:
+        bytes: The encoded result.
+    """
+    if mimetype == ARROW_STREAM_MIMETYPE:
+        return encode_arrow_stream(result, item_type)
+    return encode_funix_columnar(result, item_type)
@@ -0,0 +1,426 @@
+"""
+Render matplotlib figures for the frontend.
+
+All rendering happens on one dedicated thread (matplotlib is not thread-safe), figures are closed after rendering,
+and the results are cached by figure content. Long line series can be downsampled before rendering, and huge
+figures can be sent as static images instead of mpld3 JSON.
+"""
+
+from base64 import b64encode
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from hashlib import blake2b
+from importlib import import_module
+from io import BytesIO
+from threading import Lock
+from types import ModuleType
+from typing import Any
+
+__matplotlib_use = False
+"""
+Whether Funix can handle matplotlib-related logic
+"""
+
+try:
+    # From now on, Funix no longer mandates matplotlib and mpld3
+    import matplotlib
+
+    matplotlib.use("Agg")  # No display
+    __matplotlib_use = True
+except:
+    pass
+
+mpld3: ModuleType | None = None
+"""
+The mpld3 module.
+"""
+
+pyplot: ModuleType | None = None
+"""
+The matplotlib.pyplot module.
+"""
+
+numpy: ModuleType | None = None
+"""
+The numpy module, matplotlib depends on it.
+"""
+
+figure_mode: str = "auto"
+"""
+"interactive": always mpld3, "static": always image, "auto": image when the figure has more than `static_points`.
+"""
+
+static_points: int = 100_000
+"""
+In "auto" mode, figures with more points than this are sent as static images.
+"""
+
+static_format: str = "png"
+"""
+The static image format, "png" or "svg".
+"""
+
+figure_cache_size: int = 64
+"""
+How many rendered figures are cached.
+"""
+
+reduce_points: int | None = None
+"""
+Lines with more points than this are downsampled to about this many points, `None` disables downsampling.
+"""
+
+reduce_method: str = "lttb"
+"""
+The downsampling method, "lttb" (Largest-Triangle-Three-Buckets) or "minmax" (min and max of each bucket).
+"""
+
+__renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="funix-figure")
+"""
+The figure renderer thread.
+"""
+
+__warm_up_future: Future | None = None
+"""
+The warm-up task, `None` if not started.
+"""
+
+__rendered_figures: OrderedDict[str, dict] = OrderedDict()
+"""
+A dict, key is the figure content digest, value is the rendered figure.
+"""
+
+__rendered_figures_lock = Lock()
+"""
+The lock for `__rendered_figures`.
+"""
+
+__digest_getters = [
+    "get_xydata",
+    "get_offsets",
+    "get_array",
+    "get_verts",
+    "get_text",
+    "get_position",
+    "get_color",
+    "get_facecolor",
+    "get_edgecolor",
+    "get_linewidth",
+    "get_linestyle",
+    "get_marker",
+    "get_markersize",
+    "get_sizes",
+    "get_alpha",
+    "get_label",
+    "get_visible",
+    "get_zorder",
+    "get_fontsize",
+    "get_xlim",
+    "get_ylim",
+    "get_xscale",
+    "get_yscale",
+]
+"""
+The artist getters used to fingerprint a figure.
+"""
+
+
+def set_figure_config(
+    mode: str | None = None,
+    points: int | None = None,
+    image_format: str | None = None,
+    cache_size: int | None = None,
+    reduce_to: int | bool | None = None,
+    reduce_with: str | None = None,
+) -> None:
+    """
+    Set the figure renderer config.
+
+    Parameters:
+        mode (str | None): "interactive", "static" or "auto", `None` keeps the old value.
+        points (int | None): The point count limit for "auto" mode, `None` keeps the old value.
+        image_format (str | None): "png" or "svg", `None` keeps the old value.
+        cache_size (int | None): How many rendered figures are cached, `None` keeps the old value.
+        reduce_to (int | bool | None): The target point count of each line, `False` disables downsampling,
+            `None` keeps the old value.
+        reduce_with (str | None): "lttb" or "minmax", `None` keeps the old value.
+
+    Raises:
+        ValueError: If the mode, format or downsampling method is not supported.
+    """
+    global figure_mode, static_points, static_format, figure_cache_size
+    global reduce_points, reduce_method
+    if mode is not None:
+        if mode not in ["interactive", "static", "auto"]:
+            raise ValueError(f"Unsupported figure mode: {mode}")
+        figure_mode = mode
+    if points is not None:
+        static_points = points
+    if image_format is not None:
+        if image_format not in ["png", "svg"]:
+            raise ValueError(f"Unsupported static figure format: {image_format}")
+        static_format = image_format
+    if cache_size is not None:
+        figure_cache_size = cache_size
+    if reduce_to is not None:
+        if reduce_to is False:
+            reduce_points = None
+        elif reduce_to < 4:
+            raise ValueError("Lines cannot be downsampled to less than 4 points")
+        else:
+            reduce_points = reduce_to
+    if reduce_with is not None:
+        if reduce_with not in ["lttb", "minmax"]:
+            raise ValueError(f"Unsupported downsampling method: {reduce_with}")
+        reduce_method = reduce_with
+    with __rendered_figures_lock:
+        __rendered_figures.clear()
+
+
+def __import_renderer() -> None:
+    """
+    Import pyplot and mpld3, on the renderer thread.
+    """
+    global mpld3, pyplot, numpy
+    if pyplot is None:
+        pyplot = import_module("matplotlib.pyplot")
+        numpy = import_module("numpy")
+    if mpld3 is None:
+        try:
+            mpld3 = import_module("mpld3")
+        except:
+            pass
+
+
+def warm_up_figure_renderer() -> None:
+    """
+    Import pyplot and mpld3 in the background, so the first figure does not wait for them.
+    Does nothing without matplotlib or if the warm-up has started.
+    """
+    global __warm_up_future
+    if __matplotlib_use and __warm_up_future is None:
+        __warm_up_future = __renderer.submit(__import_renderer)
+
+
+def get_figure_digest(figure: Any) -> str:
+    """
+    Fingerprint the figure by its artists, equal figures get equal digests.
+
+    Parameters:
+        figure (matplotlib.figure.Figure): The figure.
+
+    Returns:
+        str: The digest.
+    """
+    digest = blake2b(digest_size=20)
+    digest.update(repr((figure.get_size_inches().tolist(), figure.dpi)).encode())
+    digest.update(
+        repr(
+            (figure_mode, static_points, static_format, reduce_points, reduce_method)
+        ).encode()
+    )
+    for artist in figure.findobj():
+        digest.update(type(artist).__name__.encode())
+        for getter in __digest_getters:
+            if not hasattr(artist, getter):
+                continue
+            try:
+                value = getattr(artist, getter)()
+            except:
+                continue
+            if hasattr(value, "tobytes"):
+                digest.update(value.tobytes())
+            else:
+                digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def count_figure_points(figure: Any) -> int:
+    """
+    Count the data points of lines and collections in the figure.
+
+    Parameters:
+        figure (matplotlib.figure.Figure): The figure.
+
+    Returns:
+        int: The point count.
+    """
+    points = 0
+    for axes in figure.get_axes():
+        for line in axes.get_lines():
+            points += len(line.get_xdata())
+        for collection in axes.collections:
+            points += len(collection.get_offsets())
+    return points
+
+
+def get_lttb_indexes(x: Any, y: Any, threshold: int) -> Any:
+    """
+    Largest-Triangle-Three-Buckets, keep the points that form the largest triangles with their neighbours.
+
+    Parameters:
+        x (numpy.ndarray): The x values, sorted.
+        y (numpy.ndarray): The y values.
+        threshold (int): The point count to keep.
+
+    Returns:
+        numpy.ndarray: The indexes of the kept points, all of them if the series is not longer than `threshold`.
+    """
+    length = len(x)
+    if length <= threshold:
+        return numpy.arange(length)
+    edges = numpy.linspace(1, length - 1, threshold - 1).astype(numpy.int64)
+    indexes = numpy.empty(threshold, dtype=numpy.int64)
+    indexes[0] = 0
+    indexes[-1] = length - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else length
+        next_start = end if end < next_end else next_end - 1
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+        areas = numpy.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        indexes[bucket + 1] = previous
+    return indexes
+
+
+def get_minmax_indexes(y: Any, threshold: int) -> Any:
+    """
+    Keep the min and the max of each bucket, so spikes survive.
+
+    Parameters:
+        y (numpy.ndarray): The y values.
+        threshold (int): About the point count to keep.
+
+    Returns:
+        numpy.ndarray: The indexes of the kept points, sorted, all of them if the series is not longer than
+            `threshold`.
+    """
+    length = len(y)
+    if length <= threshold:
+        return numpy.arange(length)
+    buckets = max((threshold - 2) // 2, 1)
+    size = -(-(length - 2) // buckets)
+    body = y[1 : length - 1]
+    # Repeat the last point so the buckets have the same size
+    body = numpy.pad(body, (0, buckets * size - len(body)), mode="edge")
+    body = body.reshape(buckets, size)
+    offsets = numpy.arange(buckets) * size + 1
+    indexes = numpy.concatenate(
+        [
+            [0],
+            numpy.minimum(offsets + body.argmin(axis=1), length - 2),
+            numpy.minimum(offsets + body.argmax(axis=1), length - 2),
+            [length - 1],
+        ]
+    )
+    return numpy.unique(indexes)
+
+
+def reduce_figure(figure: Any) -> None:
+    """
+    Downsample the long lines of the figure in place.
+    Lines whose x values are not sorted or contain NaN are kept as they are.
+
+    Parameters:
+        figure (matplotlib.figure.Figure): The figure.
+    """
+    if reduce_points is None:
+        return
+    for axes in figure.get_axes():
+        for line in axes.get_lines():
+            if len(line.get_xdata()) <= reduce_points:
+                continue
+            xy = numpy.asarray(line.get_xydata(), dtype=float)
+            x, y = xy[:, 0], xy[:, 1]
+            if numpy.isnan(xy).any() or (numpy.diff(x) < 0).any():
+                continue
+            if reduce_method == "minmax":
+                indexes = get_minmax_indexes(y, reduce_points)
+            else:
+                indexes = get_lttb_indexes(x, y, reduce_points)
+            line.set_data(
+                numpy.asarray(line.get_xdata())[indexes],
+                numpy.asarray(line.get_ydata())[indexes],
+            )
+
+
+def get_static_figure(figure: Any) -> dict:
+    """
+    Render the figure as a static image.
+
+    Parameters:
+        figure (matplotlib.figure.Figure): The figure.
+
+    Returns:
+        dict: `static` is the image data URI.
+    """
+    buffer = BytesIO()
+    figure.savefig(buffer, format=static_format, bbox_inches="tight")
+    mimetype = "image/svg+xml" if static_format == "svg" else "image/png"
+    return {
+        "static": f"data:{mimetype};base64,{b64encode(buffer.getvalue()).decode()}",
+        "width": 560,
+    }
+
+
+def __render_figure(figure: Any) -> dict:
+    """
+    Render the figure, on the renderer thread.
+
+    Parameters:
+        figure (matplotlib.figure.Figure): The figure.
+
+    Returns:
+        dict: The rendered figure.
+    """
+    __import_renderer()
+    try:
+        digest = get_figure_digest(figure)
+        with __rendered_figures_lock:
+            if digest in __rendered_figures:
+                __rendered_figures.move_to_end(digest)
+                return __rendered_figures[digest]
+
+        reduce_figure(figure)
+
+        if figure_mode == "static" or (
+            figure_mode == "auto" and count_figure_points(figure) > static_points
+        ):
+            fig = get_static_figure(figure)
+        else:
+            if mpld3 is None:
+                raise Exception("if you use matplotlib, you must install mpld3")
+            fig = mpld3.fig_to_dict(figure)
+            fig["width"] = 560  # TODO: Change it in frontend
+
+        with __rendered_figures_lock:
+            __rendered_figures[digest] = fig
+            while len(__rendered_figures) > figure_cache_size:
+                __rendered_figures.popitem(last=False)
+        return fig
+    finally:
+        pyplot.close(figure)
+
+
+def render_figure(figure: Any) -> dict:
+    """
+    Converts a matplotlib figure to a dictionary for drawing on the frontend
+
+    Parameters:
+        figure (matplotlib.figure.Figure): The figure to convert
+
+    Returns:
+        dict: The converted figure, mpld3 JSON or a static image
+
+    Raises:
+        Exception: If matplotlib or mpld3 is not installed
+    """
+    if not __matplotlib_use:
+        raise Exception("Install matplotlib to use this function")
+    return __renderer.submit(__render_figure, figure).result()
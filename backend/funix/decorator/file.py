@@ -10,6 +10,13 @@ from uuid import uuid4
 from flask import abort, send_file
 
 from funix.app import app
+from funix.decorator.media import (
+    encode_audio_array,
+    encode_media,
+    guess_mimetype,
+    is_audio_array,
+    is_ndarray,
+)
 from funix.util.uri import is_valid_uri
 
 __files_dict: dict[str, bytes | str] = {}
@@ -17,14 +24,22 @@ __files_dict: dict[str, bytes | str] = {}
 A dict, key is file id, value is file content (path or bytes).
 """
 
+__files_mimetype_dict: dict[str, str] = {}
+"""
+A dict, key is file id, value is the MIME type of the file content (bytes only).
+"""
+
 
-def get_real_uri(path_or_file_content: str | bytes) -> str:
+def get_real_uri(
+    path_or_file_content: str | bytes, mimetype: str | None = None
+) -> str:
     """
     Get the funix relative URI of the file or path.
     For URI, return directly
 
     Parameters:
         path_or_file_content (str | bytes): The path or file content.
+        mimetype (str | None): The MIME type of the file content, guessed from the content if None.
 
     Returns:
         str: The funix relative URI.
@@ -38,6 +53,9 @@ def get_real_uri(path_or_file_content: str | bytes) -> str:
         result = f"/file/{fid}"
         if path_or_file_content not in list(__files_dict.values()):
             __files_dict[fid] = path_or_file_content
+            __files_mimetype_dict[fid] = mimetype or guess_mimetype(
+                path_or_file_content
+            )
         else:
             return f"/file/{list(__files_dict.keys())[list(__files_dict.values()).index(path_or_file_content)]}"
         return result
@@ -54,15 +72,20 @@ def get_real_uri(path_or_file_content: str | bytes) -> str:
         return path_or_file_content
 
 
-def get_static_uri(path: str | list[str | bytes] | bytes) -> str | list[str]:
+def get_static_uri(
+    path: str | list[str | bytes] | bytes | Any, media_type: str | None = None
+) -> str | list[str]:
     """
-    Get the funix relative URI of the file(s), path(s), binary(ies) or uri(s).
+    Get the funix relative URI of the file(s), path(s), binary(ies), NumPy media or uri(s).
     list -> list
     str -> str
     bytes -> str
+    numpy.ndarray -> str (WAV audio for `Audio`, PNG/WebP for `Image`, by shape for other types)
+    (int, numpy.ndarray) -> str (WAV audio with the sample rate)
 
     Parameters:
-        path (str | list[str | bytes] | bytes): The path(s), file(s), binary(ies) or uri(s).
+        path (str | list[str | bytes] | bytes | Any): The path(s), file(s), binary(ies), NumPy media or uri(s).
+        media_type (str | None): The parsed return type, like "Images" or "Audios", for encoding NumPy media.
 
     Returns:
         str | list[str]: The funix relative URI(s).
@@ -74,8 +97,10 @@ def get_static_uri(path: str | list[str | bytes] | bytes) -> str | list[str]:
             return get_real_uri(path)
     if isinstance(path, bytes):
         return get_real_uri(path)
+    elif is_ndarray(path) or is_audio_array(path):
+        return get_real_uri(*encode_media(path, media_type))
     elif isinstance(path, list):
-        uris = [get_real_uri(uri) for uri in path]
+        uris = [get_static_uri(uri, media_type) for uri in path]
         return uris
     else:
         raise Exception("Unsupported path type")
@@ -104,7 +129,10 @@ def enable_file_service():
             else:
                 # Like binary
                 return send_file(
-                    BytesIO(__files_dict[fid]), mimetype="application/octet-stream"
+                    BytesIO(__files_dict[fid]),
+                    mimetype=__files_mimetype_dict.get(
+                        fid, "application/octet-stream"
+                    ),
                 )
         else:
             return abort(404)
@@ -142,7 +170,9 @@ def handle_ipython_audio_image_video(obj: Any) -> str:
             ]:
                 data_class = getattr(obj.data, "__class__")
                 if f"{data_class.__module__}.{data_class.__name__}" == "numpy.ndarray":
-                    return get_static_uri(obj.data.tobytes())
+                    return get_real_uri(
+                        *encode_audio_array(obj.data, getattr(obj, "rate", None))
+                    )
                 elif isinstance(obj.data, (str, bytes)):
                     return get_static_uri(obj.data)
                 elif isinstance(obj.data, list):
@@ -0,0 +1,178 @@
+"""
+Report function calls to Kumo in the background.
+
+Calls are only counted on the request path, a reporter thread sends the counts to the callback url every
+`flush_interval` seconds, and keeps them for the next try if the callback host fails.
+"""
+
+from atexit import register
+from threading import Event, Lock, Thread
+
+from requests import post
+
+flush_interval: float = 5.0
+"""
+How often (in seconds) the call counts are sent.
+"""
+
+max_retry_interval: float = 60.0
+"""
+The longest wait (in seconds) between retries when the callback host keeps failing.
+"""
+
+request_timeout: float = 5.0
+"""
+The timeout (in seconds) of each callback request.
+"""
+
+
+class KumoReporter(Thread):
+    """
+    Send the call counts to Kumo in batches.
+
+    Base Class:
+        threading.Thread: The thread.
+
+    Attributes:
+        url (str): The callback url.
+        token (str): The callback token.
+        interval (float): The flush interval in seconds.
+        pending (int): The calls not sent yet.
+        failures (int): The failed flushes in a row.
+    """
+
+    def __init__(self, url: str, token: str, interval: float | None = None):
+        """
+        Create a new KumoReporter instance.
+
+        Parameters:
+            url (str): The callback url.
+            token (str): The callback token.
+            interval (float | None): The flush interval in seconds, `None` uses `flush_interval`.
+        """
+        super(KumoReporter, self).__init__(name="funix-kumo", daemon=True)
+        self.url = url
+        self.token = token
+        self.interval = flush_interval if interval is None else interval
+        self.pending = 0
+        self.failures = 0
+        self.__lock = Lock()
+        self.__flush_lock = Lock()
+        self.__stopped = Event()
+
+    def record(self, count: int = 1) -> None:
+        """
+        Count calls, never blocks on the network.
+
+        Parameters:
+            count (int): The number of calls.
+        """
+        with self.__lock:
+            self.pending += count
+
+    def flush(self) -> bool:
+        """
+        Send the pending calls now.
+
+        Returns:
+            bool: If the calls are sent (or there is nothing to send).
+        """
+        with self.__flush_lock:
+            with self.__lock:
+                count, self.pending = self.pending, 0
+            if count == 0:
+                return True
+            try:
+                post(
+                    self.url,
+                    json={
+                        "token": self.token,
+                        "count": count,
+                    },
+                    timeout=request_timeout,
+                ).raise_for_status()
+                self.failures = 0
+                return True
+            except:
+                with self.__lock:
+                    self.pending += count
+                self.failures += 1
+                return False
+
+    def get_delay(self) -> float:
+        """
+        Get the wait before the next flush, doubled for each failure up to `max_retry_interval`.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        # The exponent is capped, a long outage would overflow the float otherwise
+        return min(self.interval * 2 ** min(self.failures, 16), max_retry_interval)
+
+    def run(self) -> None:
+        """
+        Flush periodically, back off exponentially while the callback host fails.
+        """
+        while True:
+            delay = self.get_delay()
+            if self.__stopped.wait(delay):
+                return
+            self.flush()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stop the reporter and send the pending calls for the last time.
+
+        Parameters:
+            timeout (float | None): How long to wait for the reporter thread.
+        """
+        self.__stopped.set()
+        if self.is_alive():
+            self.join(timeout)
+        self.flush()
+
+
+__reporter: KumoReporter | None = None
+"""
+The running reporter, `None` if Kumo is not configured.
+"""
+
+
+def start_kumo_reporter(url: str, token: str) -> KumoReporter:
+    """
+    Start reporting to Kumo, replaces the old reporter.
+
+    Parameters:
+        url (str): The callback url.
+        token (str): The callback token.
+
+    Returns:
+        KumoReporter: The reporter.
+    """
+    global __reporter
+    if __reporter is not None:
+        __reporter.stop(request_timeout)
+    __reporter = KumoReporter(url, token)
+    __reporter.start()
+    return __reporter
+
+
+def record_kumo_call() -> None:
+    """
+    Count a function call, does nothing if Kumo is not configured.
+    """
+    if __reporter is not None:
+        __reporter.record()
+
+
+def stop_kumo_reporter() -> None:
+    """
+    Stop reporting to Kumo and send the pending calls.
+    """
+    global __reporter
+    if __reporter is not None:
+        __reporter.stop(request_timeout)
+        __reporter = None
+
+
+register(stop_kumo_reporter)
@@ -0,0 +1,169 @@
+"""
+Lazy import for dir mode.
+
+A static scan finds the functions a file decorates with funix, without running the file. They are listed and routed
+at startup, and the file is imported on the first request to one of them, see `funix.decorator.routes`.
+"""
+
+from ast import (
+    AST,
+    AsyncFunctionDef,
+    Attribute,
+    Call,
+    ClassDef,
+    Constant,
+    FunctionDef,
+    Import,
+    ImportFrom,
+    Lambda,
+    Name,
+    Yield,
+    YieldFrom,
+    iter_child_nodes,
+    literal_eval,
+    parse,
+    walk,
+)
+from typing import Any
+
+__funix_names = ["funix", "hint"]
+"""
+The names a lazy file may use from the funix package, others (like `set_default_theme`) change the global state and
+need the file imported at startup.
+"""
+
+__decorator_arguments = [
+    "title",
+    "path",
+    "menu",
+    "secret",
+    "default",
+    "print_to_web",
+    "reactive",
+]
+"""
+The decorator arguments that change the function list or the routes, they must be literals.
+"""
+
+
+def __is_generator(function: FunctionDef) -> bool:
+    """
+    Check if the function body yields, nested functions and classes are skipped.
+    """
+    nodes = list(iter_child_nodes(function))
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (Yield, YieldFrom)):
+            return True
+        if isinstance(node, (FunctionDef, AsyncFunctionDef, ClassDef, Lambda)):
+            continue
+        nodes.extend(iter_child_nodes(node))
+    return False
+
+
+def scan_funix_functions(path: str) -> list[dict] | None:
+    """
+    Find the functions decorated by funix in a file, without running it.
+
+    Parameters:
+        path (str): The path to the file.
+
+    Returns:
+        list[dict] | None: The functions, each one has `name`, `title`, `path`, `menu`, `websocket` and `reactive`.
+            `None` if the file must be imported at startup: it uses funix in a way the scan cannot follow, like
+            conditional decoration, `funix_class` or global settings.
+    """
+    try:
+        with open(path, "rb") as f:
+            tree = parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+    decorator_names = set()
+    module_names = set()
+    for node in walk(tree):
+        if isinstance(node, ImportFrom) and node.module == "funix":
+            for alias in node.names:
+                if alias.name not in __funix_names:
+                    return None
+                if alias.name == "funix":
+                    decorator_names.add(alias.asname or alias.name)
+        elif isinstance(node, Import):
+            for alias in node.names:
+                if alias.name == "funix":
+                    module_names.add(alias.asname or alias.name)
+    if decorator_names & module_names:
+        return None
+
+    references = 0
+    for node in walk(tree):
+        if isinstance(node, Name) and node.id in decorator_names:
+            references += 1
+        elif (
+            isinstance(node, Attribute)
+            and isinstance(node.value, Name)
+            and node.value.id in module_names
+        ):
+            if node.attr == "funix":
+                references += 1
+            elif node.attr not in __funix_names:
+                return None
+
+    def is_funix(expression: AST) -> bool:
+        if isinstance(expression, Call):
+            expression = expression.func
+        if isinstance(expression, Name):
+            return expression.id in decorator_names
+        return (
+            isinstance(expression, Attribute)
+            and expression.attr == "funix"
+            and isinstance(expression.value, Name)
+            and expression.value.id in module_names
+        )
+
+    functions = []
+    for statement in tree.body:
+        if not isinstance(statement, FunctionDef):
+            continue
+        if not any(is_funix(item) for item in statement.decorator_list):
+            continue
+        if len(statement.decorator_list) != 1:
+            return None
+        decorator = statement.decorator_list[0]
+        arguments: dict[str, Any] = {}
+        if isinstance(decorator, Call):
+            if decorator.args:
+                return None
+            for keyword in decorator.keywords:
+                if keyword.arg is None:
+                    return None
+                if keyword.arg == "reactive":
+                    arguments["reactive"] = not (
+                        isinstance(keyword.value, Constant)
+                        and keyword.value.value is None
+                    )
+                elif keyword.arg in __decorator_arguments:
+                    try:
+                        arguments[keyword.arg] = literal_eval(keyword.value)
+                    except (ValueError, TypeError, SyntaxError):
+                        return None
+        if arguments.get("secret") or arguments.get("default"):
+            # Secrets are printed and defaults are chosen at startup
+            return None
+        functions.append(
+            {
+                "name": statement.name,
+                "title": arguments.get("title"),
+                "path": arguments.get("path"),
+                "menu": arguments.get("menu"),
+                "websocket": bool(arguments.get("print_to_web"))
+                or __is_generator(statement),
+                "reactive": bool(arguments.get("reactive")),
+            }
+        )
+        references -= 1
+
+    if references != 0 or not functions:
+        # funix is used somewhere else, or there is nothing to be lazy about
+        return None
+    return functions
@@ -25,21 +25,8 @@ from funix.config import (
     supported_basic_types_dict,
 )
 from funix.decorator import analyze, get_static_uri, handle_ipython_audio_image_video
-
-__matplotlib_use = False
-"""
-Whether Funix can handle matplotlib-related logic
-"""
-
-try:
-    # From now on, Funix no longer mandates matplotlib and mpld3
-    import matplotlib
-
-    matplotlib.use("Agg")  # No display
-    __matplotlib_use = True
-except:
-    pass
-
+from funix.decorator.figure import render_figure
+from funix.decorator.table import is_large_table, store_table
 
 __ipython_use = False
 """
@@ -56,12 +43,6 @@ except:
     pass
 
 
-mpld3: ModuleType | None = None
-"""
-The mpld3 module.
-"""
-
-
 def get_type_dict(annotation: any) -> dict:
     """
     Get the type dict of the annotation.
@@ -339,16 +320,22 @@ def function_param_to_widget(annotation: any, widget: str) -> any:
     return widget
 
 
-def get_dataframe_json(dataframe) -> dict:
+def get_dataframe_json(dataframe) -> dict | list:
     """
-    Converts a pandas dataframe to a dictionary for drawing on the frontend
+    Converts a pandas dataframe to a dictionary for drawing on the frontend.
+    Large dataframes (and lists of rows) are stored server-side, only the first page and the handle are returned,
+    see `funix.decorator.table` for more information.
 
     Parameters:
-        dataframe (pandas.DataFrame | pandera.typing.DataFrame): The dataframe to convert
+        dataframe (pandas.DataFrame | pandera.typing.DataFrame | list[dict]): The dataframe to convert
 
     Returns:
-        dict: The converted dataframe
+        dict | list: The converted dataframe, or the first page with the handle
     """
+    if is_large_table(dataframe):
+        return store_table(dataframe)
+    if isinstance(dataframe, list):
+        return dataframe
     return json.loads(dataframe.to_json(orient="records"))
 
 
@@ -364,22 +351,11 @@ def get_figure(figure) -> dict:
 
     Raises:
         Exception: If matplotlib or mpld3 is not installed
+
+    Notes:
+        See `funix.decorator.figure` for the renderer thread, the cache and the static image mode.
     """
-    global mpld3
-    if __matplotlib_use:
-        if mpld3 is None:
-            try:
-                import matplotlib.pyplot
-
-                mpld3 = import_module("mpld3")
-            except:
-                raise Exception("if you use matplotlib, you must install mpld3")
-
-        fig = mpld3.fig_to_dict(figure)
-        fig["width"] = 560  # TODO: Change it in frontend
-        return fig
-    else:
-        raise Exception("Install matplotlib to use this function")
+    return render_figure(figure)
 
 
 def anal_function_result(
@@ -407,9 +383,14 @@ def anal_function_result(
                 | __ipython_display.Image,
             ):
                 return [handle_ipython_audio_image_video(call_result)]
-        return [get_static_uri(call_result)]
+        return [get_static_uri(call_result, return_type_parsed)]
     else:
         if isinstance(call_result, list):
+            if is_large_table(call_result) and all(
+                isinstance(row, dict) for row in call_result
+            ):
+                # A list of rows is paged like a dataframe
+                return [store_table(call_result)]
             return [call_result]
 
         if __ipython_use:
@@ -473,7 +454,7 @@ def anal_function_result(
                                         __ipython_display.Image,
                                     ),
                                 )
-                                else get_static_uri(single)
+                                else get_static_uri(single, single_return_type)
                                 for single in call_result[position]
                             ]
                         else:
@@ -487,7 +468,9 @@ def anal_function_result(
                                         __ipython_display.Image,
                                     ),
                                 )
-                                else get_static_uri(call_result[position])
+                                else get_static_uri(
+                                    call_result[position], single_return_type
+                                )
                             )
                 return call_result
             else:
@@ -508,7 +491,7 @@ def anal_function_result(
                                         __ipython_display.Image,
                                     ),
                                 )
-                                else get_static_uri(single)
+                                else get_static_uri(single, return_type_parsed)
                                 for single in call_result[0]
                             ]
                         ]
@@ -523,7 +506,9 @@ def anal_function_result(
                                     __ipython_display.Image,
                                 ),
                             )
-                            else get_static_uri(call_result[0])
+                            else get_static_uri(
+                                call_result[0], return_type_parsed
+                            )
                         ]
                 return call_result
     return call_result
@@ -0,0 +1,258 @@
+"""
+Encode media outputs for the browser.
+
+NumPy images become PNG (or WebP with Pillow), NumPy audio becomes WAV, and raw bytes get their MIME type sniffed, so
+the browser can display and play them directly.
+"""
+
+from importlib import import_module
+from io import BytesIO
+from struct import pack
+from types import ModuleType
+from typing import Any
+from wave import open as open_wave
+from zlib import compress, crc32
+
+__pillow_use = False
+"""
+Whether Funix can encode images with Pillow
+"""
+
+__pillow_image: None | ModuleType = None
+
+try:
+    __pillow_image = import_module("PIL.Image")
+
+    __pillow_use = True
+except:
+    pass
+
+image_format: str = "png"
+"""
+The image format for NumPy images, "png" or "webp" (needs Pillow).
+"""
+
+default_audio_rate: int = 44100
+"""
+The sample rate for NumPy audio without a rate.
+"""
+
+__signatures: list[tuple[int, bytes, str]] = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+    (0, b"BM", "image/bmp"),
+    (8, b"WAVE", "audio/wav"),
+    (0, b"OggS", "audio/ogg"),
+    (0, b"fLaC", "audio/flac"),
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"\xff\xfb", "audio/mpeg"),
+    (4, b"ftyp", "video/mp4"),
+    (0, b"\x1a\x45\xdf\xa3", "video/webm"),
+    (0, b"%PDF", "application/pdf"),
+]
+"""
+A list of (offset, magic bytes, MIME type), for sniffing binary outputs.
+"""
+
+
+def set_media_config(
+    image: str | None = None,
+    audio_rate: int | None = None,
+) -> None:
+    """
+    Set the media encoding config.
+
+    Parameters:
+        image (str | None): "png" or "webp", `None` keeps the old value.
+        audio_rate (int | None): The default audio sample rate, `None` keeps the old value.
+
+    Raises:
+        ValueError: If the image format is not supported.
+    """
+    global image_format, default_audio_rate
+    if image is not None:
+        if image not in ["png", "webp"]:
+            raise ValueError(f"Unsupported image format: {image}")
+        if image == "webp" and not __pillow_use:
+            raise ValueError("Install Pillow to encode WebP images")
+        image_format = image
+    if audio_rate is not None:
+        default_audio_rate = audio_rate
+
+
+def is_ndarray(value: Any) -> bool:
+    """
+    Check if the value is a NumPy array, without importing NumPy.
+
+    Parameters:
+        value (Any): The value.
+
+    Returns:
+        bool: If the value is a NumPy array.
+    """
+    value_class = getattr(value, "__class__")
+    return f"{value_class.__module__}.{value_class.__name__}" == "numpy.ndarray"
+
+
+def is_audio_array(value: Any) -> bool:
+    """
+    Check if the value is NumPy audio: a 1-D array, or a `(rate, array)` tuple.
+
+    Parameters:
+        value (Any): The value.
+
+    Returns:
+        bool: If the value is NumPy audio.
+    """
+    if isinstance(value, tuple):
+        return len(value) == 2 and isinstance(value[0], int) and is_ndarray(value[1])
+    return is_ndarray(value) and value.ndim == 1
+
+
+def guess_mimetype(data: bytes) -> str:
+    """
+    Guess the MIME type of binary data by its magic bytes.
+
+    Parameters:
+        data (bytes): The data.
+
+    Returns:
+        str: The MIME type, "application/octet-stream" if unknown.
+    """
+    for offset, signature, mimetype in __signatures:
+        if data[offset : offset + len(signature)] == signature:
+            return mimetype
+    return "application/octet-stream"
+
+
+def __to_uint8(array: Any) -> Any:
+    """
+    Convert image data to uint8, floats are treated as 0-1.
+    """
+    if array.dtype.kind == "f":
+        array = (array.clip(0, 1) * 255).round()
+    elif array.dtype.kind == "b":
+        array = array * 255
+    return array.clip(0, 255).astype("uint8")
+
+
+def __png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return (
+        pack(">I", len(data))
+        + chunk_type
+        + data
+        + pack(">I", crc32(chunk_type + data) & 0xFFFFFFFF)
+    )
+
+
+def encode_png(array: Any) -> bytes:
+    """
+    Encode a uint8 image to PNG, with zlib only.
+
+    Parameters:
+        array (numpy.ndarray): The image, shape (H, W), (H, W, 1), (H, W, 3) or (H, W, 4).
+
+    Returns:
+        bytes: The PNG file.
+    """
+    if array.ndim == 3 and array.shape[2] == 1:
+        array = array[:, :, 0]
+    height, width = array.shape[:2]
+    color_type = {2: 0, 3: 2, 4: 6}[array.ndim if array.ndim == 2 else array.shape[2]]
+    raw = array.reshape(height, -1)
+    # Filter type 0 (None) for each scanline
+    scanlines = b"".join(b"\x00" + row.tobytes() for row in raw)
+    header = pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + __png_chunk(b"IHDR", header)
+        + __png_chunk(b"IDAT", compress(scanlines, 6))
+        + __png_chunk(b"IEND", b"")
+    )
+
+
+def encode_image_array(array: Any) -> tuple[bytes, str]:
+    """
+    Encode a NumPy image.
+
+    Parameters:
+        array (numpy.ndarray): The image, grayscale (H, W), RGB (H, W, 3) or RGBA (H, W, 4).
+
+    Returns:
+        tuple[bytes, str]: The encoded image and its MIME type.
+
+    Raises:
+        ValueError: If the shape is not an image.
+    """
+    if array.ndim not in [2, 3] or (
+        array.ndim == 3 and array.shape[2] not in [1, 3, 4]
+    ):
+        raise ValueError(f"Cannot encode array with shape {array.shape} as image")
+    array = __to_uint8(array)
+    if __pillow_use:
+        buffer = BytesIO()
+        if array.ndim == 3 and array.shape[2] == 1:
+            array = array[:, :, 0]
+        __pillow_image.fromarray(array).save(buffer, format=image_format.upper())
+        return buffer.getvalue(), f"image/{image_format}"
+    return encode_png(array), "image/png"
+
+
+def encode_audio_array(array: Any, rate: int | None = None) -> tuple[bytes, str]:
+    """
+    Encode NumPy audio to 16-bit PCM WAV.
+
+    Parameters:
+        array (numpy.ndarray): The samples, shape (N,) or (N, channels).
+            Floats are treated as -1 to 1, integers are scaled from their own range.
+        rate (int | None): The sample rate, `None` uses `default_audio_rate`.
+
+    Returns:
+        tuple[bytes, str]: The WAV file and its MIME type.
+    """
+    if array.ndim == 1:
+        array = array.reshape(-1, 1)
+    if array.dtype.kind == "f":
+        samples = (array.clip(-1, 1) * 32767).astype("<i2")
+    elif array.dtype.kind in "iu":
+        bits = array.dtype.itemsize * 8
+        if array.dtype.kind == "u":
+            array = array.astype("int64") - (1 << (bits - 1))
+        samples = (
+            array.astype("int64") >> max(bits - 16, 0) << max(16 - bits, 0)
+        ).astype("<i2")
+    else:
+        raise ValueError(f"Cannot encode array with dtype {array.dtype} as audio")
+    buffer = BytesIO()
+    with open_wave(buffer, "wb") as wave_file:
+        wave_file.setnchannels(samples.shape[1])
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(rate or default_audio_rate)
+        wave_file.writeframes(samples.tobytes())
+    return buffer.getvalue(), "audio/wav"
+
+
+def encode_media(value: Any, media_type: str | None = None) -> tuple[bytes, str]:
+    """
+    Encode NumPy media. The declared return type picks the encoder, without it (or for other types) `(rate, array)`
+    tuples and 1-D arrays are audio, other arrays are images.
+
+    Parameters:
+        value (Any): The NumPy media.
+        media_type (str | None): The parsed return type, like "Images" or "Audios".
+
+    Returns:
+        tuple[bytes, str]: The encoded media and its MIME type.
+    """
+    if isinstance(value, tuple):
+        return encode_audio_array(value[1], value[0])
+    if media_type == "Audios":
+        return encode_audio_array(value)
+    if media_type == "Images":
+        return encode_image_array(value)
+    if value.ndim == 1:
+        return encode_audio_array(value)
+    return encode_image_array(value)
@@ -0,0 +1,301 @@
+"""
+Evaluate the reactive params of a function for `/update`.
+
+The frontend asks for an update on every form change. A newer request of the same session supersedes the older
+ones: they stop evaluating and return no result, so only the latest form is computed to the end. The reactive
+callables run in parallel when there are several, and their results can be cached by their inputs.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from json import dumps
+from threading import Lock
+from time import sleep
+from traceback import format_exc
+from typing import Any, Callable
+
+from flask import copy_current_request_context
+
+reactive_debounce: float = 0.0
+"""
+How long (in seconds) an update waits for a newer one of the same session before evaluating.
+"""
+
+reactive_cache_size: int = 0
+"""
+How many results each function caches, key is the reactive param and its inputs. 0 disables the cache, the reactive
+callables must not depend on anything but their inputs to use it.
+"""
+
+reactive_workers: int = 4
+"""
+How many reactive callables run at the same time, for all functions.
+"""
+
+__executor: ThreadPoolExecutor | None = None
+"""
+The pool the reactive callables run in, made on first use.
+"""
+
+__executor_lock = Lock()
+"""
+The lock for making the pool.
+"""
+
+
+def set_reactive_config(
+    debounce: float | None = None,
+    cache_size: int | None = None,
+    workers: int | None = None,
+) -> None:
+    """
+    Set the reactive update config.
+
+    Parameters:
+        debounce (float | None): How long an update waits for a newer one in seconds, `None` keeps the old value.
+        cache_size (int | None): How many results each function caches, 0 disables the cache, `None` keeps the old
+            value.
+        workers (int | None): How many reactive callables run at the same time, `None` keeps the old value.
+    """
+    global reactive_debounce, reactive_cache_size, reactive_workers, __executor
+    if debounce is not None:
+        reactive_debounce = debounce
+    if cache_size is not None:
+        reactive_cache_size = cache_size
+    if workers is not None and workers != reactive_workers:
+        reactive_workers = workers
+        with __executor_lock:
+            old_executor, __executor = __executor, None
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+
+
+def get_reactive_executor() -> ThreadPoolExecutor:
+    """
+    Get the pool the reactive callables run in.
+
+    Returns:
+        ThreadPoolExecutor: The pool, shared by all functions.
+    """
+    global __executor
+    with __executor_lock:
+        if __executor is None:
+            __executor = ThreadPoolExecutor(
+                max_workers=max(reactive_workers, 1),
+                thread_name_prefix="funix-reactive",
+            )
+        return __executor
+
+
+class ReactiveUpdater:
+    """
+    Evaluate the reactive params of a function.
+
+    Attributes:
+        function_id (str): The function id.
+        reactive_config (dict[str, tuple[Callable, dict[str, str]]]): Key is the reactive param, value is the
+            callable and the map from its arguments to the form fields, an empty map passes the whole form.
+    """
+
+    def __init__(
+        self,
+        function_id: str,
+        reactive_config: dict[str, tuple[Callable, dict[str, str]]],
+    ):
+        """
+        Create a new ReactiveUpdater instance.
+
+        Parameters:
+            function_id (str): The function id.
+            reactive_config (dict[str, tuple[Callable, dict[str, str]]]): The reactive params.
+        """
+        self.function_id = function_id
+        self.reactive_config = reactive_config
+        self.__cache: OrderedDict[tuple[str, str], Any] = OrderedDict()
+        self.__cache_lock = Lock()
+        self.__request_numbers = count(1)
+        self.__latest_requests: dict[str, int] = {}
+        self.__pending_changed: dict[str, set[str] | None] = {}
+        self.__latest_requests_lock = Lock()
+
+    def __get_arguments(self, param: str, form_data: dict) -> dict | None:
+        """
+        Get the arguments of a reactive callable from the form, `None` if a mapped field is missing.
+        """
+        callable_config = self.reactive_config[param][1]
+        if callable_config == {}:
+            return form_data
+        arguments = {}
+        for key, value in callable_config.items():
+            if value not in form_data:
+                return None
+            arguments[key] = form_data[value]
+        return arguments
+
+    def __get_cache_key(self, param: str, arguments: dict) -> tuple[str, str] | None:
+        """
+        Get the cache key of a reactive param, `None` if the cache is disabled.
+        """
+        if reactive_cache_size <= 0:
+            return None
+        try:
+            return param, dumps(arguments, sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+
+    def __evaluate(self, param: str, arguments: dict) -> tuple[bool, Any]:
+        """
+        Run a reactive callable. A failed one gives no value like before, its traceback is printed.
+        """
+        try:
+            return True, self.reactive_config[param][0](**arguments)
+        except:
+            print(f"Reactive param {param} of function {self.function_id} failed:")
+            print(format_exc())
+            return False, None
+
+    def __evaluate_params(
+        self, params: list[str], form_data: dict, is_superseded: Callable[[], bool]
+    ) -> dict | None:
+        """
+        Evaluate some reactive params, from the cache if possible. `None` if a newer update came in.
+        """
+        results = {}
+        pending = []
+        for param in params:
+            arguments = self.__get_arguments(param, form_data)
+            if arguments is None:
+                continue
+            cache_key = self.__get_cache_key(param, arguments)
+            if cache_key is not None:
+                with self.__cache_lock:
+                    if cache_key in self.__cache:
+                        self.__cache.move_to_end(cache_key)
+                        results[param] = self.__cache[cache_key]
+                        continue
+            pending.append((param, arguments, cache_key))
+
+        if len(pending) == 1 or reactive_workers <= 1:
+            evaluated = []
+            for param, arguments, cache_key in pending:
+                if is_superseded():
+                    return None
+                evaluated.append(self.__evaluate(param, arguments))
+        else:
+            executor = get_reactive_executor()
+            futures = []
+            for param, arguments, _ in pending:
+                if is_superseded():
+                    # Free the workers for the newer update
+                    for future in futures:
+                        future.cancel()
+                    return None
+                futures.append(
+                    executor.submit(
+                        copy_current_request_context(self.__evaluate), param, arguments
+                    )
+                )
+            evaluated = [future.result() for future in futures]
+
+        for (param, _, cache_key), (succeeded, value) in zip(pending, evaluated):
+            if not succeeded:
+                continue
+            results[param] = value
+            if cache_key is not None:
+                with self.__cache_lock:
+                    self.__cache[cache_key] = value
+                    while len(self.__cache) > reactive_cache_size:
+                        self.__cache.popitem(last=False)
+        return results
+
+    def __depends_on(self, param: str, fields: set[str]) -> bool:
+        """
+        Check if a reactive param takes one of the fields, a callable of the whole form takes all of them.
+        """
+        callable_config = self.reactive_config[param][1]
+        if callable_config == {}:
+            return bool(fields)
+        return any(value in fields for value in callable_config.values())
+
+    def update(
+        self, session_id: str, form_data: dict, changed: list[str] | None = None
+    ) -> dict | None:
+        """
+        Evaluate the reactive params for the form.
+
+        With the changed fields, only the params that take one of them are evaluated, and a param that gets a new
+        value is a changed field for the params after it. Each param is evaluated once at most. An update that
+        supersedes another one in progress takes over its changed fields too, since that one gives no result.
+
+        Parameters:
+            session_id (str): The session id.
+            form_data (dict): The form.
+            changed (list[str] | None): The fields changed since the last update, `None` evaluates every param.
+
+        Returns:
+            dict | None: The new values of the reactive params, `None` if none of them has one or a newer update of the
+                same session came in.
+        """
+        request_number = next(self.__request_numbers)
+        with self.__latest_requests_lock:
+            if session_id in self.__latest_requests:
+                pending_changed = self.__pending_changed.get(session_id)
+                if changed is not None and pending_changed is not None:
+                    changed = list(pending_changed.union(changed))
+                else:
+                    changed = None
+            self.__latest_requests[session_id] = request_number
+            self.__pending_changed[session_id] = (
+                None if changed is None else set(changed)
+            )
+
+        def is_superseded() -> bool:
+            with self.__latest_requests_lock:
+                return self.__latest_requests.get(session_id) != request_number
+
+        try:
+            if reactive_debounce > 0:
+                sleep(reactive_debounce)
+                if is_superseded():
+                    return None
+
+            if changed is None:
+                results = self.__evaluate_params(
+                    list(self.reactive_config), form_data, is_superseded
+                )
+            else:
+                results = {}
+                form_data = dict(form_data)
+                changed_fields = set(changed)
+                evaluated_params = set()
+                while True:
+                    params = [
+                        param
+                        for param in self.reactive_config
+                        if param not in evaluated_params
+                        and self.__depends_on(param, changed_fields)
+                    ]
+                    if not params:
+                        break
+                    evaluated_params.update(params)
+                    new_results = self.__evaluate_params(
+                        params, form_data, is_superseded
+                    )
+                    if new_results is None:
+                        return None
+                    for param, value in new_results.items():
+                        if form_data.get(param) != value:
+                            changed_fields.add(param)
+                            form_data[param] = value
+                    results.update(new_results)
+
+            if results is None or is_superseded() or results == {}:
+                return None
+            return results
+        finally:
+            with self.__latest_requests_lock:
+                if self.__latest_requests.get(session_id) == request_number:
+                    # Only the updates in progress are kept
+                    self.__latest_requests.pop(session_id)
+                    self.__pending_changed.pop(session_id, None)
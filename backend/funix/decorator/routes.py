@@ -0,0 +1,168 @@
+"""
+Dispatch the routes of the decorated functions.
+
+The function routes (`/param`, `/call`, `/update` and `/verify`) are served by a few catch-all Flask routes, that look
+the rule up in a dict. Adding a Flask rule per function route is the slowest part of decorating a function (Werkzeug
+compiles a matcher and a URL builder for every rule), and Flask does not accept new rules once it has served a
+request, which lazy and reloaded files need.
+"""
+
+from threading import RLock
+from traceback import format_exc
+from typing import Callable
+
+from flask import abort
+from werkzeug.exceptions import HTTPException
+
+from funix.app import app, sock
+
+__function_views: dict[str, Callable | None] = {}
+"""
+A dict, key is the route rule, value is the view, None until its lazy file is imported.
+"""
+
+__function_methods: dict[str, str] = {}
+"""
+A dict, key is the route rule, value is the method: "GET", "POST" or "WS" (websocket).
+"""
+
+__lazy_loaders: dict[str, Callable[[], None]] = {}
+"""
+A dict, key is the route rule, value is the function that imports its file.
+"""
+
+__lazy_errors: dict[str, str] = {}
+"""
+A dict, key is the route rule, value is the traceback if its file failed to import.
+"""
+
+__lazy_lock = RLock()
+"""
+The lock for importing files, only one file is imported at a time.
+"""
+
+__dispatch_enabled: bool = False
+"""
+If the catch-all routes are added.
+"""
+
+
+def set_function_route(rule: str, view: Callable, method: str) -> None:
+    """
+    Set the view of a function route.
+
+    Parameters:
+        rule (str): The route rule, like `/call/<function id>`.
+        view (Callable): The view, websocket views get `ws` as the only argument.
+        method (str): "GET", "POST" or "WS" (websocket).
+    """
+    __function_views[rule] = view
+    __function_methods[rule] = method
+
+
+def remove_function_route(rule: str) -> None:
+    """
+    Remove a function route, it returns 404 then.
+
+    Parameters:
+        rule (str): The route rule.
+    """
+    __function_views.pop(rule, None)
+    __function_methods.pop(rule, None)
+    __lazy_loaders.pop(rule, None)
+    __lazy_errors.pop(rule, None)
+
+
+def add_lazy_routes(rules: list[tuple[str, str]], loader: Callable[[], None]) -> None:
+    """
+    Add the routes of a lazy file, the first request to one of them imports the file.
+
+    Parameters:
+        rules (list[tuple[str, str]]): The route rules and their methods, "GET", "POST" or "WS" (websocket).
+        loader (Callable[[], None]): Imports the file, its functions call `set_function_route` while being decorated.
+    """
+    for rule, method in rules:
+        __function_views[rule] = None
+        __function_methods[rule] = method
+        __lazy_loaders[rule] = loader
+
+
+def __get_function_view(rule: str, websocket: bool) -> Callable:
+    """
+    Get the view of a function route, import its file if needed.
+
+    Parameters:
+        rule (str): The route rule.
+        websocket (bool): If the request is a websocket.
+
+    Returns:
+        Callable: The view.
+
+    Raises:
+        werkzeug.exceptions.HTTPException: 404 if there is no such route, 405 if the method does not match.
+    """
+    method = __function_methods.get(rule)
+    if method is None:
+        abort(404)
+    if (method == "WS") != websocket:
+        abort(405)
+    view = __function_views.get(rule)
+    if view is not None:
+        return view
+    with __lazy_lock:
+        loader = __lazy_loaders.get(rule)
+        if loader is not None:
+            try:
+                loader()
+            except:
+                error = format_exc()
+                for other_rule, other_loader in list(__lazy_loaders.items()):
+                    if other_loader is loader:
+                        __lazy_errors[other_rule] = error
+            finally:
+                for other_rule, other_loader in list(__lazy_loaders.items()):
+                    if other_loader is loader:
+                        __lazy_loaders.pop(other_rule)
+    if rule in __lazy_errors:
+        return lambda *args, **kwargs: {
+            "error_type": "wrapper",
+            "error_body": __lazy_errors[rule],
+        }
+    view = __function_views.get(rule)
+    if view is None:
+        # The file does not decorate the function as the scan expected
+        abort(404)
+    return view
+
+
+def enable_dispatch_routes() -> None:
+    """
+    Add the catch-all routes of the function routes, only once.
+    """
+    global __dispatch_enabled
+    if __dispatch_enabled:
+        return
+    __dispatch_enabled = True
+    for prefix, method in [
+        ("param", "GET"),
+        ("call", "POST"),
+        ("update", "POST"),
+        ("verify", "POST"),
+    ]:
+
+        def dispatch_view(name: str, __prefix=prefix):
+            return __get_function_view(f"/{__prefix}/{name}", False)()
+
+        dispatch_view.__name__ = f"__funix_dispatch_{prefix}"
+        app.route(f"/{prefix}/<path:name>", methods=[method])(dispatch_view)
+
+    def dispatch_websocket_view(ws, name: str):
+        try:
+            view = __get_function_view(f"/call/{name}", True)
+        except HTTPException:
+            ws.close()
+            return
+        return view(ws)
+
+    dispatch_websocket_view.__name__ = "__funix_dispatch_websocket"
+    sock.route("/call/<path:name>")(dispatch_websocket_view)
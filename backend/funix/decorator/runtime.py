@@ -1,192 +1,324 @@
-import ast
-from _ast import (
-    Assign,
-    Attribute,
-    Call,
-    ClassDef,
-    Constant,
-    Expr,
-    FunctionDef,
-    Load,
-    Module,
-    Name,
-    Return,
-    Store,
-)
-from typing import Any
-
-import funix
-from funix.hint import WrapperException
-from funix.session import get_global_variable, set_global_variable
+"""
+Turn the methods of a `funix_class` class into functions.
 
+Every public method (and `__init__`) gets a wrapper function with the signature of the method without `self`. The
+wrappers are closures over the class, so a class is registered from the class object itself, its source file is not
+read, parsed or executed.
+"""
 
-def get_init_function(cls_name: str):
-    inited_class = get_global_variable("__FUNIX_" + cls_name)
+from atexit import register
+from collections import OrderedDict
+from functools import wraps
+from inspect import Parameter, Signature, signature, unwrap
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable
 
-    if inited_class is None:
-        raise WrapperException("Class must be inited first!")
-    else:
-        return inited_class
+from flask import session
 
+from funix.hint import WrapperException
 
-def set_init_function(cls_name: str, cls):
-    set_global_variable("__FUNIX_" + cls_name, cls)
 
+class InstancePool:
+    """
+    The live instances of a `funix_class` class.
 
-class RuntimeClassVisitor(ast.NodeVisitor):
-    def __init__(self, cls_name: str, funix_: Any, cls: Any):
-        self.funix = funix_
-        self._cls_name = cls_name
-        self._cls = cls
-        self._imports = []
+    By default every session gets its own instance, like a global variable of the session. In shared mode the
+    sessions that initialize the class with the same arguments share one instance, so a heavy class (like one holding
+    a model) is loaded once. The shared instances must be safe to use from several requests at the same time.
 
-        self.open_function = False
+    Attributes:
+        cls_name (str): The class name.
+        idle_timeout (float | None): The seconds an instance lives without being used, `None` for forever.
+        max_instances (int | None): The maximum live instances, the least recently used one is closed first. `None`
+            for no limit.
+        close (str | Callable[[Any], None] | None): Called when an instance is dropped, a method name (called if the
+            instance has it) or a function that gets the instance.
+        shared (bool): If the sessions share the instances made with the same arguments.
+    """
 
-    def visit_Import(self, node):
-        self._imports.append(node)
+    def __init__(
+        self,
+        cls_name: str,
+        idle_timeout: float | None = None,
+        max_instances: int | None = None,
+        close: str | Callable[[Any], None] | None = None,
+        shared: bool = False,
+    ):
+        """
+        Create a new InstancePool instance.
 
-    def visit_ImportFrom(self, node):
-        self._imports.append(node)
+        Parameters:
+            cls_name (str): The class name.
+            idle_timeout (float | None): The seconds an instance lives without being used.
+            max_instances (int | None): The maximum live instances.
+            close (str | Callable[[Any], None] | None): The close hook.
+            shared (bool): If the sessions share the instances made with the same arguments.
+        """
+        self.cls_name = cls_name
+        self.idle_timeout = idle_timeout
+        self.max_instances = max_instances
+        self.close = close
+        self.shared = shared
+        self.__instances: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self.__session_keys: dict[str, str] = {}
+        self.__lock = Lock()
 
-    def visit_ClassDef(self, node: ClassDef) -> Any:
-        if node.name != self._cls_name:
-            return
-        for cls_function in node.body:
-            if isinstance(cls_function, FunctionDef):
-                self.open_function = True
-                self.visit_FunctionDef(cls_function)
-                self.open_function = False
-
-    def visit_FunctionDef(self, node: FunctionDef) -> Any:
-        if not self.open_function:
+    def __len__(self) -> int:
+        return len(self.__instances)
+
+    def __pop_expired(self, now: float) -> list[Any]:
+        """
+        Drop the instances idle for too long, the least recently used ones are first. Call with the lock held.
+        """
+        dropped = []
+        if self.idle_timeout is None:
+            return dropped
+        while self.__instances:
+            key, (instance, last_used) = next(iter(self.__instances.items()))
+            if now - last_used <= self.idle_timeout:
+                break
+            self.__instances.pop(key)
+            dropped.append(instance)
+        return dropped
+
+    def __close(self, instances: list[Any]) -> None:
+        """
+        Call the close hook of the dropped instances, without the lock held.
+        """
+        if self.close is None:
             return
-        args = node.args
+        for instance in instances:
+            try:
+                if callable(self.close):
+                    self.close(instance)
+                else:
+                    close_method = getattr(instance, self.close, None)
+                    if close_method is not None:
+                        close_method()
+            except Exception as e:
+                print(f"WARNING: closing an instance of {self.cls_name} failed: {e!r}")
 
-        is_static_method = False
+    def get(self, session_id: str) -> Any:
+        """
+        Get the instance of a session.
 
-        funix_decorator = Call(
-            func=Attribute(
-                value=Name(id="__funix__module__", ctx=Load()), attr="funix", ctx=Load()
-            ),
-            args=[],
-            keywords=[],
-        )
+        Parameters:
+            session_id (str): The session id.
 
-        for decorator in node.decorator_list:
-            if hasattr(decorator, "id") and decorator.id == "staticmethod":
-                is_static_method = True
-
-            if hasattr(decorator, "func"):
-                func = decorator.func
-                if (hasattr(func, "id") and func.id == "funix_method") or (
-                    hasattr(func, "value")
-                    and hasattr(func.value, "id")
-                    and func.value.id == "funix"
-                    and hasattr(func, "attr")
-                    and func.attr == "funix_method"
-                ):
-                    for key_word in decorator.keywords:
-                        if key_word.arg == "disable" and key_word.value.value:
-                            return
-                    funix_decorator.keywords = decorator.keywords
-                    funix_decorator.args = decorator.args
-
-        if not is_static_method:
-            # Yes .args
-            args.args.pop(0)
-
-        if node.name.startswith("_") and node.name != "__init__":
-            return
+        Returns:
+            Any: The instance.
 
-        body = [
-            *self._imports,
-            FunctionDef(
-                name=node.name,
-                args=args,
-                decorator_list=[funix_decorator],
-                returns=node.returns,
-                lineno=0,
-            ),
-        ]
-        function = body[-1]
-        new_module = Module(
-            body=body,
-            type_ignores=[],
-        )
+        Raises:
+            WrapperException: If the session has no live instance.
+        """
+        now = monotonic()
+        with self.__lock:
+            dropped = self.__pop_expired(now)
+            key = self.__session_keys.get(session_id) if self.shared else session_id
+            entry = self.__instances.get(key) if key is not None else None
+            if entry is not None:
+                self.__instances[key] = (entry[0], now)
+                self.__instances.move_to_end(key)
+            elif key is not None and self.shared:
+                self.__session_keys.pop(session_id, None)
+        self.__close(dropped)
+        if entry is None:
+            raise WrapperException("Class must be inited first!")
+        return entry[0]
+
+    def put(
+        self, session_id: str, arguments: dict[str, Any], create: Callable[[], Any]
+    ) -> None:
+        """
+        Initialize the instance of a session. In shared mode a live instance made with the same arguments is reused.
 
-        if node.name == "__init__":
-            # new_module.body[0].decorator_list[0].keywords = [
-            #     keyword(arg="title", value=Constant(value=self._cls_name))
-            # ]
-            function.name = "initialize_" + self._cls_name
-            function.body = [
-                Expr(
-                    value=Call(
-                        func=Name(id="set_init_function", ctx=Load()),
-                        args=[
-                            Constant(value=self._cls_name),
-                            Call(
-                                func=Name(id=self._cls_name, ctx=Load()),
-                                args=[
-                                    Name(id=args.arg, ctx=Load()) for args in args.args
-                                ],
-                                keywords=[],
-                            ),
-                        ],
-                        keywords=[],
-                    )
-                )
-            ]
+        Parameters:
+            session_id (str): The session id.
+            arguments (dict[str, Any]): The `__init__` arguments.
+            create (Callable[[], Any]): Makes a new instance.
+        """
+        key = repr(sorted(arguments.items())) if self.shared else session_id
+        now = monotonic()
+        with self.__lock:
+            dropped = self.__pop_expired(now)
+            entry = self.__instances.get(key) if self.shared else None
+        if entry is None:
+            # Not under the lock, `__init__` may be slow
+            instance = create()
         else:
-            if is_static_method:
-                function.body = [
-                    Return(
-                        value=Call(
-                            func=Attribute(
-                                value=Name(id=f"{self._cls_name}", ctx=Load()),
-                                attr=node.name,
-                                ctx=Load(),
-                            ),
-                            args=[Name(id=arg.arg, ctx=Load()) for arg in args.args],
-                            keywords=[],
-                        )
-                    )
-                ]
-            else:
-                function.body = [
-                    Assign(
-                        targets=[Name(id="api", ctx=Store())],
-                        value=Call(
-                            func=Name(id="get_init_function", ctx=Load()),
-                            args=[Constant(value=self._cls_name)],
-                            keywords=[],
-                        ),
-                        lineno=0,
-                    ),
-                    Return(
-                        value=Call(
-                            func=Attribute(
-                                value=Name(id="api", ctx=Load()),
-                                attr=node.name,
-                                ctx=Load(),
-                            ),
-                            args=[Name(id=args.arg, ctx=Load()) for args in args.args],
-                            keywords=[],
-                        )
-                    ),
-                ]
-
-        globals()["__funix__module__"] = funix
-        globals()[self._cls_name] = self._cls
-        code = ast.unparse(new_module)
-        try:
-            exec(
-                code,
-                globals(),
-                locals(),
-            )
-        except Exception as e:
-            print("=== Executed code start ===")
-            print(code)
-            print("=== Executed code end ===")
-            raise e
+            instance = entry[0]
+        with self.__lock:
+            old_entry = self.__instances.get(key)
+            if old_entry is not None and old_entry[0] is not instance:
+                if self.shared:
+                    # Made by another session at the same time, keep that one
+                    dropped.append(instance)
+                    instance = old_entry[0]
+                else:
+                    dropped.append(old_entry[0])
+            self.__instances[key] = (instance, now)
+            self.__instances.move_to_end(key)
+            if self.shared:
+                self.__session_keys[session_id] = key
+            while (
+                self.max_instances is not None
+                and len(self.__instances) > self.max_instances
+            ):
+                dropped.append(self.__instances.popitem(last=False)[1][0])
+        self.__close(dropped)
+
+    def clear(self) -> None:
+        """
+        Drop all the instances.
+        """
+        with self.__lock:
+            dropped = [instance for instance, _ in self.__instances.values()]
+            self.__instances.clear()
+            self.__session_keys.clear()
+        self.__close(dropped)
+
+
+__instance_pools: dict[str, InstancePool] = {}
+"""
+A dict, key is the class name, value is its instance pool.
+"""
+
+
+def __get_session_id() -> str:
+    """
+    Get the session id, the wrapper sets it before calling the function.
+    """
+    session_id = session.get("__funix_id")
+    if not session_id:
+        raise RuntimeError("User ID not found in session.")
+    return session_id
+
+
+def get_init_function(cls_name: str):
+    return __instance_pools[cls_name].get(__get_session_id())
+
+
+def set_init_function(
+    cls_name: str, arguments: dict[str, Any], create: Callable[[], Any]
+):
+    __instance_pools[cls_name].put(__get_session_id(), arguments, create)
+
+
+def set_instance_pool(cls_name: str, pool: InstancePool) -> None:
+    """
+    Set the instance pool of a class, the instances of the class registered before (like before a reload) are dropped.
+
+    Parameters:
+        cls_name (str): The class name.
+        pool (InstancePool): The pool.
+    """
+    old_pool = __instance_pools.get(cls_name)
+    __instance_pools[cls_name] = pool
+    if old_pool is not None:
+        old_pool.clear()
+
+
+@register
+def __close_instance_pools() -> None:
+    """
+    Close the instances when the app exits, so the close hooks run.
+    """
+    for pool in list(__instance_pools.values()):
+        pool.clear()
+
+
+def __get_signature(method: Callable, drop_first: bool) -> Signature:
+    """
+    Get the signature of a method, string annotations (like with `from __future__ import annotations`) are evaluated.
+    """
+    try:
+        method_signature = signature(method, eval_str=True)
+    except (NameError, SyntaxError, TypeError):
+        method_signature = signature(method)
+    parameters = list(method_signature.parameters.values())
+    if drop_first and parameters:
+        parameters.pop(0)
+    return method_signature.replace(
+        parameters=[
+            parameter
+            for parameter in parameters
+            if parameter.kind not in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD)
+        ]
+    )
+
+
+def __make_wrapper(
+    cls: Any, name: str, method: Callable, is_static: bool
+) -> Callable[..., Any]:
+    """
+    Make the wrapper function of a method.
+    """
+    cls_name = cls.__name__
+
+    if name == "__init__":
+
+        def wrapper(**kwargs):
+            set_init_function(cls_name, kwargs, lambda: cls(**kwargs))
+
+    elif is_static:
+
+        def wrapper(**kwargs):
+            return getattr(cls, name)(**kwargs)
+
+    else:
+
+        def wrapper(**kwargs):
+            return getattr(get_init_function(cls_name), name)(**kwargs)
+
+    wrapper = wraps(method)(wrapper)
+    wrapper.__signature__ = __get_signature(method, not is_static)
+    wrapper.__annotations__ = {
+        parameter.name: parameter.annotation
+        for parameter in wrapper.__signature__.parameters.values()
+        if parameter.annotation is not Parameter.empty
+    }
+    if wrapper.__signature__.return_annotation is not Signature.empty:
+        wrapper.__annotations__["return"] = wrapper.__signature__.return_annotation
+    if name == "__init__":
+        wrapper.__name__ = "initialize_" + cls_name
+    return wrapper
+
+
+def register_class_methods(
+    cls: Any,
+    funix_: Callable[..., Callable],
+    method_params: dict[int, dict],
+    pool: InstancePool,
+) -> None:
+    """
+    Decorate the methods of a class with funix, in the order they are defined.
+
+    Parameters:
+        cls (Any): The class.
+        funix_ (Callable[..., Callable]): The funix decorator.
+        method_params (dict[int, dict]): The `funix_method` arguments, key is the id of the decorated function.
+        pool (InstancePool): Keeps the instances of the class.
+    """
+    set_instance_pool(cls.__name__, pool)
+    for name, member in list(vars(cls).items()):
+        is_static = isinstance(member, staticmethod)
+        method = (
+            member.__func__
+            if isinstance(member, (staticmethod, classmethod))
+            else member
+        )
+        if not callable(method):
+            continue
+        original = unwrap(method)
+        if getattr(original, "__qualname__", None) != f"{cls.__qualname__}.{name}":
+            # Assigned in the class body, not defined there
+            continue
+        params = method_params.get(id(member), method_params.get(id(method), {}))
+        if params.get("disable"):
+            continue
+        if name.startswith("_") and name != "__init__":
+            continue
+        funix_(*params.get("args", ()), **params.get("kwargs", {}))(
+            __make_wrapper(cls, name, method, is_static)
+        )
@@ -0,0 +1,192 @@
+"""
+Cache the function schemas on disk.
+
+Building the schema of a function (type analysis, widgets, layouts, theme and source) is the slow part of decorating
+it. The schema only depends on the source files of the function and its annotations, the decorator arguments, the
+theme and the funix version, so a restart (or another replica of the same app) can read it from the cache directory
+instead.
+"""
+
+from hashlib import blake2b
+from importlib.metadata import PackageNotFoundError, version
+from inspect import Signature, getsourcefile, unwrap
+from json import dumps, loads
+from os import makedirs, replace
+from os.path import join, realpath
+from sys import modules
+from sys import version as python_version
+from tempfile import NamedTemporaryFile
+from typing import Any, Callable
+
+schema_cache_dir: str | None = None
+"""
+The cache directory, `None` disables the cache.
+"""
+
+__funix_version: str | None = None
+
+try:
+    __funix_version = version("funix")
+except PackageNotFoundError:
+    pass
+
+__literal_types = (str, int, float, bool, type(None))
+
+
+def set_schema_cache_config(folder: str | None) -> None:
+    """
+    Set the schema cache directory.
+
+    Parameters:
+        folder (str | None): The cache directory, `None` disables the cache.
+    """
+    global schema_cache_dir
+    schema_cache_dir = folder
+
+
+def __is_literal(value: Any) -> bool:
+    """
+    Check if the value is made of literals only, so its `repr` is the same in every process.
+    """
+    if isinstance(value, __literal_types):
+        return True
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return all(__is_literal(item) for item in value)
+    if isinstance(value, dict):
+        return all(
+            __is_literal(key) and __is_literal(item) for key, item in value.items()
+        )
+    return False
+
+
+def __get_annotation_modules(annotation: Any, found: set[str]) -> None:
+    """
+    Collect the modules that define the annotation and its arguments.
+    """
+    if annotation is Signature.empty or isinstance(annotation, __literal_types):
+        return
+    module = getattr(annotation, "__module__", None)
+    if isinstance(module, str) and module != "builtins":
+        found.add(module)
+    for argument in getattr(annotation, "__args__", None) or []:
+        __get_annotation_modules(argument, found)
+
+
+def __hash_file(path: str, digest: blake2b) -> None:
+    """
+    Add the content of the file to the digest.
+    """
+    digest.update(path.encode())
+    with open(path, "rb") as f:
+        digest.update(f.read())
+
+
+def get_schema_cache_key(
+    function: Callable, signature: Signature, arguments: dict[str, Any]
+) -> str | None:
+    """
+    Get the cache key of a function schema.
+
+    Parameters:
+        function (Callable): The function.
+        signature (inspect.Signature): The signature of the function.
+        arguments (dict[str, Any]): The decorator arguments that change the schema, and the parsed theme.
+
+    Returns:
+        str | None: The key, `None` if the schema cannot be cached, like when the cache is disabled or an argument is
+            not a literal.
+    """
+    if schema_cache_dir is None or __funix_version is None:
+        return None
+    if not __is_literal(arguments):
+        return None
+    # funix_class methods are wrapped, the source is the method's
+    original = unwrap(function)
+    try:
+        source_file = realpath(getsourcefile(original))
+    except TypeError:
+        return None
+    # In file mode the module gets a random name on every start, so the module is known by its source file, and its
+    # name is left out of the annotations of its own classes
+    own_module = getattr(original, "__globals__", {}).get(
+        "__name__", function.__module__
+    )
+    signature_text = repr(signature).replace(f"{own_module}.", "")
+    if " at 0x" in signature_text:
+        # Default values without a stable repr
+        return None
+    digest = blake2b(digest_size=20)
+    digest.update(
+        repr(
+            (
+                __funix_version,
+                python_version,
+                function.__qualname__,
+                signature_text,
+                arguments,
+            )
+        ).encode()
+    )
+    try:
+        __hash_file(source_file, digest)
+        annotation_modules: set[str] = set()
+        for parameter in signature.parameters.values():
+            __get_annotation_modules(parameter.annotation, annotation_modules)
+        __get_annotation_modules(signature.return_annotation, annotation_modules)
+        annotation_modules.discard(own_module)
+        for module in sorted(annotation_modules):
+            module_file = getattr(modules.get(module), "__file__", None)
+            if module_file:
+                __hash_file(module_file, digest)
+            elif module not in modules:
+                # A file imported without a module name, it cannot be found again
+                return None
+    except (OSError, TypeError):
+        return None
+    return digest.hexdigest()
+
+
+def load_schema(key: str | None) -> dict | None:
+    """
+    Read a schema from the cache.
+
+    Parameters:
+        key (str | None): The cache key.
+
+    Returns:
+        dict | None: The cached schema entry, `None` on a miss.
+    """
+    if key is None or schema_cache_dir is None:
+        return None
+    try:
+        with open(join(schema_cache_dir, f"{key}.json"), "r", encoding="utf-8") as f:
+            return loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def save_schema(key: str | None, entry: dict) -> bool:
+    """
+    Write a schema to the cache. The schema is sent as JSON anyway, so tuples becoming lists does not matter.
+
+    Parameters:
+        key (str | None): The cache key.
+        entry (dict): The schema entry.
+
+    Returns:
+        bool: If the entry is written.
+    """
+    if key is None or schema_cache_dir is None:
+        return False
+    try:
+        content = dumps(entry)
+        makedirs(schema_cache_dir, exist_ok=True)
+        with NamedTemporaryFile(
+            "w", encoding="utf-8", dir=schema_cache_dir, suffix=".tmp", delete=False
+        ) as f:
+            f.write(content)
+        # Replicas may share the directory, the rename makes the write atomic
+        replace(f.name, join(schema_cache_dir, f"{key}.json"))
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
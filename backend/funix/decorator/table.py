@@ -0,0 +1,267 @@
+"""
+HTTP table service for funix.
+
+Large tabular results (pandas DataFrames or lists of row dicts) are kept on the server, the frontend fetches them
+page by page, sorting and filtering are done here instead of in the browser.
+"""
+
+from collections import OrderedDict
+from json import dumps, loads
+from threading import Lock
+from typing import Any
+from uuid import uuid4
+
+from flask import Response, abort, request
+
+from funix.app import app
+
+__tables_dict: OrderedDict[str, Any] = OrderedDict()
+"""
+A dict, key is table handle, value is the table (DataFrame or list of row dicts).
+The least recently used table is dropped first.
+"""
+
+__tables_lock = Lock()
+"""
+The lock for `__tables_dict`.
+"""
+
+large_table_rows: int = 1000
+"""
+Tables with more rows than this are stored server-side and paged.
+"""
+
+max_cached_tables: int = 32
+"""
+How many large tables are kept in memory at most.
+"""
+
+default_page_size: int = 100
+"""
+The page size of the first page and of requests without `limit`.
+"""
+
+
+def set_table_config(
+    rows: int | None = None,
+    cached: int | None = None,
+    page_size: int | None = None,
+) -> None:
+    """
+    Set the table service config.
+
+    Parameters:
+        rows (int | None): Tables with more rows than this are paged, `None` keeps the old value.
+        cached (int | None): How many large tables are kept in memory, `None` keeps the old value.
+        page_size (int | None): The default page size, `None` keeps the old value.
+    """
+    global large_table_rows, max_cached_tables, default_page_size
+    if rows is not None:
+        large_table_rows = rows
+    if cached is not None:
+        max_cached_tables = cached
+    if page_size is not None:
+        default_page_size = page_size
+
+
+def is_dataframe(table: Any) -> bool:
+    """
+    Check if the table is a pandas(-like) DataFrame, without importing pandas.
+
+    Parameters:
+        table (Any): The table.
+
+    Returns:
+        bool: If the table is a DataFrame.
+    """
+    return hasattr(table, "iloc") and hasattr(table, "to_json")
+
+
+def is_large_table(table: Any) -> bool:
+    """
+    Check if the table should be paged by the server.
+
+    Parameters:
+        table (Any): The table, DataFrame or list of row dicts.
+
+    Returns:
+        bool: If the table is large.
+    """
+    if is_dataframe(table) or isinstance(table, list):
+        return len(table) > large_table_rows
+    return False
+
+
+def get_table_columns(table: Any) -> list[str]:
+    """
+    Get the column names of the table.
+
+    Parameters:
+        table (Any): The table, DataFrame or list of row dicts.
+
+    Returns:
+        list[str]: The column names, in order.
+    """
+    if is_dataframe(table):
+        return [str(column) for column in table.columns]
+    columns = {}
+    for row in table:
+        if isinstance(row, dict):
+            for key in row.keys():
+                columns[str(key)] = None
+    return list(columns.keys())
+
+
+def get_table_page(
+    table: Any,
+    offset: int,
+    limit: int,
+    sort: str | None = None,
+    order: str = "asc",
+    filter_column: str | None = None,
+    filter_value: str | None = None,
+) -> dict:
+    """
+    Get a page of the table. Filter first, then sort, then slice.
+
+    Parameters:
+        table (Any): The table, DataFrame or list of row dicts.
+        offset (int): The first row.
+        limit (int): The max row count.
+        sort (str | None): The column to sort by.
+        order (str): "asc" or "desc".
+        filter_column (str | None): The column to filter by.
+        filter_value (str | None): Keep rows whose column contains this value (case-insensitive).
+
+    Returns:
+        dict: The page, `total` is the row count after filtering.
+
+    Raises:
+        KeyError: If the sort or filter column does not exist.
+    """
+    ascending = order != "desc"
+    if is_dataframe(table):
+        view = table
+        if filter_column is not None and filter_value:
+            view = view[
+                view[filter_column]
+                .astype(str)
+                .str.contains(filter_value, case=False, regex=False)
+            ]
+        if sort is not None:
+            view = view.sort_values(
+                by=sort, ascending=ascending, kind="stable", na_position="last"
+            )
+        rows = loads(view.iloc[offset : offset + limit].to_json(orient="records"))
+        total = len(view)
+    else:
+        view = table
+        if filter_column is not None and filter_value:
+            if filter_column not in get_table_columns(table):
+                raise KeyError(filter_column)
+            lower_value = filter_value.lower()
+            view = [
+                row
+                for row in view
+                if lower_value in str(row.get(filter_column, "")).lower()
+            ]
+        if sort is not None:
+            if sort not in get_table_columns(table):
+                raise KeyError(sort)
+            # The missing values are last in both orders
+            missing_rows = [row for row in view if row.get(sort) is None]
+            view = [row for row in view if row.get(sort) is not None]
+            try:
+                view = sorted(view, key=lambda row: row[sort], reverse=not ascending)
+            except TypeError:
+                # Mixed types in one column
+                view = sorted(
+                    view, key=lambda row: str(row[sort]), reverse=not ascending
+                )
+            view += missing_rows
+        rows = view[offset : offset + limit]
+        total = len(view)
+    return {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "rows": rows,
+    }
+
+
+def store_table(table: Any) -> dict:
+    """
+    Store the table on the server and get the first page with its handle.
+
+    Parameters:
+        table (Any): The table, DataFrame or list of row dicts.
+
+    Returns:
+        dict: The first page, with `handle` and `columns`.
+    """
+    handle = uuid4().hex
+    with __tables_lock:
+        __tables_dict[handle] = table
+        while len(__tables_dict) > max_cached_tables:
+            __tables_dict.popitem(last=False)
+    first_page = get_table_page(table, 0, default_page_size)
+    first_page["handle"] = handle
+    first_page["columns"] = get_table_columns(table)
+    return first_page
+
+
+def enable_table_service():
+    @app.get("/result/<string:handle>")
+    def __funix_export_table(handle: str):
+        """
+        Send a page of a large table.
+
+        Routes:
+            /result/<string:handle>: The table page.
+
+        Query Parameters:
+            offset (int): The first row, default is 0.
+            limit (int): The max row count, default is `default_page_size`.
+            sort (str): The column to sort by.
+            order (str): "asc" or "desc", default is "asc".
+            filter (str): The column to filter by.
+            value (str): The value to filter by.
+
+        Parameters:
+            handle (str): The table handle.
+
+        Returns:
+            flask.Response: The table page.
+        """
+        with __tables_lock:
+            if handle not in __tables_dict:
+                return abort(404)
+            __tables_dict.move_to_end(handle)
+            table = __tables_dict[handle]
+
+        offset = max(request.args.get("offset", 0, type=int), 0)
+        limit = request.args.get("limit", default_page_size, type=int)
+        limit = min(max(limit, 1), large_table_rows)
+
+        try:
+            page = get_table_page(
+                table,
+                offset,
+                limit,
+                sort=request.args.get("sort", None),
+                order=request.args.get("order", "asc"),
+                filter_column=request.args.get("filter", None),
+                filter_value=request.args.get("value", None),
+            )
+        except KeyError as e:
+            return Response(
+                dumps(
+                    {
+                        "error_type": "wrapper",
+                        "error_body": f"Column {e} not found in the table.",
+                    }
+                ),
+                status=400,
+                mimetype="application/json",
+            )
+        return Response(dumps(page), mimetype="application/json")
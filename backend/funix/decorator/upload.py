@@ -0,0 +1,523 @@
+"""
+HTTP upload service for funix.
+
+The frontend sends files to `POST /upload` as multipart form data and passes the returned `/upload/<uid>` references
+to `/call`, instead of inlining them as base64 data URLs. Small uploads are kept in memory, bigger ones are spooled to
+disk, so a large upload never sits in the JSON body or in the worker memory as a whole.
+"""
+
+from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor, wait
+from io import BytesIO
+from mmap import ACCESS_READ, mmap
+from os import remove
+from os.path import join
+from threading import Lock
+from time import time
+from typing import Any
+from urllib.parse import unquote_to_bytes
+from uuid import uuid4
+
+from flask import Response, abort, request, send_file
+
+from funix.app import app
+from funix.decorator.media import guess_mimetype
+from funix.hint import WrapperException
+from funix.util.file import create_safe_tempdir
+
+spool_threshold: int = 4 * 1024 * 1024
+"""
+Uploads bigger than this (in bytes) are spooled to disk, smaller ones stay in memory.
+"""
+
+upload_ttl: int = 60 * 60
+"""
+How long (in seconds) an upload is kept after its last use.
+"""
+
+chunk_size: int = 1024 * 1024
+"""
+The copy buffer size when spooling uploads to disk.
+"""
+
+max_file_size: int | None = None
+"""
+The size limit (in bytes) of each uploaded file, `None` means no limit.
+"""
+
+max_total_size: int | None = None
+"""
+The size limit (in bytes) of all the files of one call, `None` means no limit.
+"""
+
+__decoder = ThreadPoolExecutor(thread_name_prefix="funix-upload")
+"""
+The worker pool that decodes multi-file parameters.
+"""
+
+__spool_dir: str | None = None
+"""
+The directory for spooled uploads, created on the first spooled upload.
+"""
+
+
+class Upload:
+    """
+    An uploaded file, the content is in memory (`content`) or on disk (`path`).
+    """
+
+    def __init__(
+        self,
+        content: bytes | None,
+        path: str | None,
+        filename: str,
+        mimetype: str,
+        size: int,
+    ):
+        self.content = content
+        self.path = path
+        self.filename = filename
+        self.mimetype = mimetype
+        self.size = size
+        self.used = time()
+
+    def read(self) -> bytes:
+        """
+        Read the whole content.
+
+        Returns:
+            bytes: The content.
+        """
+        # Read once, another request may move the content to disk meanwhile
+        content = self.content
+        if content is not None:
+            return content
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def open_buffer(self) -> memoryview:
+        """
+        Get a read-only view of the content, a spooled upload is memory-mapped instead of read.
+
+        Returns:
+            memoryview: The view, release it (and close its `obj` if it is a mmap) after use.
+        """
+        content = self.content
+        if content is not None:
+            return memoryview(content)
+        with open(self.path, "rb") as f:
+            return memoryview(mmap(f.fileno(), 0, access=ACCESS_READ))
+
+    def discard(self) -> None:
+        """
+        Remove the spooled file, if any.
+        """
+        if self.path is not None:
+            try:
+                remove(self.path)
+            except OSError:
+                pass
+
+
+__uploads_dict: dict[str, Upload] = {}
+"""
+A dict, key is upload id, value is the upload.
+"""
+
+__uploads_lock = Lock()
+"""
+The lock for `__uploads_dict`.
+"""
+
+
+def set_upload_config(
+    threshold: int | None = None,
+    ttl: int | None = None,
+    file_size: int | bool | None = None,
+    total_size: int | bool | None = None,
+) -> None:
+    """
+    Set the upload config.
+
+    Parameters:
+        threshold (int | None): The spooling threshold in bytes, `None` keeps the old value.
+        ttl (int | None): How long an upload is kept in seconds, `None` keeps the old value.
+        file_size (int | bool | None): The size limit of each file in bytes, `False` removes the limit,
+            `None` keeps the old value.
+        total_size (int | bool | None): The size limit of all the files of one call in bytes, `False` removes the
+            limit, `None` keeps the old value.
+    """
+    global spool_threshold, upload_ttl, max_file_size, max_total_size
+    if threshold is not None:
+        spool_threshold = threshold
+    if ttl is not None:
+        upload_ttl = ttl
+    if file_size is not None:
+        max_file_size = None if file_size is False else file_size
+    if total_size is not None:
+        max_total_size = None if total_size is False else total_size
+
+
+def __get_spool_dir() -> str:
+    global __spool_dir
+    if __spool_dir is None:
+        __spool_dir = create_safe_tempdir()
+    return __spool_dir
+
+
+def __expire_uploads() -> None:
+    """
+    Drop the uploads that are not used for `upload_ttl` seconds.
+    """
+    deadline = time() - upload_ttl
+    with __uploads_lock:
+        expired = [uid for uid, item in __uploads_dict.items() if item.used < deadline]
+        items = [__uploads_dict.pop(uid) for uid in expired]
+    for item in items:
+        item.discard()
+
+
+def is_upload_reference(value: Any) -> bool:
+    """
+    Check if the value is a funix upload reference, like "/upload/<uid>".
+
+    Parameters:
+        value (Any): The value.
+
+    Returns:
+        bool: If the value is an upload reference.
+    """
+    return isinstance(value, str) and value.startswith("/upload/")
+
+
+def is_data_url(value: Any) -> bool:
+    """
+    Check if the value is a data URL.
+
+    Parameters:
+        value (Any): The value.
+
+    Returns:
+        bool: If the value is a data URL.
+    """
+    return isinstance(value, str) and value.startswith("data:")
+
+
+def decode_data_url(data_url: str) -> tuple[bytes, str]:
+    """
+    Decode a data URL, without going through `urlopen`.
+
+    Parameters:
+        data_url (str): The data URL.
+
+    Returns:
+        tuple[bytes, str]: The content and its MIME type.
+
+    Raises:
+        WrapperException: If the data URL is malformed.
+    """
+    header, separator, data = data_url.partition(",")
+    if not separator:
+        raise WrapperException("Malformed data URL")
+    options = header[5:].split(";")
+    mimetype = options[0] or "text/plain"
+    try:
+        if "base64" in options[1:]:
+            return b64decode(data, validate=False), mimetype
+        return unquote_to_bytes(data), mimetype
+    except ValueError:
+        raise WrapperException("Malformed data URL")
+
+
+def __check_file_size(size: int, name: str) -> None:
+    if max_file_size is not None and size > max_file_size:
+        raise WrapperException(
+            f"File {name + ' ' if name else ''}is bigger than the limit of {max_file_size} bytes"
+        )
+
+
+def get_upload_size(value: Any) -> int | None:
+    """
+    Get the size of an uploaded parameter without decoding it.
+
+    Parameters:
+        value (Any): An upload reference or a data URL.
+
+    Returns:
+        int | None: The size in bytes, `None` for other values (they are rejected when loaded).
+    """
+    if is_upload_reference(value):
+        return get_upload(value).size
+    if is_data_url(value):
+        header, _, data = value.partition(",")
+        if "base64" in header[5:].split(";")[1:]:
+            return len(data) * 3 // 4 - len(data) + len(data.rstrip("="))
+        return len(data)
+    return None
+
+
+def check_upload_sizes(values: list[Any]) -> None:
+    """
+    Check the uploaded parameters of one call against `max_file_size` and `max_total_size`, before decoding them.
+
+    Parameters:
+        values (list[Any]): The uploaded parameters.
+
+    Raises:
+        WrapperException: If a file or all the files are too big.
+    """
+    if max_file_size is None and max_total_size is None:
+        return
+    total = 0
+    for value in values:
+        size = get_upload_size(value)
+        if size is None:
+            continue
+        __check_file_size(size, "")
+        total += size
+        if max_total_size is not None and total > max_total_size:
+            raise WrapperException(
+                f"Files are bigger than the total limit of {max_total_size} bytes"
+            )
+
+
+def save_upload(stream: Any, filename: str = "", mimetype: str | None = None) -> str:
+    """
+    Save an upload from a binary stream, spool it to disk if it is bigger than `spool_threshold`.
+
+    Parameters:
+        stream (Any): The binary stream, anything with `read`.
+        filename (str): The original file name.
+        mimetype (str | None): The MIME type, guessed from the content if None.
+
+    Returns:
+        str: The upload reference, "/upload/<uid>".
+
+    Raises:
+        WrapperException: If the file is bigger than `max_file_size`.
+    """
+    __expire_uploads()
+    uid = uuid4().hex
+    head = stream.read(spool_threshold + 1)
+    __check_file_size(len(head), filename)
+    if len(head) <= spool_threshold:
+        item = Upload(head, None, filename, mimetype or guess_mimetype(head), len(head))
+    else:
+        path = join(__get_spool_dir(), uid)
+        try:
+            with open(path, "wb") as f:
+                f.write(head)
+                while chunk := stream.read(chunk_size):
+                    f.write(chunk)
+                    __check_file_size(f.tell(), filename)
+                size = f.tell()
+        except:
+            remove(path)
+            raise
+        item = Upload(None, path, filename, mimetype or guess_mimetype(head), size)
+    with __uploads_lock:
+        __uploads_dict[uid] = item
+    return f"/upload/{uid}"
+
+
+def get_upload(reference: str) -> Upload:
+    """
+    Get the upload by its reference.
+
+    Parameters:
+        reference (str): The upload reference, "/upload/<uid>".
+
+    Returns:
+        Upload: The upload.
+
+    Raises:
+        WrapperException: If the upload does not exist or has expired.
+    """
+    __expire_uploads()
+    with __uploads_lock:
+        item = __uploads_dict.get(reference[len("/upload/") :])
+    if item is None:
+        raise WrapperException(f"Upload {reference} does not exist or has expired")
+    item.used = time()
+    return item
+
+
+def load_upload(
+    value: str, mode: str = "bytes", buffers: list[memoryview] | None = None
+) -> bytes | str | memoryview:
+    """
+    Turn an uploaded parameter into what the function wants.
+
+    Parameters:
+        value (str): An upload reference or a data URL.
+        mode (str): "bytes" for the content, "path" for a file path, "mmap" for a read-only memoryview.
+        buffers (list[memoryview] | None): The opened memoryviews are appended here, for `release_buffers`.
+
+    Returns:
+        bytes | str | memoryview: The content, the path or the view.
+
+    Raises:
+        WrapperException: If the value is not an upload reference or a data URL, other URLs (like `file://`) are
+            never opened.
+    """
+    if is_upload_reference(value):
+        item = get_upload(value)
+        if mode == "mmap":
+            buffer = item.open_buffer()
+            if buffers is not None:
+                buffers.append(buffer)
+            return buffer
+        if mode == "path":
+            with __uploads_lock:
+                if item.path is None:
+                    # Move the in-memory upload to disk, the function wants a path
+                    path = join(__get_spool_dir(), uuid4().hex)
+                    with open(path, "wb") as f:
+                        f.write(item.content)
+                    item.path, item.content = path, None
+            return item.path
+        return item.read()
+    if not is_data_url(value):
+        raise WrapperException("A file must be an upload reference or a data URL")
+    content, mimetype = decode_data_url(value)
+    __check_file_size(len(content), "")
+    if mode == "path":
+        return load_upload(save_upload(BytesIO(content), mimetype=mimetype), "path")
+    if mode == "mmap":
+        return memoryview(content)
+    return content
+
+
+def load_uploads(
+    values: list[str], mode: str = "bytes", buffers: list[memoryview] | None = None
+) -> list[bytes | str | memoryview]:
+    """
+    `load_upload` for multi-file parameters, the files are decoded concurrently.
+
+    Parameters:
+        values (list[str]): The uploaded parameters.
+        mode (str): See `load_upload`.
+        buffers (list[memoryview] | None): See `load_upload`.
+
+    Returns:
+        list[bytes | str | memoryview]: The files, in the same order.
+
+    Raises:
+        WrapperException: If a file cannot be loaded, the first error in order.
+    """
+    if len(values) < 2:
+        return [load_upload(value, mode, buffers) for value in values]
+    futures = [__decoder.submit(load_upload, value, mode, buffers) for value in values]
+    # All of them, so the buffers are all in the list when the caller releases them
+    wait(futures)
+    return [future.result() for future in futures]
+
+
+def release_buffers(buffers: list[memoryview]) -> None:
+    """
+    Release the memoryviews from `load_upload` and unmap the spooled uploads behind them.
+    A mmap is left to the garbage collector if the function still holds a view of it.
+
+    Parameters:
+        buffers (list[memoryview]): The memoryviews.
+    """
+    for buffer in buffers:
+        mapped = buffer.obj
+        buffer.release()
+        if isinstance(mapped, mmap):
+            try:
+                mapped.close()
+            except BufferError:
+                pass
+    buffers.clear()
+
+
+def get_upload_mode(annotation: Any) -> str:
+    """
+    Get how an upload parameter is delivered, by its annotation (or the item annotation of lists).
+
+    Parameters:
+        annotation (Any): The parameter annotation.
+
+    Returns:
+        str: "bytes", "path" or "mmap".
+    """
+    for candidate in [annotation, *getattr(annotation, "__args__", ())]:
+        mode = getattr(candidate, "__funix_upload__", None)
+        if mode is not None:
+            return mode
+    return "bytes"
+
+
+def enable_upload_service():
+    @app.post("/upload")
+    def __funix_export_upload() -> dict:
+        """
+        Receive files as multipart form data.
+
+        Routes:
+            /upload: The upload path.
+
+        Returns:
+            dict: `files` is the list of the upload references, in the order of the form fields.
+                Or the error if the files are too big.
+        """
+        if (
+            max_total_size is not None
+            and request.content_length is not None
+            and request.content_length > max_total_size
+        ):
+            # Reject before the body is parsed
+            return {
+                "error_type": "wrapper",
+                "error_body": f"Files are bigger than the total limit of {max_total_size} bytes",
+            }, 413
+        files = request.files.getlist("file")
+        if not files:
+            return abort(400)
+        references = []
+        try:
+            for file in files:
+                references.append(
+                    save_upload(
+                        file.stream,
+                        file.filename or "",
+                        (
+                            None
+                            if file.mimetype in ["", "application/octet-stream"]
+                            else file.mimetype
+                        ),
+                    )
+                )
+        except WrapperException as e:
+            return {"error_type": "wrapper", "error_body": str(e)}, 413
+        return {"files": references}
+
+    @app.get("/upload/<string:uid>")
+    def __funix_export_uploaded_file(uid: str) -> Response:
+        """
+        Send an uploaded file back, the frontend uses it to restore history.
+
+        Routes:
+            /upload/<string:uid>: The uploaded file path.
+
+        Parameters:
+            uid (str): The upload id.
+
+        Returns:
+            flask.Response: The file.
+        """
+        try:
+            item = get_upload(f"/upload/{uid}")
+        except WrapperException:
+            return abort(404)
+        content = item.content
+        if content is None:
+            return send_file(
+                item.path, mimetype=item.mimetype, download_name=item.filename or uid
+            )
+        return send_file(
+            BytesIO(content),
+            mimetype=item.mimetype,
+            download_name=item.filename or uid,
+        )
@@ -3,15 +3,20 @@ Handle frontend requests and start the frontend.
 """
 
 from ipaddress import IPv4Address, IPv6Address
-from os.path import abspath, exists, join
+from os.path import abspath, join
 from threading import Thread
 from uuid import uuid4
 from webbrowser import open
 
-from flask import send_from_directory, session
+from flask import abort, session
 
-from funix.app import app
-from funix.util.network import get_compressed_ip_address_as_str, is_port_used
+from funix.app import app, ready
+from funix.frontend.assets import get_asset, load_manifest, send_asset
+from funix.util.network import (
+    get_compressed_ip_address_as_str,
+    is_port_used,
+    wait_for_port,
+)
 
 folder = abspath(join(abspath(__file__), "../../build"))  # Best abs path ever
 
@@ -54,11 +59,10 @@ class OpenFrontend(Thread):
 
     def run(self) -> None:
         """
-        Open the frontend in the browser.
+        Open the frontend in the browser, once Funix is ready and the server is online.
         """
-        while not self.is_server_online():
-            pass
-        open(f"http://{self.host}:{self.port}")
+        if wait_for_port(self.port, self.host, ready):
+            open(f"http://{self.host}:{self.port}")
 
 
 def run_open_frontend(host: IPv4Address | IPv6Address, port: int) -> None:
@@ -78,6 +82,7 @@ def start() -> None:
     """
     Start the frontend.
     """
+    load_manifest(folder)
 
     @app.route("/")
     def __send_index():
@@ -92,7 +97,7 @@ def start() -> None:
         """
         if not session.get("__funix_id"):
             session["__funix_id"] = uuid4().hex
-        return send_from_directory(folder, "index.html")
+        return send_asset(get_asset("index.html"))
 
     @app.route("/<path:path>")
     def __send_root_files(path):
@@ -109,9 +114,10 @@ def start() -> None:
         Returns:
             flask.Response: The static files or the index.html file.
         """
-        if exists(join(folder, path)):
-            return send_from_directory(folder, path)
-        return send_from_directory(folder, "index.html")
+        asset = get_asset(path)
+        if asset is not None:
+            return send_asset(asset)
+        return send_asset(get_asset("index.html"))
 
     @app.route("/static/<path:res>/<path:path>")
     def __send_static_files(res, path):
@@ -128,4 +134,7 @@ def start() -> None:
         Returns:
             flask.Response: The static files.
         """
-        return send_from_directory(abspath(join(folder, f"static/{res}/")), path)
+        asset = get_asset(f"static/{res}/{path}")
+        if asset is None:
+            return abort(404)
+        return send_asset(asset)
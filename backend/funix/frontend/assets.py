@@ -0,0 +1,214 @@
+"""
+Serve the static assets of the funix frontend build.
+
+The build directory is loaded once into memory (content, ETag and MIME type), so requests never touch the disk. Text
+assets are sent gzip or brotli compressed when the browser accepts it, using the `.gz` / `.br` files next to them if
+the build has them, or compressing them on the first request. Files with a content hash in their names are cached by
+browsers forever.
+"""
+
+from gzip import compress as gzip_compress
+from hashlib import blake2b
+from importlib import import_module
+from mimetypes import guess_type
+from os import walk
+from os.path import getmtime, join, relpath
+from re import compile as re_compile
+from threading import Lock
+from types import ModuleType
+
+from flask import Response, abort, request
+
+__brotli_use = False
+"""
+Whether Funix can compress assets with brotli
+"""
+
+__brotli_module: None | ModuleType = None
+
+try:
+    __brotli_module = import_module("brotli")
+
+    __brotli_use = True
+except:
+    pass
+
+min_compress_size: int = 1024
+"""
+Assets smaller than this (in bytes) are not compressed.
+"""
+
+compress_mimetypes: list[str] = [
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "image/svg+xml",
+    "image/x-icon",
+    "image/vnd.microsoft.icon",
+]
+"""
+The MIME types (or prefixes) worth compressing.
+"""
+
+hashed_name = re_compile(r"\.[0-9a-f]{8,}\.")
+"""
+Matches file names with a content hash, like `main.11039f36.js`.
+"""
+
+
+class Asset:
+    """
+    A file of the frontend build, loaded into memory.
+    """
+
+    def __init__(self, path: str, name: str):
+        self.path = path
+        self.mimetype = guess_type(name)[0] or "application/octet-stream"
+        with open(path, "rb") as f:
+            self.content = f.read()
+        self.size = len(self.content)
+        self.mtime = getmtime(path)
+        self.etag = blake2b(self.content, digest_size=16).hexdigest()
+        self.immutable = hashed_name.search(name.rsplit("/", 1)[-1]) is not None
+        self.compressible = self.size >= min_compress_size and any(
+            self.mimetype.startswith(prefix) for prefix in compress_mimetypes
+        )
+        self.variants: dict[str, bytes] = {}
+
+
+__manifest: dict[str, Asset] = {}
+"""
+A dict, key is the path relative to the build directory (like "static/js/d3.v5.js"), value is the asset.
+"""
+
+__manifest_folder: str | None = None
+"""
+The build directory of the manifest.
+"""
+
+__variants_lock = Lock()
+"""
+The lock for compressing asset variants.
+"""
+
+
+def load_manifest(folder: str) -> dict[str, Asset]:
+    """
+    Scan the build directory into the manifest, only once.
+
+    Parameters:
+        folder (str): The build directory.
+
+    Returns:
+        dict[str, Asset]: The manifest.
+    """
+    global __manifest_folder
+    if __manifest_folder == folder:
+        return __manifest
+    __manifest.clear()
+    compressed = []
+    for root, _, files in walk(folder):
+        for file in files:
+            path = join(root, file)
+            name = relpath(path, folder).replace("\\", "/")
+            if name.endswith(".br") or name.endswith(".gz"):
+                compressed.append((name, path))
+            else:
+                __manifest[name] = Asset(path, name)
+    for name, path in compressed:
+        original, suffix = name[:-3], name[-3:]
+        if original in __manifest:
+            encoding = "br" if suffix == ".br" else "gzip"
+            with open(path, "rb") as f:
+                __manifest[original].variants[encoding] = f.read()
+        else:
+            __manifest[name] = Asset(path, name)
+    __manifest_folder = folder
+    return __manifest
+
+
+def get_asset(path: str) -> Asset | None:
+    """
+    Find the asset in the manifest.
+
+    Parameters:
+        path (str): The path relative to the build directory.
+
+    Returns:
+        Asset | None: The asset, `None` if the build does not have it.
+    """
+    return __manifest.get(path)
+
+
+def __compress(asset: Asset, encoding: str) -> bytes:
+    """
+    Get the compressed content, compress it on the first use.
+    """
+    variant = asset.variants.get(encoding)
+    if variant is not None:
+        return variant
+    with __variants_lock:
+        if encoding in asset.variants:
+            return asset.variants[encoding]
+        if encoding == "br":
+            variant = __brotli_module.compress(asset.content)
+        else:
+            variant = gzip_compress(asset.content, 9, mtime=0)
+        asset.variants[encoding] = variant
+        return variant
+
+
+def negotiate_encoding(asset: Asset) -> str | None:
+    """
+    Choose the content encoding from the `Accept-Encoding` header of the current request.
+
+    Parameters:
+        asset (Asset): The asset.
+
+    Returns:
+        str | None: "br" or "gzip", `None` for no compression.
+    """
+    if not asset.compressible:
+        return None
+    best: str | None = None
+    best_quality = 0
+    for encoding in ["br", "gzip"]:
+        if encoding == "br" and not (__brotli_use or "br" in asset.variants):
+            continue
+        quality = request.accept_encodings[encoding]
+        if quality > best_quality:
+            best = encoding
+            best_quality = quality
+    return best
+
+
+def send_asset(asset: Asset | None) -> Response:
+    """
+    Send the asset, compressed if possible, with the cache headers.
+
+    Parameters:
+        asset (Asset | None): The asset, `None` if it is not in the build.
+
+    Returns:
+        flask.Response: The asset, or 404 if there is no asset.
+    """
+    if asset is None:
+        return abort(404)
+    encoding = negotiate_encoding(asset)
+    if encoding is None:
+        response = Response(asset.content, mimetype=asset.mimetype)
+        response.set_etag(asset.etag)
+    else:
+        response = Response(__compress(asset, encoding), mimetype=asset.mimetype)
+        response.set_etag(f"{asset.etag}-{encoding}")
+        response.headers["Content-Encoding"] = encoding
+    response.last_modified = asset.mtime
+    response.make_conditional(request)
+    if asset.compressible:
+        response.vary.add("Accept-Encoding")
+    if asset.immutable:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -363,6 +363,14 @@ BytesImage: TypeAlias = builtin.BytesImage
 BytesVideo: TypeAlias = builtin.BytesVideo
 BytesAudio: TypeAlias = builtin.BytesAudio
 BytesFile: TypeAlias = builtin.BytesFile
+BufferImage: TypeAlias = builtin.BufferImage
+BufferVideo: TypeAlias = builtin.BufferVideo
+BufferAudio: TypeAlias = builtin.BufferAudio
+BufferFile: TypeAlias = builtin.BufferFile
+PathImage: TypeAlias = builtin.PathImage
+PathVideo: TypeAlias = builtin.PathVideo
+PathAudio: TypeAlias = builtin.PathAudio
+PathFile: TypeAlias = builtin.PathFile
 # ---- Built-in Input Widgets ----
 
 
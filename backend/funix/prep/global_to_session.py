@@ -7,6 +7,7 @@ Limited application cases/not fully considered
 from _ast import (
     AST,
     Assign,
+    AsyncFunctionDef,
     Attribute,
     Call,
     Constant,
@@ -17,11 +18,21 @@ from _ast import (
     Load,
     Module,
     Name,
+    Pass,
+    Store,
 )
 from ast import NodeTransformer, parse, unparse
-from os.path import join
+from hashlib import blake2b
+from importlib.metadata import PackageNotFoundError, version
+from os import environ, listdir, makedirs, replace
+from os.path import abspath, basename, expanduser, isfile, join
+from py_compile import PyCompileError
+from py_compile import compile as compile_file
 from random import sample
+from shutil import rmtree
 from string import ascii_letters
+from sys import version as python_version
+from tempfile import NamedTemporaryFile
 from typing import Any
 
 from funix.util.file import create_safe_tempdir
@@ -30,9 +41,12 @@ MESS_NAMES: list[str] = [
     "".join(sample("ABCDEF", 5)),
     "".join(sample("GHIJKL", 5)),
     "".join(sample("MNOPQR", 5)),
+    "".join(sample("STUVWX", 5)),
+    "".join(sample("abcdef", 5)),
 ]
 """
-Random names for `get_global_variable`, `set_global_variable`, `set_default_global_variable`.
+Random names for `get_global_variable`, `set_global_variable`, `set_default_global_variable`,
+`get_session_namespace` and the session namespace in a function.
 """
 
 USE_METHOD: list[str] = list(map(lambda x: f"_FUNIX_SESSION_{x}", MESS_NAMES))
@@ -45,6 +59,32 @@ session_variables: set[str] = set()
 The global variables to transform.
 """
 
+transform_cache_dir: str | None = join(
+    environ.get("XDG_CACHE_HOME") or expanduser("~/.cache"), "funix", "transform"
+)
+"""
+The directory to keep the transformed files (and their bytecode) in across restarts, `None` writes them to a temporary
+directory every time.
+"""
+
+__funix_version: str = ""
+
+try:
+    __funix_version = version("funix")
+except PackageNotFoundError:
+    pass
+
+
+def set_transform_cache_config(folder: str | None) -> None:
+    """
+    Set the transform cache directory.
+
+    Parameters:
+        folder (str | None): The cache directory, `None` disables the cache.
+    """
+    global transform_cache_dir
+    transform_cache_dir = folder
+
 
 def add_force_import(source_code: str) -> str:
     """
@@ -60,7 +100,8 @@ def add_force_import(source_code: str) -> str:
         f"from funix.session import "
         f"get_global_variable as {USE_METHOD[0]}, "
         f"set_global_variable as {USE_METHOD[1]}, "
-        f"set_default_global_variable as {USE_METHOD[2]}"
+        f"set_default_global_variable as {USE_METHOD[2]}, "
+        f"get_session_namespace as {USE_METHOD[3]}"
     )
     return import_text + "\n" + source_code
 
@@ -114,8 +155,63 @@ class PreprocessGlobalVariables(NodeTransformer):
 class EditSessionVariablesTransformer(NodeTransformer):
     """
     Now let's transform the global variables to session variables
+
+    A function gets the session namespace once, at its start, and uses the variables as its attributes, so a variable
+    in a loop costs an attribute access instead of a session lookup. Code outside the functions (run at import, before
+    any session) calls `get_global_variable` and `set_global_variable`.
     """
 
+    def __init__(self):
+        self.function_scopes: list[bool] = []
+        """
+        A stack of the functions being visited, if each one uses the session namespace.
+        """
+
+    def visit_FunctionDef(self, node: FunctionDef | AsyncFunctionDef) -> Any:
+        """
+        Visit the function.
+        Get the session namespace at the start if the function uses it.
+
+        Parameters:
+            node (FunctionDef | AsyncFunctionDef): The function.
+
+        Returns:
+            Any: The function.
+        """
+        # Decorators, defaults and annotations run outside the function
+        node.decorator_list = [self.visit(item) for item in node.decorator_list]
+        node.args = self.visit(node.args)
+        if node.returns is not None:
+            node.returns = self.visit(node.returns)
+        self.function_scopes.append(False)
+        body = []
+        for statement in node.body:
+            new_statement = self.visit(statement)
+            if isinstance(new_statement, list):
+                body.extend(new_statement)
+            elif new_statement is not None:
+                body.append(new_statement)
+        if self.function_scopes.pop():
+            has_docstring = (
+                isinstance(body[0], Expr)
+                and isinstance(body[0].value, Constant)
+                and isinstance(body[0].value.value, str)
+            )
+            body.insert(
+                1 if has_docstring else 0,
+                Assign(
+                    targets=[Name(id=USE_METHOD[4], ctx=Store())],
+                    value=Call(
+                        func=Name(id=USE_METHOD[3], ctx=Load()), args=[], keywords=[]
+                    ),
+                    lineno=node.lineno,
+                ),
+            )
+        node.body = body or [Pass()]
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
     def visit_Global(self, node: Global) -> Any:
         """
         Visit the global variables.
@@ -139,18 +235,21 @@ class EditSessionVariablesTransformer(NodeTransformer):
             node (Any): The assignment.
 
         Returns:
-            Any: The `set_global_variable` Call.
+            Any: The `set_global_variable` Call, or the assignment to the namespace in a function.
         """
-        if isinstance(node.targets[0], Name):
-            if node.targets[0].id in session_variables:
-                node = Expr(
-                    value=Call(
-                        func=Name(id=USE_METHOD[1], ctx=Load()),
-                        args=[Constant(node.targets[0].id), node.value],
-                        keywords=[],
-                    )
+        if (
+            not self.function_scopes
+            and isinstance(node.targets[0], Name)
+            and node.targets[0].id in session_variables
+        ):
+            return Expr(
+                value=Call(
+                    func=Name(id=USE_METHOD[1], ctx=Load()),
+                    args=[Constant(node.targets[0].id), self.visit(node.value)],
+                    keywords=[],
                 )
-        return node
+            )
+        return self.generic_visit(node)
 
     def visit_Name(self, node: Any) -> Any:
         """
@@ -161,13 +260,16 @@ class EditSessionVariablesTransformer(NodeTransformer):
             node (Any): The name.
 
         Returns:
-            Any: The `get_global_variable` Call.
+            Any: The attribute of the session namespace in a function, the `get_global_variable` Call outside.
         """
-        if node.id in session_variables:
-            node = Call(
-                func=Name(id=USE_METHOD[0]), args=[Constant(node.id)], keywords=[]
+        if node.id not in session_variables:
+            return node
+        if self.function_scopes:
+            self.function_scopes[-1] = True
+            return Attribute(
+                value=Name(id=USE_METHOD[4], ctx=Load()), attr=node.id, ctx=node.ctx
             )
-        return node
+        return Call(func=Name(id=USE_METHOD[0]), args=[Constant(node.id)], keywords=[])
 
 
 def do_global_to_session(source: str) -> str:
@@ -188,6 +290,44 @@ def do_global_to_session(source: str) -> str:
     return unparse(nodes)
 
 
+def __get_cached_python_file(file_path: str, source: str) -> str | None:
+    """
+    Get the transformed file from the cache, or transform the source and cache it.
+
+    The entry of a file is `<path hash>-<source hash>/<file name>`, the source hash covers the source, the funix version,
+    this module and the Python version. Older entries of the same path are removed when a new one is written.
+    """
+    path_key = blake2b(abspath(file_path).encode(), digest_size=8).hexdigest()
+    digest = blake2b(digest_size=16)
+    with open(__file__, "rb") as file:
+        digest.update(file.read())
+    digest.update(repr((__funix_version, python_version)).encode())
+    digest.update(source.encode("utf-8"))
+    entry_name = f"{path_key}-{digest.hexdigest()}"
+    entry_dir = join(transform_cache_dir, entry_name)
+    new_file_path = join(entry_dir, basename(file_path))
+    if isfile(new_file_path):
+        return new_file_path
+
+    new_source = do_global_to_session(source)
+    try:
+        makedirs(entry_dir, exist_ok=True)
+        with NamedTemporaryFile(
+            "w", encoding="utf-8", dir=entry_dir, suffix=".tmp", delete=False
+        ) as file:
+            file.write(new_source)
+        # Another funix may start from the same cache, the rename makes the write atomic
+        replace(file.name, new_file_path)
+        # Next to the file in `__pycache__`, where the import looks for it
+        compile_file(new_file_path, doraise=True)
+    except (OSError, PyCompileError):
+        return None
+    for other_entry in listdir(transform_cache_dir):
+        if other_entry.startswith(f"{path_key}-") and other_entry != entry_name:
+            rmtree(join(transform_cache_dir, other_entry), ignore_errors=True)
+    return new_file_path
+
+
 def get_new_python_file(file_path: str) -> str:
     """
     Get the new python file path.
@@ -201,6 +341,11 @@ def get_new_python_file(file_path: str) -> str:
     with open(file_path, "r", encoding="utf-8") as file:
         source = file.read()
 
+    if transform_cache_dir is not None:
+        new_file_path = __get_cached_python_file(file_path, source)
+        if new_file_path is not None:
+            return new_file_path
+
     new_source = do_global_to_session(source)
     new_dir = create_safe_tempdir()
     new_file_path = join(new_dir, "".join(sample(ascii_letters, 10)) + ".py")
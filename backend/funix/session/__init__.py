@@ -93,3 +93,49 @@ def get_global_variable(name: str) -> Any:
             __funix_default_global_variables.get(name, None)
         )
     return __funix_global_variables[user_id].get(name, None)
+
+
+class SessionNamespace:
+    """
+    The global variables of a user as attributes, for the code of transform mode.
+
+    The attributes are the user's global variables dict itself, so reading and writing one is a plain attribute access,
+    without looking up the session every time. A variable not set yet gets a copy of its default on first read.
+    """
+
+    def __init__(self, variables: dict[VariableName, VariableValue]):
+        """
+        Create a new SessionNamespace instance.
+
+        Parameters:
+            variables (dict[VariableName, VariableValue]): The global variables of the user.
+        """
+        self.__dict__ = variables
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Only called for a variable not set yet.
+        """
+        if name.startswith("__"):
+            # Like `__deepcopy__`, not a global variable
+            raise AttributeError(name)
+        return get_global_variable(name)
+
+
+def get_session_namespace() -> SessionNamespace:
+    """
+    Get the global variables of the current user, once per function call.
+
+    Returns:
+        SessionNamespace: The global variables.
+
+    Raises:
+        RuntimeError: If the user id is not found in session.
+    """
+    global __funix_global_variables
+    user_id = session.get("__funix_id")
+    if not user_id:
+        raise RuntimeError("User ID not found in session.")
+    if user_id not in __funix_global_variables:
+        __funix_global_variables[user_id] = {}
+    return SessionNamespace(__funix_global_variables[user_id])
@@ -0,0 +1,57 @@
+"""
+Benchmark the decoration throughput.
+
+Run it with `python benchmark_decoration.py [functions]` in this directory.
+"""
+
+import typing
+from sys import argv
+from time import perf_counter
+
+import funix.decorator as decorator
+from funix.hint import BytesFile, IntSlider, Markdown
+
+annotations = [
+    "int",
+    "str",
+    "float",
+    "bool",
+    "list[int]",
+    "typing.List[str]",
+    "typing.Literal['a', 'b', 'c']",
+    "typing.Optional[int]",
+    "int | None",
+    "IntSlider",
+    "typing.List[BytesFile]",
+]
+
+
+def make_functions(count: int) -> list[typing.Callable]:
+    """
+    Make functions with 6 parameters each, of the common annotations.
+    """
+    functions = []
+    for i in range(count):
+        params = ", ".join(
+            f"p{j}: {annotations[(i + j) % len(annotations)]}" for j in range(6)
+        )
+        namespace = {
+            "typing": typing,
+            "IntSlider": IntSlider,
+            "BytesFile": BytesFile,
+            "Markdown": Markdown,
+        }
+        exec(f"def function_{i}({params}) -> Markdown:\n    return ''", namespace)
+        functions.append(namespace[f"function_{i}"])
+    return functions
+
+
+if __name__ == "__main__":
+    count = int(argv[1]) if len(argv) > 1 else 1000
+    decorator.enable_wrapper()
+    functions = make_functions(count)
+    start = perf_counter()
+    for function in functions:
+        decorator.funix()(function)
+    elapsed = perf_counter() - start
+    print(f"Decorated {count} functions in {elapsed:.2f}s, {count / elapsed:.0f}/s")
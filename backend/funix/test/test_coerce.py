@@ -0,0 +1,87 @@
+"""
+Test the funix.decorator.coerce module.
+"""
+
+from inspect import signature
+from typing import List, Literal, Optional, TypedDict
+from unittest import TestCase, main
+
+from funix.decorator.coerce import CoercionError, compile_arguments_coercer
+
+
+class Point(TypedDict):
+    x: int
+    y: float
+
+
+def function(
+    a: int,
+    b: List[Point],
+    c: Optional[Literal["u", "v"]],
+    d: dict[int, list[float]],
+    e: int | str,
+    f: tuple[int, str],
+    g: bool = None,
+):
+    pass
+
+
+class TestCoerce(TestCase):
+    def setUp(self):
+        self.coerce = compile_arguments_coercer(
+            dict(signature(function).parameters), []
+        )
+
+    def test_coerce(self):
+        arguments = {
+            "a": "2",
+            "b": [{"x": 1.0, "y": 2, "z": "kept"}],
+            "c": None,
+            "d": {"1": [1, 2.5]},
+            "e": "text",
+            "f": [1, "s"],
+            "g": None,
+        }
+        self.coerce(arguments)
+        self.assertEqual(
+            arguments,
+            {
+                "a": 2,
+                "b": [{"x": 1, "y": 2.0, "z": "kept"}],
+                "c": None,
+                "d": {1: [1.0, 2.5]},
+                "e": "text",
+                "f": (1, "s"),
+                "g": None,
+            },
+        )
+        self.assertIs(type(arguments["b"][0]["y"]), float)
+
+    def test_errors(self):
+        for arguments, message in [
+            ({"a": "x"}, "Argument a: expected integer, got string"),
+            ({"a": None}, "Argument a: expected integer, got null"),
+            ({"b": [{"x": 1, "y": 1}, {"x": 1.5}]}, "Argument b[1]: missing y"),
+            (
+                {"b": [{"x": 1.5, "y": 1}]},
+                "Argument b[0].x: expected integer, got number",
+            ),
+            ({"c": "w"}, "Argument c: expected 'u' or 'v', got 'w'"),
+            ({"d": {"1": [1, "q"]}}, "Argument d.1[1]: expected number, got string"),
+            ({"e": []}, "Argument e: expected integer or string, got array"),
+            ({"f": [1]}, "Argument f: expected 2 items, got 1"),
+            ({"g": 1}, "Argument g: expected boolean or null, got integer"),
+        ]:
+            with self.assertRaises(CoercionError) as context:
+                self.coerce(arguments)
+            self.assertEqual(str(context.exception), message)
+
+    def test_cells(self):
+        coerce = compile_arguments_coercer(dict(signature(function).parameters), ["a"])
+        arguments = {"a": [1, "2"]}
+        coerce(arguments)
+        self.assertEqual(arguments, {"a": [1, 2]})
+
+
+if __name__ == "__main__":
+    main()
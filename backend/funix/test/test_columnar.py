@@ -0,0 +1,158 @@
+"""
+Test the funix.decorator.columnar module.
+"""
+
+from importlib.util import find_spec
+from json import loads
+from struct import unpack_from
+from typing import List
+from unittest import TestCase, main, skipUnless
+
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+import funix.decorator as decorator
+from funix import funix
+from funix.app import app
+from funix.decorator.columnar import (
+    FUNIX_COLUMNAR_MIMETYPE,
+    encode_funix_columnar,
+    get_columnar_item_type,
+    negotiate_columnar_mimetype,
+)
+
+
+def decode(body: bytes) -> tuple[dict, dict]:
+    """
+    Decode the funix columnar format, the numeric columns are (dtype, raw bytes).
+    """
+    header_length = unpack_from("<I", body)[0]
+    start = 4 + header_length
+    header = loads(body[4:start])
+    columns = {}
+    for column in header["columns"]:
+        if column["dtype"] == "json":
+            columns[column["name"]] = column["values"]
+        else:
+            offset = start + column["offset"]
+            columns[column["name"]] = (
+                column["dtype"],
+                offset,
+                body[offset : offset + column["length"]],
+            )
+    return header, columns
+
+
+def columnar_floats() -> list[float]:
+    return [0.5, 1.5, 2.5]
+
+
+def columnar_broken() -> list[int]:
+    return [1, "not an int"]
+
+
+class TestColumnar(TestCase):
+    def test_item_type(self):
+        self.assertIs(get_columnar_item_type(list[float]), float)
+        self.assertIs(get_columnar_item_type(List[int]), int)
+        self.assertIsNone(get_columnar_item_type(list[str]))
+        self.assertIsNone(get_columnar_item_type(dict[str, int]))
+
+    def test_typed_lists(self):
+        for item_type, values, dtype, raw in [
+            (int, [1, -2], "int64", b"\x01" + b"\0" * 7 + b"\xfe" + b"\xff" * 7),
+            (float, [1.0], "float64", b"\0" * 6 + b"\xf0\x3f"),
+            (bool, [True, False, True], "bool", b"\x01\x00\x01"),
+        ]:
+            header, columns = decode(encode_funix_columnar(values, item_type))
+            self.assertEqual(header["rows"], len(values))
+            self.assertEqual(columns["result"][0], dtype)
+            # Little-endian, aligned to 8 bytes in the whole body
+            self.assertEqual(columns["result"][2], raw)
+            self.assertEqual(columns["result"][1] % 8, 0)
+
+    @skipUnless(find_spec("pandas"), "pandas is not installed")
+    def test_dataframe(self):
+        from pandas import DataFrame
+
+        body = encode_funix_columnar(
+            DataFrame(
+                {
+                    "a": [1, 2, 3],
+                    "b": [0.5, None, 1.5],
+                    "c": [True, False, True],
+                    "d": ["x", None, "z"],
+                }
+            ),
+            None,
+        )
+        header, columns = decode(body)
+        self.assertEqual(header["rows"], 3)
+        self.assertEqual(
+            [column["name"] for column in header["columns"]], ["a", "b", "c", "d"]
+        )
+        for name in ["a", "b", "c"]:
+            self.assertEqual(columns[name][1] % 8, 0)
+        self.assertEqual(columns["a"][0], "int64")
+        self.assertEqual(len(columns["a"][2]), 24)
+        self.assertEqual(columns["b"][0], "float64")
+        self.assertEqual(columns["c"], ("bool", columns["c"][1], b"\x01\x00\x01"))
+        # Other columns are JSON values
+        self.assertEqual(columns["d"], ["x", None, "z"])
+
+    def test_negotiate(self):
+        def negotiate(header: str) -> str | None:
+            return negotiate_columnar_mimetype(parse_accept_header(header, MIMEAccept))
+
+        self.assertIsNone(negotiate("*/*"))
+        self.assertIsNone(negotiate("application/*"))
+        self.assertIsNone(negotiate("application/json"))
+        self.assertEqual(
+            negotiate(f"application/json;q=0.5, {FUNIX_COLUMNAR_MIMETYPE}"),
+            FUNIX_COLUMNAR_MIMETYPE,
+        )
+        self.assertEqual(
+            negotiate(
+                f"{FUNIX_COLUMNAR_MIMETYPE};q=0.2, application/vnd.apache.arrow.stream;q=0.9"
+            ),
+            (
+                "application/vnd.apache.arrow.stream"
+                if find_spec("pyarrow")
+                else FUNIX_COLUMNAR_MIMETYPE
+            ),
+        )
+
+
+class TestColumnarCall(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        decorator.enable_wrapper()
+        funix()(columnar_floats)
+        funix()(columnar_broken)
+        cls.client = app.test_client()
+
+    def call(self, name: str, accept: str):
+        return self.client.post(f"/call/{name}", json={}, headers={"Accept": accept})
+
+    def test_binary(self):
+        response = self.call("columnar_floats", FUNIX_COLUMNAR_MIMETYPE)
+        self.assertEqual(response.mimetype, FUNIX_COLUMNAR_MIMETYPE)
+        self.assertIn("Accept", response.headers["Vary"])
+        header, columns = decode(response.data)
+        self.assertEqual(header["rows"], 3)
+        self.assertEqual(columns["result"][0], "float64")
+
+    def test_json(self):
+        response = self.call("columnar_floats", "*/*")
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertEqual(response.json, [[0.5, 1.5, 2.5]])
+
+    def test_fallback(self):
+        # Not a clean typed list, JSON even though the client asks for binary
+        response = self.call("columnar_broken", FUNIX_COLUMNAR_MIMETYPE)
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertEqual(response.json, [[1, "not an int"]])
+
+
+if __name__ == "__main__":
+    main()
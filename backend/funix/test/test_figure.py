@@ -0,0 +1,158 @@
+"""
+Test the funix.decorator.figure module.
+"""
+
+from importlib.util import find_spec
+from unittest import TestCase, main, skipUnless
+
+import funix.decorator.figure as figure_module
+from funix.decorator.figure import (
+    get_lttb_indexes,
+    get_minmax_indexes,
+    reduce_figure,
+    render_figure,
+    set_figure_config,
+)
+
+
+@skipUnless(find_spec("matplotlib"), "matplotlib is not installed")
+class TestReduce(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Imports pyplot and numpy into the module, the renderer thread does it otherwise
+        vars(figure_module)["__import_renderer"]()
+        import numpy
+
+        cls.numpy = numpy
+
+    def tearDown(self):
+        set_figure_config(reduce_to=False, reduce_with="lttb")
+
+    def get_series(self, length: int):
+        x = self.numpy.arange(length, dtype=float)
+        y = self.numpy.sin(x / 30)
+        if length >= 4:
+            # A spike up and one down next to it
+            y[length // 2] = 100
+            y[length // 2 + 1] = -100
+        return x, y
+
+    def assert_indexes(self, indexes, length: int):
+        self.assertEqual(indexes[0], 0)
+        self.assertEqual(indexes[-1], length - 1)
+        self.assertTrue((self.numpy.diff(indexes) > 0).all())
+
+    def test_lttb(self):
+        x, y = self.get_series(1000)
+        indexes = get_lttb_indexes(x, y, 50)
+        self.assertEqual(len(indexes), 50)
+        self.assert_indexes(indexes, 1000)
+        # One point per bucket, the spikes share a bucket
+        self.assertTrue({500, 501} & set(indexes.tolist()))
+
+    def test_minmax(self):
+        x, y = self.get_series(1000)
+        indexes = get_minmax_indexes(y, 50)
+        self.assertLessEqual(len(indexes), 50)
+        self.assert_indexes(indexes, 1000)
+        # Both spikes survive
+        self.assertIn(500, indexes)
+        self.assertIn(501, indexes)
+
+    def test_short(self):
+        for length in [1, 2, 5, 10]:
+            x, y = self.get_series(length)
+            self.assertEqual(get_lttb_indexes(x, y, 10).tolist(), list(range(length)))
+            self.assertEqual(get_minmax_indexes(y, 10).tolist(), list(range(length)))
+        for length in [11, 12, 13]:
+            x, y = self.get_series(length)
+            self.assert_indexes(get_lttb_indexes(x, y, 10), length)
+            self.assert_indexes(get_minmax_indexes(y, 10), length)
+
+    def test_reduce_figure(self):
+        pyplot = vars(figure_module)["pyplot"]
+        x, y = self.get_series(1000)
+        with_nan = y.copy()
+        with_nan[10] = self.numpy.nan
+        for method in ["lttb", "minmax"]:
+            set_figure_config(reduce_to=100, reduce_with=method)
+            figure, axes = pyplot.subplots()
+            long = axes.plot(x, y)[0]
+            short = axes.plot(x[:50], y[:50])[0]
+            nan = axes.plot(x, with_nan)[0]
+            unsorted = axes.plot(x[::-1], y)[0]
+            reduce_figure(figure)
+            self.assertLessEqual(len(long.get_xdata()), 100)
+            self.assertEqual(long.get_xdata()[0], 0)
+            self.assertEqual(long.get_xdata()[-1], 999)
+            self.assertIn(100, long.get_ydata())
+            # Short, NaN and unsorted lines are kept as they are
+            self.assertEqual(len(short.get_xdata()), 50)
+            self.assertEqual(len(nan.get_xdata()), 1000)
+            self.assertEqual(len(unsorted.get_xdata()), 1000)
+            pyplot.close(figure)
+
+    def test_disabled(self):
+        pyplot = vars(figure_module)["pyplot"]
+        x, y = self.get_series(1000)
+        figure, axes = pyplot.subplots()
+        line = axes.plot(x, y)[0]
+        reduce_figure(figure)
+        self.assertEqual(len(line.get_xdata()), 1000)
+        pyplot.close(figure)
+
+
+@skipUnless(find_spec("matplotlib"), "matplotlib is not installed")
+class TestRender(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from matplotlib import pyplot
+
+        cls.pyplot = pyplot
+
+    def tearDown(self):
+        set_figure_config(mode="auto", points=100_000, image_format="png")
+
+    def get_figure(self, y: list[float]):
+        figure, axes = self.pyplot.subplots()
+        axes.plot([0, 1, 2], y)
+        return figure
+
+    @skipUnless(find_spec("mpld3"), "mpld3 is not installed")
+    def test_cache(self):
+        set_figure_config(mode="interactive")
+        first = render_figure(self.get_figure([1, 2, 3]))
+        self.assertIn("axes", first)
+        # Another figure with the same artists
+        self.assertIs(render_figure(self.get_figure([1, 2, 3])), first)
+        changed = self.get_figure([1, 2, 3])
+        changed.axes[0].get_lines()[0].set_ydata([3, 2, 1])
+        self.assertIsNot(render_figure(changed), first)
+
+    def test_closed(self):
+        set_figure_config(mode="static")
+        figure = self.get_figure([1, 2, 3])
+        self.assertTrue(self.pyplot.fignum_exists(figure.number))
+        render_figure(figure)
+        self.assertFalse(self.pyplot.fignum_exists(figure.number))
+
+    def test_static(self):
+        set_figure_config(mode="static")
+        self.assertTrue(
+            render_figure(self.get_figure([1, 2, 3]))["static"].startswith(
+                "data:image/png;base64,"
+            )
+        )
+        set_figure_config(image_format="svg")
+        self.assertTrue(
+            render_figure(self.get_figure([1, 2, 3]))["static"].startswith(
+                "data:image/svg+xml;base64,"
+            )
+        )
+        # Too many points for "auto" mode
+        set_figure_config(mode="auto", image_format="png", points=2)
+        self.assertIn("static", render_figure(self.get_figure([1, 2, 3])))
+
+
+if __name__ == "__main__":
+    main()
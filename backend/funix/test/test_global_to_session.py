@@ -0,0 +1,134 @@
+"""
+Test the funix.prep.global_to_session module.
+"""
+
+from os import listdir
+from os.path import basename, dirname, exists, join
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from flask import session
+
+from funix.app import app
+from funix.prep.global_to_session import (
+    USE_METHOD,
+    do_global_to_session,
+    get_new_python_file,
+    set_transform_cache_config,
+    transform_cache_dir,
+)
+
+source = """
+cache_counter = 0
+
+
+def count():
+    global cache_counter
+    cache_counter += 1
+    return cache_counter
+"""
+
+
+class TestTransformCache(TestCase):
+    def setUp(self):
+        self.folder = TemporaryDirectory()
+        self.cache = join(self.folder.name, "cache")
+        set_transform_cache_config(self.cache)
+        self.path = self.write("app.py", source)
+
+    def tearDown(self):
+        set_transform_cache_config(transform_cache_dir)
+        self.folder.cleanup()
+
+    def write(self, name: str, content: str) -> str:
+        path = join(self.folder.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_hit(self):
+        new_path = get_new_python_file(self.path)
+        self.assertEqual(dirname(dirname(new_path)), self.cache)
+        self.assertEqual(basename(new_path), "app.py")
+        # Not transformed again, the cached file is used as it is
+        with open(new_path, "w", encoding="utf-8") as f:
+            f.write("# cached")
+        self.assertEqual(get_new_python_file(self.path), new_path)
+        with open(new_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "# cached")
+
+    def test_atomic(self):
+        new_path = get_new_python_file(self.path)
+        entry = dirname(new_path)
+        # No temporary file left behind, and the bytecode is next to the file
+        self.assertEqual(sorted(listdir(entry)), ["__pycache__", "app.py"])
+        self.assertTrue(
+            any(name.startswith("app.") for name in listdir(join(entry, "__pycache__")))
+        )
+
+    def test_source_changed(self):
+        other_path = get_new_python_file(self.write("other.py", source))
+        new_path = get_new_python_file(self.path)
+        self.write("app.py", source + "\n# changed\n")
+        changed_path = get_new_python_file(self.path)
+        self.assertNotEqual(changed_path, new_path)
+        # The stale entry of the file is removed, the entries of other files are kept
+        self.assertFalse(exists(dirname(new_path)))
+        self.assertTrue(exists(other_path))
+        self.assertEqual(len(listdir(self.cache)), 2)
+
+    def test_disabled(self):
+        set_transform_cache_config(None)
+        new_path = get_new_python_file(self.path)
+        self.assertFalse(new_path.startswith(self.folder.name))
+        self.assertFalse(exists(self.cache))
+
+
+transform_source = """
+transform_items = []
+
+
+def add(item):
+    \"\"\"Add an item.\"\"\"
+    global transform_items
+    for _ in range(2):
+        transform_items.append(item)
+    return len(transform_items)
+
+
+def pure(value):
+    return value
+"""
+
+
+class TestTransform(TestCase):
+    def test_output(self):
+        namespace = USE_METHOD[4]
+        output = do_global_to_session(transform_source)
+        # The default is set at import, the function gets the namespace once, after its docstring
+        self.assertIn(f"{USE_METHOD[2]}('transform_items', [])", output)
+        self.assertIn(
+            f'"""Add an item."""\n    {namespace} = {USE_METHOD[3]}()\n', output
+        )
+        self.assertIn(f"{namespace}.transform_items.append(item)", output)
+        self.assertIn(f"return len({namespace}.transform_items)", output)
+        self.assertNotIn("global transform_items", output)
+        self.assertIn("def pure(value):\n    return value", output)
+        self.assertEqual(output.count(f"{USE_METHOD[3]}()"), 1)
+        compile(output, "<transformed>", "exec")
+
+    def test_sessions(self):
+        variables = {}
+        exec(do_global_to_session(transform_source), variables)
+        for user_id, expected in [
+            ("transform-first", 2),
+            ("transform-first", 4),
+            ("transform-second", 2),
+        ]:
+            with app.test_request_context():
+                session["__funix_id"] = user_id
+                self.assertEqual(variables["add"](user_id), expected)
+
+
+if __name__ == "__main__":
+    main()
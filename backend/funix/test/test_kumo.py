@@ -0,0 +1,88 @@
+"""
+Test the funix.decorator.kumo module.
+"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from json import loads
+from threading import Thread
+from time import sleep, time
+from unittest import TestCase, main
+
+from funix.decorator.kumo import KumoReporter, max_retry_interval
+
+
+class StandInKumo(BaseHTTPRequestHandler):
+    received: list[dict] = []
+    status: int = 200
+    delay: float = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        sleep(StandInKumo.delay)
+        if StandInKumo.status == 200:
+            StandInKumo.received.append(loads(body))
+        self.send_response(StandInKumo.status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestKumoReporter(TestCase):
+    def setUp(self):
+        StandInKumo.received = []
+        StandInKumo.status = 200
+        StandInKumo.delay = 0
+        self.server = HTTPServer(("127.0.0.1", 0), StandInKumo)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_batch(self):
+        reporter = KumoReporter(self.url, "token", interval=60)
+        for _ in range(5):
+            reporter.record()
+        self.assertTrue(reporter.flush())
+        self.assertEqual(StandInKumo.received, [{"token": "token", "count": 5}])
+        self.assertTrue(reporter.flush())
+        self.assertEqual(len(StandInKumo.received), 1)
+
+    def test_record_does_not_wait(self):
+        StandInKumo.delay = 0.2
+        reporter = KumoReporter(self.url, "token", interval=0.01)
+        reporter.start()
+        start = time()
+        for _ in range(100):
+            reporter.record()
+        self.assertLess(time() - start, 0.1)
+        reporter.stop(2)
+        self.assertEqual(sum(item["count"] for item in StandInKumo.received), 100)
+
+    def test_retry(self):
+        StandInKumo.status = 500
+        reporter = KumoReporter(self.url, "token", interval=60)
+        reporter.record(3)
+        self.assertFalse(reporter.flush())
+        self.assertEqual(reporter.pending, 3)
+        self.assertEqual(reporter.failures, 1)
+        StandInKumo.status = 200
+        reporter.record()
+        self.assertTrue(reporter.flush())
+        self.assertEqual(StandInKumo.received, [{"token": "token", "count": 4}])
+        self.assertEqual(reporter.failures, 0)
+
+    def test_long_outage(self):
+        reporter = KumoReporter(self.url, "token", interval=5)
+        self.assertEqual(reporter.get_delay(), 5)
+        reporter.failures = 2
+        self.assertEqual(reporter.get_delay(), 20)
+        # Days of failures must not overflow the backoff
+        reporter.failures = 100_000
+        self.assertEqual(reporter.get_delay(), max_retry_interval)
+
+
+if __name__ == "__main__":
+    main()
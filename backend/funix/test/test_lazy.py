@@ -0,0 +1,138 @@
+"""
+Test the funix.decorator.lazy module.
+"""
+
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from funix.decorator.lazy import scan_funix_functions
+
+source = """
+from funix import funix
+import funix as funix_module
+
+
+@funix(title="Add", menu="Math", reactive={"b": lambda a: a})
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@funix_module.funix()
+def _private(a: int) -> int:
+    return a
+
+
+@funix
+def stream():
+    yield "x"
+
+
+@funix(print_to_web=True)
+def printer():
+    print("x")
+
+
+def _helper():
+    return 1
+
+
+def undecorated():
+    return 2
+
+
+class Helper:
+    def method(self):
+        return 3
+
+
+if __name__ == "__main__":
+    print(add(1, 2))
+"""
+
+
+class TestScan(TestCase):
+    def setUp(self):
+        self.folder = TemporaryDirectory()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def scan(self, content: str) -> list[dict] | None:
+        path = join(self.folder.name, "app.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return scan_funix_functions(path)
+
+    def test_functions(self):
+        functions = self.scan(source)
+        # Only the decorated functions, underscored ones too, as the import would register them
+        self.assertEqual(
+            [function["name"] for function in functions],
+            ["add", "_private", "stream", "printer"],
+        )
+        self.assertEqual(
+            functions[0],
+            {
+                "name": "add",
+                "title": "Add",
+                "path": None,
+                "menu": "Math",
+                "websocket": False,
+                "reactive": True,
+            },
+        )
+        self.assertEqual(
+            [function["websocket"] for function in functions],
+            [False, False, True, True],
+        )
+
+    def test_nothing(self):
+        self.assertIsNone(self.scan("def function():\n    return 1\n"))
+        self.assertIsNone(self.scan("from funix import funix\n"))
+
+    def test_classes(self):
+        # A decorated method or a funix class is found by importing only
+        self.assertIsNone(
+            self.scan(
+                source + "\n\nclass Tool:\n    @funix\n    def method(self):\n"
+                "        return 1\n"
+            )
+        )
+        self.assertIsNone(
+            self.scan(
+                "from funix import funix_class\n\n\n@funix_class()\nclass Tool:\n"
+                "    pass\n"
+            )
+        )
+
+    def test_main(self):
+        # Calls in the main block are fine (see `source`), decoration there is not
+        self.assertIsNone(self.scan(source + "    funix()(undecorated)\n"))
+        self.assertIsNone(
+            self.scan(
+                "from funix import funix\n\nif __name__ == '__main__':\n"
+                "    @funix()\n    def hidden():\n        return 1\n"
+            )
+        )
+
+    def test_startup(self):
+        for content in [
+            # Global settings, secrets and defaults need the file imported at startup
+            source + "\nfunix_module.set_default_theme('dark')\n",
+            source + "\n@funix(secret=True)\ndef secret():\n    return 1\n",
+            source + "\n@funix(title=str(1))\ndef dynamic():\n    return 1\n",
+            source + "\n@funix(**{})\ndef unpacked():\n    return 1\n",
+            source + "\n@funix()\n@staticmethod\ndef stacked():\n    return 1\n",
+            source + "\nalias = funix\n",
+        ]:
+            self.assertIsNone(self.scan(content))
+
+    def test_syntax_error(self):
+        self.assertIsNone(self.scan(source + "\ndef broken(:\n"))
+        self.assertIsNone(self.scan("\0"))
+        self.assertIsNone(scan_funix_functions(join(self.folder.name, "missing.py")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Test the funix.decorator.media module.
+"""
+
+from importlib.util import find_spec
+from io import BytesIO
+from unittest import TestCase, main, skipUnless
+from wave import open as open_wave
+
+from funix.decorator.media import encode_audio_array, encode_media, encode_png
+
+
+@skipUnless(find_spec("numpy"), "NumPy is not installed")
+class TestMedia(TestCase):
+    def setUp(self):
+        import numpy
+
+        self.numpy = numpy
+
+    def test_wav(self):
+        samples = self.numpy.array([[0.0, 0.5], [-0.5, 1.0], [1.0, -1.0]])
+        data, mimetype = encode_audio_array(samples, 8000)
+        self.assertEqual(mimetype, "audio/wav")
+        with open_wave(BytesIO(data), "rb") as wave_file:
+            self.assertEqual(wave_file.getnchannels(), 2)
+            self.assertEqual(wave_file.getsampwidth(), 2)
+            self.assertEqual(wave_file.getframerate(), 8000)
+            frames = wave_file.readframes(wave_file.getnframes())
+        decoded = self.numpy.frombuffer(frames, dtype="<i2").reshape(-1, 2)
+        self.assertTrue((decoded == (samples * 32767).astype("<i2")).all())
+
+    @skipUnless(find_spec("PIL"), "Pillow is not installed")
+    def test_png(self):
+        from PIL import Image
+
+        for shape in [(3, 4), (3, 4, 3), (3, 4, 4)]:
+            array = self.numpy.arange(self.numpy.prod(shape), dtype="uint8").reshape(
+                shape
+            )
+            image = Image.open(BytesIO(encode_png(array)))
+            self.assertEqual(image.size, (4, 3))
+            self.assertTrue((self.numpy.asarray(image) == array).all())
+
+    def test_declared_type(self):
+        stereo = self.numpy.zeros((1000, 2))
+        self.assertEqual(encode_media(stereo, "Audios")[1], "audio/wav")
+        self.assertTrue(encode_media(stereo, "Images")[1].startswith("image/"))
+        # Without a declared type the shape decides
+        self.assertEqual(encode_media(self.numpy.zeros(1000))[1], "audio/wav")
+
+
+if __name__ == "__main__":
+    main()
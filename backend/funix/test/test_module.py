@@ -0,0 +1,61 @@
+"""
+Test the funix.util.module module.
+"""
+
+from os.path import join
+from sys import modules
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from funix.util.module import get_imported_modules, preload_modules
+
+source = """
+import os.path
+import wsgiref.simple_server as server
+from email.mime import text
+from . import sibling
+from local_helper import helper
+
+try:
+    import not_installed_module
+except ImportError:
+    pass
+
+
+def function():
+    import json
+"""
+
+
+class TestPreload(TestCase):
+    def setUp(self):
+        self.folder = TemporaryDirectory()
+        self.path = join(self.folder.name, "app.py")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(source)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_imported_modules(self):
+        self.assertEqual(
+            get_imported_modules(self.path),
+            {
+                "os.path",
+                "wsgiref.simple_server",
+                "email.mime",
+                "local_helper",
+                "not_installed_module",
+            },
+        )
+
+    def test_preload(self):
+        preload_modules([self.path], {"local_helper"})
+        # The submodules themselves, not only the top-level packages
+        self.assertIn("wsgiref.simple_server", modules)
+        self.assertIn("email.mime", modules)
+        self.assertNotIn("local_helper", modules)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Test the funix.decorator.reactive module.
+"""
+
+from contextlib import redirect_stdout
+from io import StringIO
+from threading import Thread
+from time import sleep
+from unittest import TestCase, main
+
+from flask import Flask
+
+from funix.decorator.reactive import ReactiveUpdater, set_reactive_config
+
+
+class TestReactiveUpdater(TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.calls = []
+        self.output = StringIO()
+
+        def double(x: int) -> int:
+            self.calls.append(x)
+            sleep(0.1)
+            return x * 2
+
+        def fail(x: int) -> int:
+            raise ValueError(x)
+
+        self.updater = ReactiveUpdater(
+            "id",
+            {
+                "doubled": (double, {"x": "value"}),
+                "failed": (fail, {"x": "value"}),
+                "form": (lambda **form: len(form), {}),
+            },
+        )
+
+    def tearDown(self):
+        set_reactive_config(debounce=0, cache_size=0)
+
+    def update(self, session_id: str, form: dict) -> dict | None:
+        with self.app.test_request_context(), redirect_stdout(self.output):
+            return self.updater.update(session_id, form)
+
+    def test_update(self):
+        self.assertEqual(
+            self.update("a", {"value": 2, "other": 0}), {"doubled": 4, "form": 2}
+        )
+        # The failed param is left out, with its traceback printed
+        self.assertIn("ValueError: 2", self.output.getvalue())
+        # A missing field skips the params mapped to it
+        self.assertEqual(self.update("a", {"other": 0}), {"form": 1})
+
+    def test_changed(self):
+        updater = ReactiveUpdater(
+            "id",
+            {
+                "b": (lambda a: a + 1, {"a": "a"}),
+                "c": (lambda b: b * 2, {"b": "b"}),
+                "d": (lambda x: self.calls.append(x) or x, {"x": "x"}),
+            },
+        )
+        with self.app.test_request_context():
+            # `c` takes the new `b`
+            self.assertEqual(
+                updater.update("a", {"a": 1, "b": 0, "c": 0, "x": 5}, ["a"]),
+                {"b": 2, "c": 4},
+            )
+            # `b` does not change, so `c` is not evaluated again
+            self.assertEqual(
+                updater.update("a", {"a": 1, "b": 2, "c": 0, "x": 5}, ["a"]),
+                {"b": 2},
+            )
+            self.assertEqual(updater.update("a", {"a": 1, "x": 5}, []), None)
+        self.assertEqual(self.calls, [])
+
+    def test_changed_superseded(self):
+        def slow(a: int) -> int:
+            sleep(0.3)
+            return a + 1
+
+        updater = ReactiveUpdater(
+            "id",
+            {
+                "pa": (slow, {"a": "a"}),
+                "pb": (lambda b: b * 2, {"b": "b"}),
+            },
+        )
+        results = {}
+
+        def update(name: str, changed: list[str]):
+            with self.app.test_request_context():
+                results[name] = updater.update("a", {"a": 1, "b": 3}, changed)
+
+        first = Thread(target=update, args=("A", ["a"]))
+        first.start()
+        sleep(0.05)
+        update("B", ["b"])
+        first.join()
+        # `pa` is evaluated again for B, A gives no result
+        self.assertEqual(results, {"A": None, "B": {"pa": 2, "pb": 6}})
+
+    def test_cache(self):
+        set_reactive_config(cache_size=2)
+        self.update("a", {"value": 2})
+        self.update("b", {"value": 2})
+        self.update("a", {"value": 3})
+        self.update("a", {"value": 2})
+        self.assertEqual(self.calls, [2, 3, 2])
+
+    def test_superseded(self):
+        set_reactive_config(debounce=0.05)
+        results = {}
+
+        def update(value: int):
+            results[value] = self.update("a", {"value": value})
+
+        threads = [Thread(target=update, args=(value,)) for value in range(3)]
+        for thread in threads:
+            thread.start()
+            sleep(0.01)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results[0], None)
+        self.assertEqual(results[1], None)
+        self.assertEqual(results[2], {"doubled": 4, "form": 1})
+        self.assertEqual(self.calls, [2])
+        # Another session is not superseded
+        self.assertEqual(self.update("b", {"value": 1}), {"doubled": 2, "form": 1})
+
+
+if __name__ == "__main__":
+    main()
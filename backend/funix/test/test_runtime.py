@@ -0,0 +1,73 @@
+"""
+Test the funix.decorator.runtime module.
+"""
+
+from time import sleep
+from unittest import TestCase, main
+
+from funix.decorator.runtime import InstancePool
+from funix.hint import WrapperException
+
+
+class Model:
+    made = 0
+
+    def __init__(self, name: str):
+        Model.made += 1
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestInstancePool(TestCase):
+    def setUp(self):
+        Model.made = 0
+
+    def put(self, pool: InstancePool, session_id: str, name: str) -> Model:
+        pool.put(session_id, {"name": name}, lambda: Model(name))
+        return pool.get(session_id)
+
+    def test_per_session(self):
+        pool = InstancePool("Model", close="close")
+        first = self.put(pool, "a", "x")
+        self.assertIsNot(self.put(pool, "b", "x"), first)
+        second = self.put(pool, "a", "y")
+        self.assertTrue(first.closed)
+        self.assertIs(pool.get("a"), second)
+        with self.assertRaises(WrapperException):
+            pool.get("c")
+
+    def test_max_instances(self):
+        closed = []
+        pool = InstancePool("Model", max_instances=2, close=closed.append)
+        first = self.put(pool, "a", "x")
+        self.put(pool, "b", "x")
+        pool.get("a")
+        self.put(pool, "c", "x")
+        self.assertEqual(len(pool), 2)
+        self.assertEqual([instance.name for instance in closed], ["x"])
+        self.assertIs(pool.get("a"), first)
+        with self.assertRaises(WrapperException):
+            pool.get("b")
+
+    def test_idle_timeout(self):
+        pool = InstancePool("Model", idle_timeout=0.05, close="close")
+        first = self.put(pool, "a", "x")
+        sleep(0.1)
+        with self.assertRaises(WrapperException):
+            pool.get("a")
+        self.assertTrue(first.closed)
+
+    def test_shared(self):
+        pool = InstancePool("Model", shared=True)
+        first = self.put(pool, "a", "x")
+        self.assertIs(self.put(pool, "b", "x"), first)
+        self.assertIsNot(self.put(pool, "c", "y"), first)
+        self.assertEqual(Model.made, 2)
+        self.assertEqual(len(pool), 2)
+
+
+if __name__ == "__main__":
+    main()
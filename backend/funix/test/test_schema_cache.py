@@ -0,0 +1,53 @@
+"""
+Test the funix.decorator.schema_cache module.
+"""
+
+from inspect import signature
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from funix.decorator.schema_cache import get_schema_cache_key, set_schema_cache_config
+from funix.util.module import import_module_from_file
+
+source = """
+from typing import TypedDict
+
+
+class Point(TypedDict):
+    x: int
+
+
+def function(point: Point, times: int = 1) -> str:
+    return str(point) * times
+"""
+
+
+class TestSchemaCacheKey(TestCase):
+    def setUp(self):
+        self.folder = TemporaryDirectory()
+        set_schema_cache_config(join(self.folder.name, "cache"))
+
+    def tearDown(self):
+        set_schema_cache_config(None)
+        self.folder.cleanup()
+
+    def get_key(self, path: str) -> str | None:
+        # File mode, the module gets a random name every time
+        function = import_module_from_file(path, False).function
+        return get_schema_cache_key(function, signature(function), {"title": None})
+
+    def test_file_mode(self):
+        path = join(self.folder.name, "app.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(source)
+        key = self.get_key(path)
+        self.assertIsNotNone(key)
+        self.assertEqual(self.get_key(path), key)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n# changed\n")
+        self.assertNotEqual(self.get_key(path), key)
+
+
+if __name__ == "__main__":
+    main()
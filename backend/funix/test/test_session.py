@@ -0,0 +1,60 @@
+"""
+Test the funix.session module.
+"""
+
+from copy import deepcopy
+from unittest import TestCase, main
+
+from flask import session
+
+from funix.app import app
+from funix.session import (
+    get_global_variable,
+    get_session_namespace,
+    set_default_global_variable,
+)
+
+
+class TestSessionNamespace(TestCase):
+    def setUp(self):
+        self.context = app.test_request_context()
+        self.context.push()
+
+    def tearDown(self):
+        self.context.pop()
+
+    def get_namespace(self, user_id: str):
+        session["__funix_id"] = user_id
+        return get_session_namespace()
+
+    def test_read_write(self):
+        first = self.get_namespace("namespace-first")
+        first.namespace_value = 1
+        self.assertEqual(get_global_variable("namespace_value"), 1)
+        second = self.get_namespace("namespace-second")
+        self.assertIsNone(second.namespace_value)
+        second.namespace_value = 2
+        self.assertEqual(first.namespace_value, 1)
+        self.assertEqual(self.get_namespace("namespace-first").namespace_value, 1)
+
+    def test_default_copied(self):
+        default = {"items": [1]}
+        set_default_global_variable("namespace_default", default)
+        first = self.get_namespace("namespace-first")
+        first.namespace_default["items"].append(2)
+        self.assertEqual(default, {"items": [1]})
+        second = self.get_namespace("namespace-second")
+        self.assertEqual(second.namespace_default, {"items": [1]})
+        self.assertIsNot(second.namespace_default, default)
+
+    def test_dunder(self):
+        namespace = self.get_namespace("namespace-first")
+        for name in ["__deepcopy__", "__missing", "__getstate__x"]:
+            with self.assertRaises(AttributeError):
+                getattr(namespace, name)
+        namespace.namespace_copied = [1]
+        self.assertEqual(deepcopy(namespace).namespace_copied, [1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Test the funix.decorator.table module.
+"""
+
+from unittest import TestCase, main
+
+from funix.decorator.table import get_table_columns, get_table_page
+
+
+class TestGetTablePage(TestCase):
+    rows = [
+        {"name": "alpha", "score": 3},
+        {"name": "beta", "score": 1},
+        {"name": "gamma", "score": 2, "extra": True},
+        {"name": "delta", "score": None},
+    ]
+
+    def test_columns(self):
+        self.assertEqual(get_table_columns(self.rows), ["name", "score", "extra"])
+
+    def test_slice(self):
+        page = get_table_page(self.rows, 1, 2)
+        self.assertEqual(page["total"], 4)
+        self.assertEqual(page["rows"], self.rows[1:3])
+
+    def test_sort(self):
+        page = get_table_page(self.rows, 0, 10, sort="score")
+        self.assertEqual(
+            [row["name"] for row in page["rows"]], ["beta", "gamma", "alpha", "delta"]
+        )
+        page = get_table_page(self.rows, 0, 10, sort="score", order="desc")
+        self.assertEqual(
+            [row["name"] for row in page["rows"]], ["alpha", "gamma", "beta", "delta"]
+        )
+        page = get_table_page(self.rows, 0, 1, sort="name", order="desc")
+        self.assertEqual(page["rows"], [{"name": "gamma", "score": 2, "extra": True}])
+
+    def test_filter(self):
+        page = get_table_page(self.rows, 0, 10, filter_column="name", filter_value="A")
+        self.assertEqual(page["total"], 4)
+        page = get_table_page(self.rows, 0, 10, filter_column="name", filter_value="ta")
+        self.assertEqual([row["name"] for row in page["rows"]], ["beta", "delta"])
+
+    def test_unknown_column(self):
+        with self.assertRaises(KeyError):
+            get_table_page(self.rows, 0, 10, sort="missing")
+
+
+if __name__ == "__main__":
+    main(verbosity=2)
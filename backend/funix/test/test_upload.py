@@ -0,0 +1,159 @@
+"""
+Test the funix.decorator.upload module.
+"""
+
+from io import BytesIO
+from mmap import mmap
+from os.path import exists
+from unittest import TestCase, main
+
+import funix.decorator as decorator
+from funix.app import app
+from funix.decorator.upload import (
+    check_upload_sizes,
+    get_upload,
+    load_upload,
+    load_uploads,
+    release_buffers,
+    save_upload,
+    set_upload_config,
+)
+from funix.hint import WrapperException
+
+
+class TestUpload(TestCase):
+    def setUp(self):
+        set_upload_config(threshold=8, ttl=3600, file_size=False, total_size=False)
+
+    def tearDown(self):
+        set_upload_config(
+            threshold=4 * 1024 * 1024, ttl=3600, file_size=False, total_size=False
+        )
+
+    def test_spool(self):
+        small = save_upload(BytesIO(b"small"), "small.txt")
+        big = save_upload(BytesIO(b"0123456789" * 10), "big.bin")
+        self.assertIsNotNone(get_upload(small).content)
+        self.assertIsNone(get_upload(small).path)
+        self.assertIsNone(get_upload(big).content)
+        self.assertTrue(exists(get_upload(big).path))
+        self.assertEqual(get_upload(big).size, 100)
+        self.assertEqual(load_upload(small), b"small")
+        self.assertEqual(load_upload(big), b"0123456789" * 10)
+
+    def test_modes(self):
+        small = save_upload(BytesIO(b"small"))
+        big = save_upload(BytesIO(b"0123456789" * 10))
+        # An in-memory upload is moved to disk for a path
+        path = load_upload(small, "path")
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"small")
+        self.assertEqual(load_upload(small), b"small")
+
+        buffers = []
+        view = load_upload(big, "mmap", buffers)
+        mapped = view.obj
+        self.assertIsInstance(mapped, mmap)
+        self.assertEqual(bytes(view[:10]), b"0123456789")
+        release_buffers(buffers)
+        self.assertEqual(buffers, [])
+        self.assertTrue(mapped.closed)
+        with self.assertRaises(ValueError):
+            bytes(view)
+
+    def test_data_url(self):
+        self.assertEqual(load_upload("data:text/plain;base64,aGVsbG8="), b"hello")
+        self.assertEqual(load_upload("data:,a%20b"), b"a b")
+        with self.assertRaises(WrapperException):
+            load_upload("data:text/plain;base64")
+
+    def test_other_urls(self):
+        for value in ["file:///etc/passwd", "http://127.0.0.1/", "/etc/passwd"]:
+            with self.assertRaises(WrapperException):
+                load_upload(value)
+
+    def test_load_uploads(self):
+        references = [save_upload(BytesIO(bytes([index]) * 20)) for index in range(4)]
+        buffers = []
+        views = load_uploads(references, "mmap", buffers)
+        self.assertEqual(
+            [bytes(view[:1]) for view in views], [b"\0", b"\1", b"\2", b"\3"]
+        )
+        self.assertEqual(len(buffers), 4)
+        release_buffers(buffers)
+
+        # All the buffers are in the list even if one file fails
+        buffers = []
+        with self.assertRaises(WrapperException):
+            load_uploads(
+                references[:2] + ["file:///etc/passwd"] + references[2:],
+                "mmap",
+                buffers,
+            )
+        self.assertEqual(len(buffers), 4)
+        release_buffers(buffers)
+
+    def test_sizes(self):
+        set_upload_config(file_size=10, total_size=15)
+        small = save_upload(BytesIO(b"12345678"))
+        check_upload_sizes([small, "data:,12345"])
+        with self.assertRaises(WrapperException):
+            check_upload_sizes([small, small])
+        with self.assertRaises(WrapperException):
+            check_upload_sizes(["data:," + "1" * 11])
+        with self.assertRaises(WrapperException):
+            save_upload(BytesIO(b"1" * 11))
+
+    def test_expiry(self):
+        set_upload_config(ttl=60)
+        big = save_upload(BytesIO(b"0123456789" * 10))
+        item = get_upload(big)
+        path = item.path
+        # Not used for longer than the TTL
+        item.used -= 61
+        with self.assertRaises(WrapperException):
+            get_upload(big)
+        self.assertFalse(exists(path))
+
+
+class TestUploadService(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        decorator.enable_wrapper()
+        cls.client = app.test_client()
+
+    def test_round_trip(self):
+        response = self.client.post(
+            "/upload",
+            data={
+                "file": [
+                    (BytesIO(b"\x89PNG\r\n\x1a\nrest"), "a.png"),
+                    (BytesIO(b"text"), "b.txt", "text/plain"),
+                ]
+            },
+        )
+        references = response.json["files"]
+        self.assertEqual(len(references), 2)
+        response = self.client.get(references[0])
+        self.assertEqual(response.data, b"\x89PNG\r\n\x1a\nrest")
+        self.assertEqual(response.mimetype, "image/png")
+        response = self.client.get(references[1])
+        self.assertEqual(response.data, b"text")
+        self.assertEqual(response.mimetype, "text/plain")
+        self.assertEqual(self.client.get("/upload/missing").status_code, 404)
+        self.assertEqual(self.client.post("/upload").status_code, 400)
+
+    def test_too_big(self):
+        set_upload_config(file_size=4)
+        try:
+            response = self.client.post(
+                "/upload", data={"file": (BytesIO(b"too big"), "a.txt")}
+            )
+        finally:
+            set_upload_config(file_size=False)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json["error_type"], "wrapper")
+
+
+if __name__ == "__main__":
+    main()
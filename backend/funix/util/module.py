@@ -2,12 +2,21 @@
 Handle module
 """
 
-from importlib.util import module_from_spec, spec_from_file_location
+from ast import Import, ImportFrom, Try, parse
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from importlib.util import find_spec, module_from_spec, spec_from_file_location
 from os.path import basename
 from string import ascii_letters, digits
 from types import ModuleType
+from sys import modules
 from uuid import uuid4
 
+preload_workers: int = 8
+"""
+How many threads import the shared dependencies before the files of dir mode and package mode are loaded.
+"""
+
 
 def import_module_from_file(path: str, need_name: bool) -> ModuleType:
     """
@@ -51,3 +60,78 @@ def funix_menu_to_safe_function_name(name: str) -> str:
             name,
         )
     )
+
+
+def get_imported_modules(path: str) -> set[str]:
+    """
+    Find the modules a Python file imports at module level, without running it.
+
+    Parameters:
+        path (str): The path to the file.
+
+    Returns:
+        set[str]: The full module names (like "matplotlib.pyplot"), relative imports are skipped.
+    """
+    try:
+        with open(path, "rb") as f:
+            tree = parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    names = set()
+    statements = list(tree.body)
+    while statements:
+        statement = statements.pop()
+        if isinstance(statement, Import):
+            names.update(alias.name for alias in statement.names)
+        elif isinstance(statement, ImportFrom):
+            if statement.level == 0 and statement.module:
+                names.add(statement.module)
+        elif isinstance(statement, Try):
+            # Optional imports, like `try: import x except ImportError: ...`
+            statements.extend(statement.body)
+    return names
+
+
+def __preload_module(name: str) -> None:
+    try:
+        import_module(name)
+    except Exception:
+        # It will be imported (and fail loudly) again by the file itself
+        pass
+
+
+def preload_modules(paths: list[str], local_names: set[str]) -> None:
+    """
+    Import the modules the files share, concurrently, before the files themselves are loaded one by one.
+    Heavy third-party imports are paid once and in parallel, the files still run and register their functions in
+    order.
+
+    Parameters:
+        paths (list[str]): The paths to the files.
+        local_names (set[str]): The names of the local modules, they are not preloaded.
+    """
+    names = set()
+    for path in paths:
+        names.update(get_imported_modules(path))
+    candidates = []
+    for name in sorted(names):
+        top_name = name.split(".")[0]
+        if top_name in local_names or name in modules or top_name == "__future__":
+            continue
+        if any(other.startswith(name + ".") for other in names):
+            # Importing the submodule imports this one too
+            continue
+        try:
+            # Only the top-level package, finding a submodule would import its parents here
+            if find_spec(top_name) is None:
+                continue
+        except (ImportError, ValueError):
+            continue
+        candidates.append(name)
+    if not candidates:
+        return
+    with ThreadPoolExecutor(
+        max_workers=min(preload_workers, len(candidates)),
+        thread_name_prefix="funix-preload",
+    ) as executor:
+        list(executor.map(__preload_module, candidates))
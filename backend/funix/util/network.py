@@ -3,7 +3,18 @@ Network utils for funix.
 """
 
 from ipaddress import IPv4Address, IPv6Address, ip_network
-from socket import AF_INET, SOCK_STREAM, socket
+from os import name as os_name
+from socket import (
+    AF_INET,
+    AF_INET6,
+    SO_REUSEADDR,
+    SOCK_STREAM,
+    SOL_SOCKET,
+    create_connection,
+    socket,
+)
+from threading import Event
+from time import monotonic, sleep
 
 
 def get_compressed_ip_address_as_str(host: IPv4Address | IPv6Address) -> str:
@@ -36,12 +47,42 @@ def is_port_used(port: int, host: str) -> bool:
         bool: If the port is used.
     """
     try:
-        socket(AF_INET, SOCK_STREAM).connect((host, port))
-        return True
+        with create_connection((host.strip("[]"), port), timeout=1):
+            return True
     except:
         return False
 
 
+def wait_for_port(
+    port: int,
+    host: str,
+    ready: Event | None = None,
+    timeout: float | None = None,
+) -> bool:
+    """
+    Wait until the server accepts connections on the port, with backoff polling.
+
+    Parameters:
+        port (int): The port to wait for.
+        host (str): The host to wait for.
+        ready (Event | None): Wait for this event before polling, like `funix.app.ready`.
+        timeout (float | None): Give up after this many seconds, `None` waits forever.
+
+    Returns:
+        bool: If the server is online before the timeout.
+    """
+    deadline = None if timeout is None else monotonic() + timeout
+    if ready is not None and not ready.wait(timeout):
+        return False
+    delay = 0.01
+    while not is_port_used(port, host):
+        if deadline is not None and monotonic() + delay > deadline:
+            return False
+        sleep(delay)
+        delay = min(delay * 2, 0.5)
+    return True
+
+
 def is_ip_on_localhost(ip: IPv4Address | IPv6Address) -> bool:
     """
     Check if the ip is on this host(localhost).
@@ -59,81 +100,123 @@ def is_ip_on_localhost(ip: IPv4Address | IPv6Address) -> bool:
         return ip in ip_network("::/128")
 
 
+max_port_scan: int = 100
+"""
+How many ports are probed in each direction before letting the OS choose one.
+"""
+
+
+def is_port_free(port: int, host: str) -> bool:
+    """
+    Check if the port can be bound on the host. Binding is local and instant, unlike connecting.
+    On POSIX the probe sets `SO_REUSEADDR` like the server does, so a port in TIME_WAIT after a restart is free.
+    On Windows the flag allows binding a port in use, so it is not set there.
+
+    Parameters:
+        port (int): The port to check.
+        host (str): The address to bind, like "0.0.0.0" or "::".
+
+    Returns:
+        bool: If the port is free.
+    """
+    family = AF_INET6 if ":" in host else AF_INET
+    try:
+        with socket(family, SOCK_STREAM) as probe:
+            if os_name != "nt":
+                probe.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+            probe.bind((host.strip("[]"), port))
+            return True
+    except OSError:
+        return False
+
+
+def get_os_chosen_port(host: str) -> int:
+    """
+    Let the OS choose a free port on the host.
+
+    Parameters:
+        host (str): The address to bind, like "0.0.0.0" or "::".
+
+    Returns:
+        int: The port.
+    """
+    family = AF_INET6 if ":" in host else AF_INET
+    with socket(family, SOCK_STREAM) as probe:
+        probe.bind((host.strip("[]"), 0))
+        return probe.getsockname()[1]
+
+
 def get_next_unused_port(port: int, host: str) -> int | None:
     """
     Get the next unused port from the host, starting from the port. If the port is used, it will try to find the next
-    port. If the port is not used, it will return the port. If the port is out of range, it will return None.
+    port. If the port is not used, it will return the port. At most `max_port_scan` ports are probed, it will return
+    None if they are all used or out of range.
 
     Parameters:
         port (int): The port to start from.
-        host (str): The host to check.
+        host (str): The address to bind.
 
     Returns:
         int | None: Port or failure.
             int: The next unused port.
-            None: If the port is out of range.
+            None: If no port is found.
     """
-    now_port = port
-    while is_port_used(now_port, host):
-        if now_port > 65535:
-            return None
-        now_port += 1
-    return now_port
+    for now_port in range(max(port, 1), min(port + max_port_scan, 65536)):
+        if is_port_free(now_port, host):
+            return now_port
+    return None
 
 
 def get_previous_unused_port(port: int, host: str) -> int | None:
     """
     Get the previous unused port from the host, starting from the port. If the port is used, it will try to find the
-    previous port. If the port is not used, it will return the port. If the port is out of range, it will return None.
+    previous port. If the port is not used, it will return the port. At most `max_port_scan` ports are probed, it will
+    return None if they are all used or out of range.
 
     Parameters:
         port (int): The port to start from.
-        host (str): The host to check.
+        host (str): The address to bind.
 
     Returns:
         int | None: Port or failure.
             int: The previous unused port.
-            None: If the port is out of range.
+            None: If no port is found.
     """
-    now_port = port
-    while is_port_used(now_port, host):
-        if now_port < 0:
-            return None
-        now_port -= 1
-    return now_port
+    for now_port in range(min(port, 65535), max(port - max_port_scan, 0), -1):
+        if is_port_free(now_port, host):
+            return now_port
+    return None
 
 
 def get_unused_port_from(port: int, host: IPv4Address | IPv6Address) -> int:
     """
     Get an unused port from the host, starting from the port. If the port is used, it will try to find the next or
-    previous port. If the port is not used, it will return the port. If the port is out of range, it will raise an
-    exception to tell you that there is no available port.
+    previous port. If none of the nearby ports is free, the OS chooses one.
 
     Parameters:
         port (int): The port to start from.
-        host (IPv4Address | IPv6Address): The host to check.
+        host (IPv4Address | IPv6Address): The host to bind.
 
     Returns:
         int: The unused port.
 
     Raises:
-        RuntimeError: If there is no available port. (Means the port is out of range.)
+        RuntimeError: If there is no available port.
 
     Notes:
         Ah, Funix will definitely call this function when it starts up. For Funix, there is no need to catch this
         exception, just let Funix crash when all ports are used.
     """
-    new_port = port
-    new_host = get_compressed_ip_address_as_str(host)
-    if is_port_used(new_port, new_host):
-        print(f"port {port} is used, try to find next or previous port.")
-        next_port = get_next_unused_port(new_port, new_host)
-        if next_port is None:
-            previous_port = get_previous_unused_port(new_port, new_host)
-            if previous_port is None:
-                raise RuntimeError(f"No available port for {new_host}, base: {port}")
-            else:
-                return previous_port
-        else:
-            return next_port
+    bind_host = host.compressed
+    if is_port_free(port, bind_host):
+        return port
+    print(f"port {port} is used, try to find next or previous port.")
+    new_port = get_next_unused_port(port, bind_host)
+    if new_port is None:
+        new_port = get_previous_unused_port(port, bind_host)
+    if new_port is None:
+        try:
+            new_port = get_os_chosen_port(bind_host)
+        except OSError:
+            raise RuntimeError(f"No available port for {bind_host}, base: {port}")
     return new_port
@@ -0,0 +1,84 @@
+"""
+Watch files for changes
+"""
+
+from os.path import getmtime
+from threading import Event, Thread
+from typing import Callable
+
+
+class FileWatcher(Thread):
+    """
+    Poll the modification times of files, and report the changed ones.
+
+    Base Class:
+        threading.Thread: The thread.
+
+    Attributes:
+        list_files (Callable[[], list[str]]): Lists the files to watch, called on every poll, so new files are found.
+        callback (Callable[[list[str], list[str]], None]): Gets the changed (or new) files and the removed files.
+        interval (float): The poll interval in seconds.
+    """
+
+    def __init__(
+        self,
+        list_files: Callable[[], list[str]],
+        callback: Callable[[list[str], list[str]], None],
+        interval: float = 1.0,
+    ):
+        """
+        Create a new FileWatcher instance, the files are recorded as they are now.
+
+        Parameters:
+            list_files (Callable[[], list[str]]): Lists the files to watch.
+            callback (Callable[[list[str], list[str]], None]): Gets the changed and removed files.
+            interval (float): The poll interval in seconds.
+        """
+        super(FileWatcher, self).__init__(name="funix-watcher", daemon=True)
+        self.list_files = list_files
+        self.callback = callback
+        self.interval = interval
+        self.__stopped = Event()
+        self.__mtimes = self.__scan()
+
+    def __scan(self) -> dict[str, float]:
+        """
+        Get the modification times of the files.
+        """
+        mtimes = {}
+        for file in self.list_files():
+            try:
+                mtimes[file] = getmtime(file)
+            except OSError:
+                pass
+        return mtimes
+
+    def poll(self) -> tuple[list[str], list[str]]:
+        """
+        Check the files once.
+
+        Returns:
+            tuple[list[str], list[str]]: The changed (or new) files and the removed files.
+        """
+        mtimes = self.__scan()
+        changed = [
+            file for file, mtime in mtimes.items() if self.__mtimes.get(file) != mtime
+        ]
+        removed = [file for file in self.__mtimes if file not in mtimes]
+        self.__mtimes = mtimes
+        return changed, removed
+
+    def run(self) -> None:
+        """
+        Poll until stopped, the callback runs in this thread.
+        """
+        while not self.__stopped.wait(self.interval):
+            changed, removed = self.poll()
+            if changed or removed:
+                self.callback(changed, removed)
+
+    def stop(self) -> None:
+        """
+        Stop watching.
+        """
+        self.__stopped.set()
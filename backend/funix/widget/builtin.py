@@ -281,6 +281,106 @@ class BytesFile(bytes):
     pass
 
 
+@new_built_in_type("image")
+class BufferImage(bytes):
+    """
+    The built-in bytes type's image, the function gets a read-only memoryview of the uploaded file.
+    Big uploads are memory-mapped, the view is released after the function returns.
+    For input.
+
+    Base Class: bytes
+    """
+
+    __funix_upload__ = "mmap"
+
+
+@new_built_in_type("video")
+class BufferVideo(bytes):
+    """
+    The built-in bytes type's video, the function gets a read-only memoryview of the uploaded file.
+    Big uploads are memory-mapped, the view is released after the function returns.
+    For input.
+
+    Base Class: bytes
+    """
+
+    __funix_upload__ = "mmap"
+
+
+@new_built_in_type("audio")
+class BufferAudio(bytes):
+    """
+    The built-in bytes type's audio, the function gets a read-only memoryview of the uploaded file.
+    Big uploads are memory-mapped, the view is released after the function returns.
+    For input.
+
+    Base Class: bytes
+    """
+
+    __funix_upload__ = "mmap"
+
+
+@new_built_in_type("file")
+class BufferFile(bytes):
+    """
+    The built-in bytes type's file, the function gets a read-only memoryview of the uploaded file.
+    Big uploads are memory-mapped, the view is released after the function returns.
+    For input.
+
+    Base Class: bytes
+    """
+
+    __funix_upload__ = "mmap"
+
+
+@new_built_in_type("image")
+class PathImage(str):
+    """
+    The built-in str type's image, the function gets the path of the uploaded file.
+    For input.
+
+    Base Class: str
+    """
+
+    __funix_upload__ = "path"
+
+
+@new_built_in_type("video")
+class PathVideo(str):
+    """
+    The built-in str type's video, the function gets the path of the uploaded file.
+    For input.
+
+    Base Class: str
+    """
+
+    __funix_upload__ = "path"
+
+
+@new_built_in_type("audio")
+class PathAudio(str):
+    """
+    The built-in str type's audio, the function gets the path of the uploaded file.
+    For input.
+
+    Base Class: str
+    """
+
+    __funix_upload__ = "path"
+
+
+@new_built_in_type("file")
+class PathFile(str):
+    """
+    The built-in str type's file, the function gets the path of the uploaded file.
+    For input.
+
+    Base Class: str
+    """
+
+    __funix_upload__ = "path"
+
+
 def str_code(*args, **kwargs) -> Any:
     """
     The built-in str type's code.
@@ -1,13 +1,13 @@
 import hashlib
 from typing import List
 from funix import funix
-from funix.hint import BytesFile
+from funix.hint import BufferFile
 
 
 @funix(
     title="Get File's SHA256",
 )
-def hashit(datas: List[BytesFile]) -> list:
+def hashit(datas: List[BufferFile]) -> list:
     results = []
     for data in datas:
         sha256 = hashlib.sha256()
@@ -32,6 +32,7 @@ import { useAtom } from "jotai";
 import { storeAtom } from "../../store";
 import { enqueueSnackbar } from "notistack";
 import FunixRecorder from "../../shared/media";
+import { uploadFiles } from "../../shared";
 
 interface FileUploadWidgetInterface {
   widget: WidgetProps;
@@ -75,6 +76,38 @@ const base64stringToFile = (base64: string) => {
   });
 };
 
+const referenceToFile = (reference: string, backend: URL | null) => {
+  if (reference.startsWith("data:")) {
+    return Promise.resolve(base64stringToFile(reference));
+  }
+  return fetch(new URL(reference, backend ?? window.location.origin))
+    .then((response) => response.blob())
+    .then(
+      (blob) =>
+        new File([blob], "History back, no metadata keep.", {
+          type: blob.type,
+        })
+    );
+};
+
+const filesToReferences = (files: File[], backend: URL | null) => {
+  if (backend === null) {
+    return Promise.all(files.map((file) => fileToBase64(file)));
+  }
+  // Send the files as multipart, the backend keeps them and returns /upload/<id>
+  return uploadFiles(new URL("/upload", backend), files).then(
+    (response) => {
+      if (response.files === undefined) {
+        // Rejected by the backend, e.g. the files are too big
+        enqueueSnackbar(response.error_body, { variant: "error" });
+        return [];
+      }
+      return response.files;
+    },
+    () => Promise.all(files.map((file) => fileToBase64(file)))
+  );
+};
+
 const CameraPreviewVideo = () => {
   useLayoutEffect(() => {
     const video = document.getElementById("videoPreview") as HTMLVideoElement;
@@ -94,7 +127,7 @@ const CameraPreviewVideo = () => {
 };
 
 const FileUploadWidget = (props: FileUploadWidgetInterface) => {
-  const [{ backHistory }] = useAtom(storeAtom);
+  const [{ backHistory, backend }] = useAtom(storeAtom);
   const [files, setFiles] = React.useState<File[]>([]);
   const [open, setOpen] = React.useState(false);
   const [cameraOpen, setCameraOpen] = React.useState(false);
@@ -154,12 +187,12 @@ const FileUploadWidget = (props: FileUploadWidgetInterface) => {
   useEffect(() => {
     if (files.length > 0) {
       if (props.multiple) {
-        Promise.all(files.map((file) => fileToBase64(file))).then((values) => {
+        filesToReferences(files, backend).then((values) => {
           props.widget.onChange(values);
         });
       } else {
-        fileToBase64(files[0]).then((value) => {
-          props.widget.onChange(value);
+        filesToReferences([files[0]], backend).then((values) => {
+          props.widget.onChange(values[0]);
         });
       }
     }
@@ -181,14 +214,10 @@ const FileUploadWidget = (props: FileUploadWidgetInterface) => {
       setFiles([]);
       // ehh no, need somebody write better code please
       const data = backHistory["input"][props.widget.name];
-      if (typeof data === "string") {
-        setFiles([base64stringToFile(data)]);
-      } else {
-        const newFiles = (data as string[]).map((data) =>
-          base64stringToFile(data)
-        );
-        setFiles(newFiles);
-      }
+      const references = typeof data === "string" ? [data] : (data as string[]);
+      Promise.all(
+        references.map((reference) => referenceToFile(reference, backend))
+      ).then((newFiles) => setFiles(newFiles));
     }
   }, [backHistory]);
 
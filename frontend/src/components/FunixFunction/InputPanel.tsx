@@ -9,7 +9,7 @@ import {
 import Card from "@mui/material/Card"; // eslint-disable-next-line @typescript-eslint/ban-ts-comment
 // @ts-ignore
 import Form from "@rjsf/material-ui/v5";
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 import {
   callFunctionRaw,
   FunctionDetail,
@@ -74,40 +74,67 @@ const InputPanel = (props: {
     }
   }, [backConsensus]);
 
-  const handleChange = ({ formData }: Record<string, any>) => {
-    // console.log("Data changed: ", formData);
-    setForm(formData);
-
-    if (!props.preview.reactive) {
-      return;
-    }
+  // Fields changed since the last update, the server only recomputes the reactive params that take them
+  const changedFields = useRef<Set<string>>(new Set());
+  const latestForm = useRef<Record<string, any>>({});
 
-    _.debounce(() => {
-      fetch(new URL(`/update/${props.preview.id}`, props.backend), {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify(formData),
-      })
-        .then((body) => {
-          return body.json();
+  const sendUpdate = useMemo(
+    () =>
+      _.debounce(() => {
+        const changed = Array.from(changedFields.current);
+        changedFields.current.clear();
+        fetch(new URL(`/update/${props.preview.id}`, props.backend), {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify({
+            ...latestForm.current,
+            __funix_changed: changed,
+          }),
         })
-        .then((data: UpdateResult) => {
-          const result = data.result;
+          .then((body) => {
+            return body.json();
+          })
+          .then((data: UpdateResult) => {
+            const result = data.result;
 
-          if (result !== null) {
-            for (const [key, value] of Object.entries(result)) {
+            if (result !== null) {
               setForm((form) => {
                 return {
                   ...form,
-                  [key]: value,
+                  ...result,
                 };
               });
             }
-          }
-        });
-    }, 100)();
+          })
+          .catch(() => {
+            // Not applied, send them again with the next update
+            changed.forEach((key) => changedFields.current.add(key));
+          });
+      }, 100),
+    [props.preview.id, props.backend]
+  );
+
+  useEffect(() => {
+    return () => sendUpdate.cancel();
+  }, [sendUpdate]);
+
+  const handleChange = ({ formData }: Record<string, any>) => {
+    // console.log("Data changed: ", formData);
+    for (const key of _.union(Object.keys(formData), Object.keys(form))) {
+      if (!_.isEqual(formData[key], form[key])) {
+        changedFields.current.add(key);
+      }
+    }
+    setForm(formData);
+    latestForm.current = formData;
+
+    if (!props.preview.reactive || changedFields.current.size === 0) {
+      return;
+    }
+
+    sendUpdate();
   };
 
   const saveOutput = async (
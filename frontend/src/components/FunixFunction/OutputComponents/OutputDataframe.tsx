@@ -1,15 +1,26 @@
-import { GridColDef, GridToolbar } from "@mui/x-data-grid";
+import {
+  GridColDef,
+  GridFilterModel,
+  GridSortModel,
+  GridToolbar,
+} from "@mui/x-data-grid";
 import { DataGrid } from "../../../Key";
 import { Box } from "@mui/material";
+import { useEffect, useRef, useState } from "react";
 
-export default function OutputDataframe(props: {
-  dataframe: { [key: string]: any }[];
-}) {
-  const hasId = props.dataframe[0].hasOwnProperty("id");
-  const columns: GridColDef[] = [];
-  const newDataframe: { [key: string]: any }[] = [];
+type DataframeRow = { [key: string]: any };
 
-  const row = props.dataframe[0];
+export type DataframeHandle = {
+  handle: string;
+  total: number;
+  offset: number;
+  limit: number;
+  columns: string[];
+  rows: DataframeRow[];
+};
+
+const getColumns = (keys: string[], hasId: boolean): GridColDef[] => {
+  const columns: GridColDef[] = [];
 
   if (!hasId) {
     columns.push({
@@ -19,28 +30,37 @@ export default function OutputDataframe(props: {
     });
   }
 
-  Object.keys(row)
-    .reverse()
-    .forEach((key) => {
-      columns.push({
-        field: key,
-        headerName: key,
-        width: 150,
-        editable: false,
-      });
+  keys.forEach((key) => {
+    columns.push({
+      field: key,
+      headerName: key,
+      width: 150,
+      editable: false,
     });
-
-  props.dataframe.forEach((row, index) => {
-    if (!hasId) {
-      newDataframe[index] = {
-        id: index,
-        ...row,
-      };
-    } else {
-      newDataframe[index] = row;
-    }
   });
 
+  return columns;
+};
+
+const withId = (
+  rows: DataframeRow[],
+  hasId: boolean,
+  offset: number
+): DataframeRow[] =>
+  rows.map((row, index) =>
+    hasId
+      ? row
+      : {
+          id: offset + index,
+          ...row,
+        }
+  );
+
+function LocalDataframe(props: { dataframe: DataframeRow[] }) {
+  const hasId = props.dataframe[0].hasOwnProperty("id");
+  const columns = getColumns(Object.keys(props.dataframe[0]).reverse(), hasId);
+  const newDataframe = withId(props.dataframe, hasId, 0);
+
   return (
     <Box sx={{ height: 400, width: "100%" }}>
       <DataGrid
@@ -61,3 +81,101 @@ export default function OutputDataframe(props: {
     </Box>
   );
 }
+
+function RemoteDataframe(props: { table: DataframeHandle; backend: string }) {
+  const hasId = props.table.columns.includes("id");
+  const columns = getColumns(props.table.columns, hasId);
+
+  const [page, setPage] = useState(0);
+  const [pageSize, setPageSize] = useState(props.table.limit);
+  const [sortModel, setSortModel] = useState<GridSortModel>([]);
+  const [filterModel, setFilterModel] = useState<GridFilterModel>({
+    items: [],
+  });
+  const [rows, setRows] = useState(withId(props.table.rows, hasId, 0));
+  const [rowCount, setRowCount] = useState(props.table.total);
+  const [loading, setLoading] = useState(false);
+  const firstPage = useRef(true);
+
+  useEffect(() => {
+    if (firstPage.current) {
+      // The first page comes with the handle
+      firstPage.current = false;
+      return;
+    }
+
+    const url = new URL(`/result/${props.table.handle}`, props.backend);
+    url.searchParams.set("offset", (page * pageSize).toString());
+    url.searchParams.set("limit", pageSize.toString());
+    if (sortModel.length > 0) {
+      url.searchParams.set("sort", sortModel[0].field);
+      url.searchParams.set("order", sortModel[0].sort ?? "asc");
+    }
+    const filterItem = filterModel.items.find(
+      (item) => item.value !== undefined && item.value !== ""
+    );
+    if (filterItem) {
+      url.searchParams.set("filter", filterItem.columnField);
+      url.searchParams.set("value", String(filterItem.value));
+    }
+
+    let active = true;
+    setLoading(true);
+    fetch(url)
+      .then((response) => response.json())
+      .then((data: DataframeHandle) => {
+        if (!active) return;
+        setRows(withId(data.rows, hasId, data.offset));
+        setRowCount(data.total);
+      })
+      .finally(() => {
+        if (active) setLoading(false);
+      });
+
+    return () => {
+      active = false;
+    };
+  }, [page, pageSize, sortModel, filterModel]);
+
+  return (
+    <Box sx={{ height: 400, width: "100%" }}>
+      <DataGrid
+        rows={rows}
+        columns={columns}
+        components={{
+          Toolbar: GridToolbar,
+        }}
+        rowCount={rowCount}
+        loading={loading}
+        pagination
+        paginationMode="server"
+        sortingMode="server"
+        filterMode="server"
+        page={page}
+        pageSize={pageSize}
+        rowsPerPageOptions={[25, 50, 100]}
+        onPageChange={setPage}
+        onPageSizeChange={setPageSize}
+        onSortModelChange={setSortModel}
+        onFilterModelChange={setFilterModel}
+        initialState={{
+          columns: {
+            columnVisibilityModel: {
+              id: false,
+            },
+          },
+        }}
+      />
+    </Box>
+  );
+}
+
+export default function OutputDataframe(props: {
+  dataframe: DataframeRow[] | DataframeHandle;
+  backend: string;
+}) {
+  if (Array.isArray(props.dataframe)) {
+    return <LocalDataframe dataframe={props.dataframe} />;
+  }
+  return <RemoteDataframe table={props.dataframe} backend={props.backend} />;
+}
@@ -3,8 +3,10 @@ import { useLayoutEffect } from "react";
 export default function OutputPlot(props: {
   plotCode: string;
   indexId: string;
+  staticImage?: string;
 }) {
   useLayoutEffect(() => {
+    if (props.staticImage !== undefined) return;
     if (document.querySelector(`#plot-${props.indexId}`)?.innerHTML === "") {
       const scriptElement = document.createElement("script");
       scriptElement.innerHTML = `mpld3.draw_figure("plot-${props.indexId}", ${props.plotCode})`;
@@ -12,5 +14,16 @@ export default function OutputPlot(props: {
     }
   }, []);
 
+  if (props.staticImage !== undefined) {
+    return (
+      <img
+        id={`plot-${props.indexId}`}
+        src={props.staticImage}
+        alt="Figure"
+        style={{ maxWidth: "100%" }}
+      />
+    );
+  }
+
   return <div id={`plot-${props.indexId}`} />;
 }
@@ -217,10 +217,16 @@ const OutputPanel = (props: {
           <OutputPlot
             plotCode={JSON.stringify(response)}
             indexId={index.toString()}
+            staticImage={response?.static}
           />
         );
       case "Dataframe":
-        return <OutputDataframe dataframe={response} />;
+        return (
+          <OutputDataframe
+            dataframe={response}
+            backend={props.backend.toString()}
+          />
+        );
       case "string":
       case "text":
         return <span>{response}</span>;
@@ -234,6 +240,22 @@ const OutputPanel = (props: {
       case "dict":
       case "Dict":
       case "List":
+        if (
+          response !== null &&
+          typeof response === "object" &&
+          !Array.isArray(response) &&
+          "handle" in response &&
+          "rows" in response &&
+          "columns" in response
+        ) {
+          // A large list of rows, paged by the server
+          return (
+            <OutputDataframe
+              dataframe={response}
+              backend={props.backend.toString()}
+            />
+          );
+        }
         return <GuessingDataView response={JSON.stringify(response)} />;
       case "Markdown":
         return <MarkdownDiv markdown={response} isRenderInline={false} />;
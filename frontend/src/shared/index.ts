@@ -206,6 +206,26 @@ export async function callFunctionRaw(
   }).then((response) => response.text());
 }
 
+export type UploadResponse = {
+  files?: string[];
+  error_type?: "wrapper";
+  error_body?: string;
+};
+
+export async function uploadFiles(
+  url: URL,
+  files: File[],
+  init?: RequestInit
+): Promise<UploadResponse> {
+  const body = new FormData();
+  files.forEach((file) => body.append("file", file, file.name));
+  return f(url, {
+    ...init,
+    method: "POST",
+    body,
+  });
+}
+
 export async function verifyToken(
   url: URL,
   secret: string,